@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""일봉 백테스트 (chart.py로 받아 둔 로컬 캐시 사용, order.py와 같은 호가단위/가격제한 규칙)"""
+import argparse
+import json
+import csv
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_common import fmt_price, fmt_rate, fmt_num
+from quote import load_watchlist, resolve_codes, get_stock_name_by_code
+
+try:
+    import numpy as np
+    import kis_backtest as kb
+except ImportError:
+    print("❌ backtest.py는 numpy가 필요합니다: pip install numpy")
+    sys.exit(1)
+
+
+def fmt_params(params: dict) -> str:
+    return ' '.join(f"{k}={v}" for k, v in params.items())
+
+
+def print_symbols(panel: dict, result: dict, limit: int):
+    """단일 실행: 종목별 결과 (수익률 순)"""
+    order = np.argsort(-result['return'], kind='stable')
+    print(f"  {'종목':<16} {'수익률':>9} {'손익':>14} {'매매':>5} {'승률':>6} {'MDD':>7} {'보유비중':>7}")
+    for i in order[:limit] if limit else order:
+        code = panel['codes'][i]
+        closed = int(result['closed'][i])
+        win = f"{result['wins'][i] / closed * 100:.0f}%" if closed else '-'
+        print(f"  {(get_stock_name_by_code(code) or code)[:8]:<8}({code}) {fmt_rate(result['return'][i]):>9}"
+              f" {fmt_price(int(result['pnl'][i])):>14} {int(result['trades'][i]):>5} {win:>6}"
+              f" {result['mdd'][i]:>6.1f}% {result['exposure'][i]:>6.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='일봉 백테스트 (로컬 차트 캐시)',
+        epilog="전략/파라미터: " + ', '.join(f"{k}({fmt_params(v[1])})" for k, v in kb.STRATEGIES.items()))
+    parser.add_argument('--codes', help='종목코드/종목명 (쉼표 구분, 기본: 캐시된 전체 종목)')
+    parser.add_argument('--watchlist', help='관심종목 파일 (한 줄에 종목코드/종목명)')
+    parser.add_argument('--start', type=int, default=0, help='시작일 (YYYYMMDD, 기본: 캐시 처음)')
+    parser.add_argument('--end', type=int, default=99991231, help='종료일 (YYYYMMDD, 기본: 캐시 끝)')
+    parser.add_argument('--raw-price', action='store_true', help='수정주가 대신 원주가 캐시 사용')
+    parser.add_argument('--strategy', default='sma_cross', choices=list(kb.STRATEGIES), help='전략 (기본: sma_cross)')
+    parser.add_argument('--params', default='', help="파라미터 (예: 'fast=5 slow=20', 쉼표로 여러 값을 주면 스윕)")
+    parser.add_argument('--order', default='market', choices=list(kb.ORD_DVSN), help='주문구분 (기본: market)')
+    parser.add_argument('--offset', type=float, default=0.0,
+                        help='지정가 = 전일 종가 × (1 ∓ offset%%) 호가단위 반올림 (기본: 0)')
+    parser.add_argument('--capital', type=float, default=10_000_000, help='종목당 투자금 (기본: 1천만원)')
+    parser.add_argument('--fee', type=float, default=kb.FEE_RATE * 100, help=f'수수료율 %% (기본: {kb.FEE_RATE * 100})')
+    parser.add_argument('--tax', type=float, default=kb.TAX_RATE * 100, help=f'매도 세율 %% (기본: {kb.TAX_RATE * 100})')
+    parser.add_argument('--jobs', type=int, default=0, help='스윕 프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--limit', type=int, default=20, help='표시 개수 (기본: 20, 0이면 전체)')
+    parser.add_argument('--format', default='table', choices=['table', 'json', 'csv'], help='출력 형식 (기본: table)')
+    args = parser.parse_args()
+
+    items = args.codes.split(',') if args.codes else []
+    if args.watchlist:
+        items += load_watchlist(args.watchlist)
+    codes = resolve_codes(items) if items else None
+    try:
+        grid = kb.param_grid(args.strategy, args.params)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    panel = kb.load_panel(codes, args.start, args.end, not args.raw_price)
+    if panel is None:
+        print("❌ 캐시된 일봉이 없습니다. 먼저 chart.py로 받아 두세요 (예: chart.py --codes 005930 --start 20200101)")
+        sys.exit(1)
+    opts = {'order': args.order, 'offset': args.offset / 100, 'capital': args.capital,
+            'fee': args.fee / 100, 'tax': args.tax / 100}
+
+    results, throughput = kb.sweep(panel, args.strategy, grid, args.jobs, **opts)
+    results.sort(key=lambda r: -r['mean_return'])
+    shown = results[:args.limit] if args.limit else results
+
+    if args.format == 'json':
+        print(json.dumps({'strategy': args.strategy, 'symbols': len(panel['codes']),
+                          'dates': [int(panel['dates'][0]), int(panel['dates'][-1])],
+                          'throughput': throughput, 'results': shown}, ensure_ascii=False, indent=2))
+        return
+    if args.format == 'csv':
+        keys = list(kb.STRATEGIES[args.strategy][1])
+        writer = csv.writer(sys.stdout)
+        writer.writerow(keys + ['mean_return', 'median_return', 'pnl', 'trades', 'win_rate', 'mean_mdd', 'symbol_days'])
+        for r in shown:
+            writer.writerow([r['params'][k] for k in keys] + [round(r['mean_return'], 4), round(r['median_return'], 4),
+                                                              round(r['pnl']), r['trades'], round(r['win_rate'], 2),
+                                                              round(r['mean_mdd'], 2), r['symbol_days']])
+        return
+
+    order_str = '시장가' if args.order == 'market' else f"지정가 (전일 종가 ∓{args.offset:g}%)"
+    print(f"🧪 백테스트: {args.strategy} | {len(panel['codes'])}종목 {panel['dates'][0]}~{panel['dates'][-1]}"
+          f" | {order_str} | 종목당 {fmt_price(int(args.capital))}")
+    print(f"   {len(grid)}개 조합, {fmt_num(results[0]['symbol_days'] * len(results))} 종목-일"
+          f" | 처리량 {fmt_num(int(throughput))} 종목-일/초")
+    print()
+
+    if len(grid) == 1:
+        r = results[0]
+        result = kb.run(panel, args.strategy, r['params'], **opts)
+        print_symbols(panel, result, args.limit)
+        print(f"\n  평균 수익률 {fmt_rate(r['mean_return'])} | 손익 합계 {fmt_price(int(r['pnl']))}"
+              f" | 매매 {fmt_num(r['trades'])}회 | 승률 {r['win_rate']:.0f}% | 평균 MDD {r['mean_mdd']:.1f}%")
+        return
+
+    print(f"  {'파라미터':<22} {'평균수익률':>10} {'중앙값':>9} {'손익 합계':>16} {'매매':>6} {'승률':>6} {'MDD':>7}")
+    for r in shown:
+        print(f"  {fmt_params(r['params']):<22} {fmt_rate(r['mean_return']):>10} {fmt_rate(r['median_return']):>9}"
+              f" {fmt_price(int(r['pnl'])):>16} {fmt_num(r['trades']):>6} {r['win_rate']:>5.0f}% {r['mean_mdd']:>6.1f}%")
+
+
+if __name__ == '__main__':
+    main()
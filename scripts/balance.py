@@ -6,7 +6,19 @@ import sys
 import os
 
 sys.path.insert(0, os.path.dirname(__file__))
-from kis_common import load_config, get_token, api_get, fmt_price, fmt_rate, add_common_args, safe_int
+from kis_common import (load_config, load_accounts, get_token, api_get, fmt_price, fmt_rate, add_common_args,
+                        add_account_args, account_label, fan_out, safe_int)
+
+# 계좌 요약(output2) 항목
+BALANCE_FIELDS = (
+    ('dnca_tot_amt', '예수금총액'),
+    ('nxdy_excc_amt', '익일정산금액'),
+    ('prvs_rcdl_excc_amt', '가수도정산금액(매수가능)'),
+    ('tot_evlu_amt', '총평가금액'),
+    ('evlu_pfls_smtl_amt', '평가손익합계'),
+    ('pchs_amt_smtl_amt', '매입금액합계'),
+    ('evlu_amt_smtl_amt', '평가금액합계'),
+)
 
 
 def get_balance(cfg: dict, token: str) -> Optional[dict]:
@@ -27,36 +39,64 @@ def get_balance(cfg: dict, token: str) -> Optional[dict]:
     return api_get(cfg, token, '/uapi/domestic-stock/v1/trading/inquire-balance', 'TTTC8434R', params)
 
 
+def balance_summary(data: dict) -> Dict[str, int]:
+    """잔고 응답 → 요약 금액 + 보유종목 수"""
+    summary = data.get('output2', [{}])
+    if isinstance(summary, list):
+        summary = summary[0] if summary else {}
+    result = {key: safe_int(summary.get(key, 0)) for key, _ in BALANCE_FIELDS}
+    result['holdings'] = sum(1 for h in data.get('output1', []) if safe_int(h.get('hldg_qty', 0)) > 0)
+    return result
+
+
+def print_summary(summary: Dict[str, int]):
+    for key, label in BALANCE_FIELDS:
+        print(f"  {label}: {fmt_price(summary[key])}")
+    print(f"  보유종목 수: {summary['holdings']}개")
+
+
+def print_accounts(results: list):
+    """계좌별 요약 + 합계"""
+    ok = [(cfg, balance_summary(data)) for cfg, data in results if data]
+    print(f"💰 계좌 잔고 ({len(results)}개 계좌 합산)")
+    for cfg, data in results:
+        if not data:
+            print(f"  ❌ [{account_label(cfg)}] 조회 실패")
+            continue
+        s = balance_summary(data)
+        print(f"  📁 [{account_label(cfg)}] 총평가 {fmt_price(s['tot_evlu_amt'])} | "
+              f"평가손익 {fmt_price(s['evlu_pfls_smtl_amt'])} | 예수금 {fmt_price(s['dnca_tot_amt'])} | "
+              f"보유 {s['holdings']}개")
+    print("─" * 40)
+    total = {key: sum(s[key] for _, s in ok) for key in ok[0][1]}
+    print(f"💰 합계 ({len(ok)}개 계좌)")
+    print_summary(total)
+    if len(ok) < len(results):
+        print(f"⚠️ {len(results) - len(ok)}개 계좌는 합계에서 제외됨")
+
+
 def main():
     parser = argparse.ArgumentParser(description='계좌 잔고 조회')
     add_common_args(parser)
+    add_account_args(parser)
     args = parser.parse_args()
 
-    cfg = load_config(args.config)
+    if args.all_accounts:
+        results = fan_out(load_accounts(args.config), get_balance)
+        if not any(data for _, data in results):
+            sys.exit(1)
+        print_accounts(results)
+        return
+
+    cfg = load_config(args.config, args.account)
     token = get_token(cfg)
     data = get_balance(cfg, token)
 
     if not data:
         sys.exit(1)
 
-    # 계좌 요약 (output2)
-    summary = data.get('output2', [{}])
-    if isinstance(summary, list):
-        summary = summary[0] if summary else {}
-
     print("💰 계좌 잔고")
-    print(f"  예수금총액: {fmt_price(summary.get('dnca_tot_amt', 0))}")
-    print(f"  익일정산금액: {fmt_price(summary.get('nxdy_excc_amt', 0))}")
-    print(f"  가수도정산금액(매수가능): {fmt_price(summary.get('prvs_rcdl_excc_amt', 0))}")
-    print(f"  총평가금액: {fmt_price(summary.get('tot_evlu_amt', 0))}")
-    print(f"  평가손익합계: {fmt_price(summary.get('evlu_pfls_smtl_amt', 0))}")
-    print(f"  매입금액합계: {fmt_price(summary.get('pchs_amt_smtl_amt', 0))}")
-    print(f"  평가금액합계: {fmt_price(summary.get('evlu_amt_smtl_amt', 0))}")
-
-    # 보유 종목 수
-    holdings = data.get('output1', [])
-    active = [h for h in holdings if int(str(h.get('hldg_qty', 0)).replace(',', '') or 0) > 0]
-    print(f"  보유종목 수: {len(active)}개")
+    print_summary(balance_summary(data))
 
 
 if __name__ == '__main__':
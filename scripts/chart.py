@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""기간별 시세(일/주/월봉) 다운로드 및 조회"""
+import argparse
+import csv
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_common import load_config, get_token, fmt_price, fmt_rate, fmt_num, add_common_args
+from quote import load_watchlist, resolve_codes, get_stock_name_by_code
+
+try:
+    from kis_chart import bulk_get_candles
+except ImportError:
+    print("❌ chart.py는 numpy가 필요합니다: pip install numpy")
+    sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='기간별 시세(일/주/월봉) 다운로드 및 조회')
+    add_common_args(parser)
+    today = datetime.today()
+    parser.add_argument('--codes', help='종목코드/종목명 (쉼표 구분)')
+    parser.add_argument('--watchlist', help='관심종목 파일 (한 줄에 종목코드/종목명)')
+    parser.add_argument('--start', default=(today - timedelta(days=365)).strftime('%Y%m%d'),
+                        help='시작일 (YYYYMMDD, 기본: 1년 전)')
+    parser.add_argument('--end', default=today.strftime('%Y%m%d'), help='종료일 (YYYYMMDD, 기본: 오늘)')
+    parser.add_argument('--period', default='D', choices=['D', 'W', 'M'], help='봉 주기 (D:일, W:주, M:월, 기본: D)')
+    parser.add_argument('--raw-price', action='store_true', help='수정주가 대신 원주가')
+    parser.add_argument('--show', type=int, default=0, help='종목별 최근 N봉 출력')
+    parser.add_argument('--csv', action='store_true', help='전체 봉을 CSV로 출력')
+    parser.add_argument('--workers', type=int, default=8, help='동시 조회 수 (기본: 8)')
+    args = parser.parse_args()
+
+    items = args.codes.split(',') if args.codes else []
+    if args.watchlist:
+        items += load_watchlist(args.watchlist)
+    codes = resolve_codes(items)
+    if not codes:
+        print("❌ --codes 또는 --watchlist로 종목을 입력하세요.")
+        sys.exit(1)
+
+    cfg = load_config(args.config)
+    token = get_token(cfg)
+    results = bulk_get_candles(cfg, token, codes, args.start, args.end, args.period,
+                               not args.raw_price, args.workers)
+
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(['code', 'date', 'open', 'high', 'low', 'close', 'volume', 'amount'])
+        for code, c in results.items():
+            if c is None:
+                continue
+            for row in zip(c['date'].tolist(), c['open'].tolist(), c['high'].tolist(), c['low'].tolist(),
+                           c['close'].tolist(), c['volume'].tolist(), c['amount'].tolist()):
+                writer.writerow([code, *row])
+        return
+
+    print(f"🕯️ 기간별 시세 ({args.start} ~ {args.end}, {args.period}봉)")
+    print()
+    failed = 0
+    for code, c in results.items():
+        name = get_stock_name_by_code(code) or code
+        if c is None:
+            failed += 1
+            print(f"❌ {name} ({code}) 조회 실패")
+            continue
+        n = len(c['date'])
+        if not n:
+            print(f"⚪ {name} ({code}) 데이터 없음")
+            continue
+        first, last = int(c['close'][0]), int(c['close'][-1])
+        ret = (last / first - 1) * 100 if first else 0
+        print(f"📈 {name} ({code}) {n}봉 {c['date'][0]}~{c['date'][-1]} | 종가 {fmt_price(last)} ({fmt_rate(ret)})"
+              f" | 고가 {fmt_price(int(c['high'].max()))} | 저가 {fmt_price(int(c['low'].min()))}")
+        for i in range(max(0, n - args.show), n) if args.show else ():
+            print(f"   {c['date'][i]} 시 {fmt_num(int(c['open'][i]))} 고 {fmt_num(int(c['high'][i]))}"
+                  f" 저 {fmt_num(int(c['low'][i]))} 종 {fmt_num(int(c['close'][i]))} 거래량 {fmt_num(int(c['volume'][i]))}")
+
+    if failed == len(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
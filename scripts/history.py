@@ -4,52 +4,97 @@ from typing import Optional, Dict
 import argparse
 import sys
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(__file__))
-from kis_common import load_config, get_token, api_get, fmt_price, fmt_num, add_common_args, safe_int
+from kis_trades import TradeStore, sync_start, three_months_ago
+from kis_common import load_config, get_token, api_get, fmt_price, fmt_num, add_common_args, PageIterator, ShardedRows, safe_int
+
+
+def daily_orders_pages(cfg: dict, token: str, start: str, end: str,
+                       tr_id: str = 'TTTC0081R', odno: str = '', code: str = '') -> PageIterator:
+    """일별 주문체결 페이지 스트림 (다음 페이지 미리 요청, 주문번호/종목 필터 선택)"""
+    params = {
+        "CANO": cfg['account_no'],
+        "ACNT_PRDT_CD": cfg['product_code'],
+        "INQR_STRT_DT": start,
+        "INQR_END_DT": end,
+        "SLL_BUY_DVSN_CD": "00",
+        "INQR_DVSN": "01",
+        "PDNO": code,
+        "CCLD_DVSN": "00",
+        "ORD_GNO_BRNO": "",
+        "ODNO": odno,
+        "INQR_DVSN_3": "00",
+        "INQR_DVSN_1": "",
+        "CTX_AREA_FK100": "",
+        "CTX_AREA_NK100": "",
+    }
+    return PageIterator(cfg, token, '/uapi/domestic-stock/v1/trading/inquire-daily-ccld', tr_id, params)
+
+
+def iter_daily_orders(cfg: dict, token: str, start: str, end: str, shard_days: int = 31) -> ShardedRows:
+    """일별 주문체결 스트림 (기간을 shard_days일 단위로 나눠 동시 조회, 날짜 순 반환)
+
+    3개월 이전 구간은 CTSC9215R, 이내 구간은 TTTC0081R로 조회한다.
+    """
+    boundary = three_months_ago()
+
+    def make_pages(s: str, e: str) -> PageIterator:
+        return daily_orders_pages(cfg, token, s, e, 'CTSC9215R' if e < boundary else 'TTTC0081R')
+
+    return ShardedRows(make_pages, start, end, shard_days, breaks=[boundary])
 
 
 def get_daily_orders(cfg: dict, token: str, start: str, end: str) -> list:
     """일별 주문체결 조회 (페이지네이션 포함)"""
-    all_orders = []
-    ctx_fk = ""
-    ctx_nk = ""
-
-    while True:
-        params = {
-            "CANO": cfg['account_no'],
-            "ACNT_PRDT_CD": cfg['product_code'],
-            "INQR_STRT_DT": start,
-            "INQR_END_DT": end,
-            "SLL_BUY_DVSN_CD": "00",
-            "INQR_DVSN": "01",
-            "PDNO": "",
-            "CCLD_DVSN": "00",
-            "ORD_GNO_BRNO": "",
-            "ODNO": "",
-            "INQR_DVSN_3": "00",
-            "INQR_DVSN_1": "",
-            "CTX_AREA_FK100": ctx_fk,
-            "CTX_AREA_NK100": ctx_nk,
-        }
-        data = api_get(cfg, token, '/uapi/domestic-stock/v1/trading/inquire-daily-ccld', 'TTTC0081R', params)
-        if not data:
-            break
-
-        items = data.get('output1', [])
-        all_orders.extend(items)
-
-        tr_cont = data.get('_tr_cont', '')
-        if tr_cont in ('F', 'M') and items:
-            ctx_fk = data.get('ctx_area_fk100', data.get('CTX_AREA_FK100', ''))
-            ctx_nk = data.get('ctx_area_nk100', data.get('CTX_AREA_NK100', ''))
-            if not ctx_fk and not ctx_nk:
-                break
-        else:
-            break
-
-    return all_orders
+    return list(iter_daily_orders(cfg, token, start, end))
+
+
+def sync_trades(cfg: dict, token: str, store: TradeStore, since: str) -> int:
+    """로컬 저장소 동기화 (마지막 확정일 다음 날 ~ 오늘), 저장 건수 반환"""
+    today = datetime.today()
+    start = sync_start(store, since)
+    end = today.strftime('%Y%m%d')
+    if start > end:
+        return 0
+    rows = iter_daily_orders(cfg, token, start, end)
+    count = store.add(rows)
+    if not rows.failed:
+        # 어제까지는 확정, 오늘은 다음 동기화 때 다시 조회
+        store.mark_synced((today - timedelta(days=1)).strftime('%Y%m%d'))
+    return count
+
+
+def account_key(cfg: dict) -> str:
+    """로컬 저장소 계좌 키"""
+    return f"{cfg['account_no']}-{cfg['product_code']}"
+
+
+def print_summary(rows: list):
+    """종목별 체결 집계 출력"""
+    for r in rows:
+        print(f"📦 {r['name'] or r['pdno']} ({r['pdno']}) | 주문 {r['orders']}건")
+        print(f"   매수 {fmt_num(r['buy_qty'])}주 {fmt_price(r['buy_amt'])} | 매도 {fmt_num(r['sell_qty'])}주 {fmt_price(r['sell_amt'])}")
+
+
+def print_order(o: dict):
+    """주문체결 한 건 출력"""
+    name = o.get('prdt_name', o.get('pdno', '???'))
+    side = o.get('sll_buy_dvsn_cd_name', o.get('sll_buy_dvsn_cd', ''))
+    ord_qty = safe_int(o.get('ord_qty'))
+    ccld_qty = safe_int(o.get('tot_ccld_qty'))
+    ord_price = safe_int(o.get('ord_unpr'))
+    ccld_price = safe_int(o.get('avg_prvs'))
+    order_time = o.get('ord_tmd', '')
+    status = '체결' if ccld_qty > 0 else '미체결'
+
+    emoji = '🟢' if '매수' in side else '🔴' if '매도' in side else '⚪'
+    time_str = f"{order_time[:2]}:{order_time[2:4]}:{order_time[4:6]}" if len(order_time) >= 6 else order_time
+
+    print(f"{emoji} {name} | {side} | {status}")
+    print(f"   주문 {fmt_num(ord_qty)}주 @ {fmt_price(ord_price)} | 체결 {fmt_num(ccld_qty)}주 @ {fmt_price(ccld_price)} | {time_str}")
+    print()
 
 
 def main():
@@ -58,35 +103,66 @@ def main():
     today = datetime.today().strftime('%Y%m%d')
     parser.add_argument('--start', default=today, help='조회 시작일 (YYYYMMDD, 기본: 오늘)')
     parser.add_argument('--end', default=today, help='조회 종료일 (YYYYMMDD, 기본: 오늘)')
+    parser.add_argument('--shard-days', type=int, default=31, help='긴 기간 분할 조회 단위(일, 0: 분할 안함, 기본: 31)')
+    parser.add_argument('--sync', action='store_true', help='로컬 저장소 동기화 (마지막 동기화 이후 ~ 오늘만 조회)')
+    parser.add_argument('--since', help='첫 동기화/백필 시작일 (YYYYMMDD, 기본: 3개월 전)')
+    parser.add_argument('--backfill', action='store_true', help='--since ~ 오늘 전체를 로컬 저장소에 다시 받기 (3개월 이전 포함)')
+    parser.add_argument('--local', action='store_true', help='로컬 저장소에서 조회 (API 호출 없음)')
+    parser.add_argument('--code', help='종목코드 필터 (--local)')
+    parser.add_argument('--summary', action='store_true', help='종목별 매수/매도 집계 (--local)')
     args = parser.parse_args()
 
     cfg = load_config(args.config)
-    token = get_token(cfg)
-    orders = get_daily_orders(cfg, token, args.start, args.end)
 
-    if not orders:
-        print(f"📋 매매 내역 없음 ({args.start} ~ {args.end})")
+    if args.sync or args.backfill or args.local:
+        store = TradeStore(account_key(cfg))
+        if args.sync or args.backfill:
+            token = get_token(cfg)
+            since = args.since or three_months_ago()
+            if args.backfill:
+                count = store.add(iter_daily_orders(cfg, token, since, today, args.shard_days))
+                print(f"✅ 백필 완료: {count}건 ({since} ~ {today})")
+            else:
+                count = sync_trades(cfg, token, store, since)
+                print(f"✅ 동기화 완료: {count}건 (확정일 {store.synced_through() or '-'})")
+        if not args.local:
+            return
+
+        if args.summary:
+            rows = store.summary(args.start, args.end, args.code or '')
+            if not rows:
+                print(f"📋 매매 내역 없음 ({args.start} ~ {args.end})")
+                return
+            print(f"📋 종목별 체결 집계 ({args.start} ~ {args.end}, {len(rows)}종목)")
+            print()
+            print_summary(rows)
+            return
+
+        orders = store.query(args.start, args.end, args.code or '')
+        if not orders:
+            print(f"📋 매매 내역 없음 ({args.start} ~ {args.end})")
+            return
+        print(f"📋 매매 내역 ({args.start} ~ {args.end}, {len(orders)}건)")
+        print()
+        for o in orders:
+            print_order(o)
         return
 
-    print(f"📋 매매 내역 ({args.start} ~ {args.end}, {len(orders)}건)")
-    print()
+    token = get_token(cfg)
 
-    for o in orders:
-        name = o.get('prdt_name', o.get('pdno', '???'))
-        side = o.get('sll_buy_dvsn_cd_name', o.get('sll_buy_dvsn_cd', ''))
-        ord_qty = safe_int(o.get('ord_qty'))
-        ccld_qty = safe_int(o.get('tot_ccld_qty'))
-        ord_price = safe_int(o.get('ord_unpr'))
-        ccld_price = safe_int(o.get('avg_prvs'))
-        order_time = o.get('ord_tmd', '')
-        status = '체결' if ccld_qty > 0 else '미체결'
-
-        emoji = '🟢' if '매수' in side else '🔴' if '매도' in side else '⚪'
-        time_str = f"{order_time[:2]}:{order_time[2:4]}:{order_time[4:6]}" if len(order_time) >= 6 else order_time
-
-        print(f"{emoji} {name} | {side} | {status}")
-        print(f"   주문 {fmt_num(ord_qty)}주 @ {fmt_price(ord_price)} | 체결 {fmt_num(ccld_qty)}주 @ {fmt_price(ccld_price)} | {time_str}")
-        print()
+    # 조회되는 대로 출력 (긴 기간은 구간별 동시 조회)
+    count = 0
+    for o in iter_daily_orders(cfg, token, args.start, args.end, args.shard_days):
+        if count == 0:
+            print(f"📋 매매 내역 ({args.start} ~ {args.end})")
+            print()
+        count += 1
+        print_order(o)
+
+    if not count:
+        print(f"📋 매매 내역 없음 ({args.start} ~ {args.end})")
+        return
+    print(f"총 {count}건")
 
 
 if __name__ == '__main__':
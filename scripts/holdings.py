@@ -2,102 +2,205 @@
 """보유 종목 + 수익률 조회"""
 from typing import Optional, Dict
 import argparse
+import json
+import csv
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(__file__))
-from kis_common import load_config, get_token, api_get, fmt_price, fmt_rate, fmt_num, add_common_args, safe_int, safe_float
+from kis_portfolio import Portfolio, SORT_KEYS
+from kis_symbols import get_master
+from quote import get_quotes
+from kis_common import (load_config, load_accounts, get_token, api_get, fmt_price, fmt_rate, fmt_num, add_common_args,
+                        add_account_args, account_label, fan_out, PageIterator, safe_int, safe_float)
+
+
+def holdings_pages(cfg: dict, token: str) -> PageIterator:
+    """보유 종목 페이지 스트림 (다음 페이지 미리 요청)"""
+    params = {
+        "CANO": cfg['account_no'],
+        "ACNT_PRDT_CD": cfg['product_code'],
+        "AFHR_FLPR_YN": "N",
+        "OFL_YN": "",
+        "INQR_DVSN": "00",
+        "UNPR_DVSN": "01",
+        "FUND_STTL_ICLD_YN": "N",
+        "FNCG_AMT_AUTO_RDPT_YN": "N",
+        "PRCS_DVSN": "00",
+        "CTX_AREA_FK100": "",
+        "CTX_AREA_NK100": "",
+    }
+    return PageIterator(cfg, token, '/uapi/domestic-stock/v1/trading/inquire-balance', 'TTTC8434R', params)
 
 
 def get_holdings(cfg: dict, token: str) -> list:
     """보유 종목 조회 (페이지네이션 포함)"""
-    all_holdings = []
-    ctx_fk = ""
-    ctx_nk = ""
-
-    while True:
-        params = {
-            "CANO": cfg['account_no'],
-            "ACNT_PRDT_CD": cfg['product_code'],
-            "AFHR_FLPR_YN": "N",
-            "OFL_YN": "",
-            "INQR_DVSN": "00",
-            "UNPR_DVSN": "01",
-            "FUND_STTL_ICLD_YN": "N",
-            "FNCG_AMT_AUTO_RDPT_YN": "N",
-            "PRCS_DVSN": "00",
-            "CTX_AREA_FK100": ctx_fk,
-            "CTX_AREA_NK100": ctx_nk,
-        }
-        data = api_get(cfg, token, '/uapi/domestic-stock/v1/trading/inquire-balance', 'TTTC8434R', params)
-        if not data:
-            break
-
-        items = data.get('output1', [])
-        all_holdings.extend(items)
-
-        # 연속조회 확인 (F/M = 다음 페이지 있음)
-        tr_cont = data.get('_tr_cont', '')
-        if tr_cont in ('F', 'M') and items:
-            ctx_fk = data.get('ctx_area_fk100', data.get('CTX_AREA_FK100', ''))
-            ctx_nk = data.get('ctx_area_nk100', data.get('CTX_AREA_NK100', ''))
-            if not ctx_fk and not ctx_nk:
-                break
-        else:
-            break
+    pages = holdings_pages(cfg, token)
+    all_holdings = list(pages.rows())
+    # 중간 페이지 실패 시 마지막 응답 없음으로 처리
+    return all_holdings, None if pages.failed else pages.last
+
 
-    return all_holdings, data
+def load_portfolio(cfg: dict, token: str) -> Optional[Portfolio]:
+    """보유 종목 조회 → 시장 라벨이 붙은 Portfolio (조회 실패 시 None)"""
+    holdings_list, last_data = get_holdings(cfg, token)
+    if last_data is None:
+        return None
+    summary = last_data.get('output2') or {}
+    pf = Portfolio.from_rows(holdings_list, summary[0] if isinstance(summary, list) else summary)
+    if len(pf):
+        master = get_master()
+        pf.set_labels(markets={c: m for c in pf.codes if (m := master.market_of(c))})
+    return pf
+
+
+def refresh_prices(cfg: dict, token: str, pf: Portfolio) -> tuple:
+    """현재가/업종 재조회 (동시 조회) 후 현재가 컬럼만 갱신, (현재가, 업종) dict 반환"""
+    quotes = get_quotes(cfg, token, pf.codes)
+    prices = {}
+    sectors = {}
+    for code, data in quotes.items():
+        if data:
+            out = data.get('output', {})
+            prices[code] = safe_int(out.get('stck_prpr'))
+            sectors[code] = out.get('bstp_kor_isnm', '')
+    pf.update_prices(prices)
+    pf.set_labels(sectors=sectors)
+    return prices, sectors
+
+
+def portfolio_report(pf: Portfolio, rows: list, account: str) -> dict:
+    """JSON 출력용 보유 종목 + 분석 지표"""
+    return {
+        'positions': rows,
+        'totals': pf.totals(),
+        'concentration': pf.concentration(),
+        'drawdown': pf.drawdown(account),
+        'market_exposure': pf.exposure(pf.markets) if any(pf.markets) else {},
+        'sector_exposure': pf.exposure(pf.sectors) if any(pf.sectors) else {},
+    }
+
+
+def print_holdings(pf: Portfolio, rows: list, account: str):
+    """보유 종목 + 분석 지표 출력"""
+    print(f"📊 보유 종목 ({len(rows)}개)")
+    print()
+    for r in rows:
+        emoji = '🔴' if r['pl'] < 0 else '🟢' if r['pl'] > 0 else '⚪'
+        print(f"{emoji} {r['name']} ({r['code']})")
+        print(f"   {fmt_num(r['qty'])}주 | 평균 {fmt_price(int(r['avg_price']))} → 현재 {fmt_price(r['price'])}")
+        print(f"   평가 {fmt_price(r['eval'])} | 손익 {fmt_price(r['pl'])} ({fmt_rate(r['pl_rate'])}) | 비중 {r['weight']:.1f}%")
+        print()
+
+    print("─" * 40)
+    t = pf.totals()
+    emoji = '🔴' if t['pl'] < 0 else '🟢' if t['pl'] > 0 else '⚪'
+    print(f"{emoji} 합계: 매입 {fmt_price(t['purchase'])} | 평가 {fmt_price(t['eval'])} | 손익 {fmt_price(t['pl'])} ({fmt_rate(t['pl_rate'])})")
+
+    conc = pf.concentration()
+    dd = pf.drawdown(account)
+    print(f"🎯 집중도: 최대 {conc['max_code']} {conc['max_weight'] * 100:.1f}% | 상위5 {conc['top5'] * 100:.1f}%"
+          f" | HHI {conc['hhi']:.3f} (유효 {conc['effective_n']:.1f}종목)")
+    print(f"📉 고점 대비: {fmt_rate(dd['drawdown'])} (총평가 {fmt_price(dd['equity'])} / 고점 {fmt_price(dd['peak_equity'])})"
+          f" | 최대 손실 종목 {dd['worst_code']} {fmt_rate(dd['worst_pl_rate'])}")
+    for title, labels in (('시장', pf.markets), ('업종', pf.sectors)):
+        if any(labels):
+            exp = ' | '.join(f"{k} {w * 100:.1f}%" for k, w in pf.exposure(labels).items())
+            print(f"🧭 {title}별 비중: {exp}")
+
+
+def run_all_accounts(args):
+    """모든 계좌 동시 조회 → 계좌별 요약 + 종목별 합산"""
+    results = fan_out(load_accounts(args.config), load_portfolio)
+    ok = [(cfg, pf) for cfg, pf in results if pf is not None]
+    if not ok:
+        sys.exit(1)
+    combined = Portfolio.combine([pf for _, pf in ok])
+    if args.refresh and len(combined):
+        cfg = ok[0][0]
+        prices, sectors = refresh_prices(cfg, get_token(cfg), combined)
+        for _, pf in ok:
+            pf.update_prices(prices)
+            pf.set_labels(sectors=sectors)
+
+    desc = not args.asc if args.sort not in ('name', 'code') else args.asc
+    rows = combined.rows(args.sort, desc)
+    account = 'ALL:' + ','.join(account_label(cfg) for cfg, _ in ok)
+
+    if args.format == 'json':
+        accounts = [{'account': account_label(cfg), 'error': True} if pf is None else
+                    {'account': account_label(cfg), 'totals': pf.totals(), 'positions': pf.rows(args.sort, desc)}
+                    for cfg, pf in results]
+        print(json.dumps({'accounts': accounts, **portfolio_report(combined, rows, account)},
+                         ensure_ascii=False, indent=2))
+    elif args.format == 'csv':
+        per_account = [dict(account=account_label(cfg), **r) for cfg, pf in ok for r in pf.rows(args.sort, desc)]
+        if per_account:
+            writer = csv.DictWriter(sys.stdout, fieldnames=list(per_account[0].keys()))
+            writer.writeheader()
+            writer.writerows(per_account)
+    else:
+        print(f"📁 계좌 {len(results)}개")
+        for cfg, pf in results:
+            if pf is None:
+                print(f"  ❌ [{account_label(cfg)}] 조회 실패")
+                continue
+            t = pf.totals()
+            print(f"  [{account_label(cfg)}] {len(pf)}종목 | 평가 {fmt_price(t['eval'])} | "
+                  f"손익 {fmt_price(t['pl'])} ({fmt_rate(t['pl_rate'])})")
+        print()
+        if not len(combined):
+            print("📊 보유 종목 없음")
+        else:
+            print_holdings(combined, rows, account)
+            combined.record_peak(account)
+        if len(ok) < len(results):
+            print(f"⚠️ {len(results) - len(ok)}개 계좌는 합산에서 제외됨")
 
 
 def main():
     parser = argparse.ArgumentParser(description='보유 종목 및 수익률 조회')
     add_common_args(parser)
+    parser.add_argument('--format', default='table', choices=['table', 'json', 'csv'], help='출력 형식 (기본: table)')
+    parser.add_argument('--sort', choices=SORT_KEYS, help='정렬 기준 (weight, eval, pl, pl_rate, qty, name, code)')
+    parser.add_argument('--asc', action='store_true', help='오름차순 정렬 (기본: 내림차순, name/code는 오름차순)')
+    parser.add_argument('--refresh', action='store_true', help='현재가/업종 재조회 (업종별 비중 포함)')
+    add_account_args(parser)
     args = parser.parse_args()
 
-    cfg = load_config(args.config)
-    token = get_token(cfg)
-    holdings_list, last_data = get_holdings(cfg, token)
+    if args.all_accounts:
+        run_all_accounts(args)
+        return
 
-    if last_data is None:
+    cfg = load_config(args.config, args.account)
+    token = get_token(cfg)
+    pf = load_portfolio(cfg, token)
+    if pf is None:
         sys.exit(1)
 
-    active = [h for h in holdings_list if safe_int(h.get('hldg_qty')) > 0]
-
-    if not active:
-        print("📊 보유 종목 없음")
+    if not len(pf):
+        if args.format == 'json':
+            print(json.dumps({'positions': [], 'totals': pf.totals()}, ensure_ascii=False))
+        elif args.format == 'table':
+            print("📊 보유 종목 없음")
         return
 
-    print(f"📊 보유 종목 ({len(active)}개)")
-    print()
-
-    total_purchase = 0
-    total_eval = 0
-    total_pl = 0
-
-    for h in active:
-        name = h.get('prdt_name', '???')
-        code = h.get('pdno', '')
-        qty = safe_int(h.get('hldg_qty'))
-        avg_price = safe_float(h.get('pchs_avg_pric'))
-        cur_price = safe_int(h.get('prpr'))
-        eval_amt = safe_int(h.get('evlu_amt'))
-        pl_amt = safe_int(h.get('evlu_pfls_amt'))
-        pl_rate = safe_float(h.get('evlu_pfls_rt'))
-
-        total_purchase += safe_int(h.get('pchs_amt'))
-        total_eval += eval_amt
-        total_pl += pl_amt
-
-        emoji = '🔴' if pl_amt < 0 else '🟢' if pl_amt > 0 else '⚪'
-        print(f"{emoji} {name} ({code})")
-        print(f"   {fmt_num(qty)}주 | 평균 {fmt_price(int(avg_price))} → 현재 {fmt_price(cur_price)}")
-        print(f"   평가 {fmt_price(eval_amt)} | 손익 {fmt_price(pl_amt)} ({fmt_rate(pl_rate)})")
-        print()
-
-    print("─" * 40)
-    total_rate = (total_pl / total_purchase * 100) if total_purchase > 0 else 0
-    emoji = '🔴' if total_pl < 0 else '🟢' if total_pl > 0 else '⚪'
-    print(f"{emoji} 합계: 매입 {fmt_price(total_purchase)} | 평가 {fmt_price(total_eval)} | 손익 {fmt_price(total_pl)} ({fmt_rate(total_rate)})")
+    if args.refresh:
+        refresh_prices(cfg, token, pf)
+
+    desc = not args.asc if args.sort not in ('name', 'code') else args.asc
+    rows = pf.rows(args.sort, desc)
+    account = f"{cfg['account_no']}-{cfg['product_code']}"
+
+    if args.format == 'json':
+        print(json.dumps(portfolio_report(pf, rows, account), ensure_ascii=False, indent=2))
+    elif args.format == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        print_holdings(pf, rows, account)
+        pf.record_peak(account)
 
 
 if __name__ == '__main__':
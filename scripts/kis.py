@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+kis - 하위 명령 하나로 쓰는 통합 CLI (각 스크립트의 main()으로 전달)
+
+사용 예:
+    python3 scripts/kis.py setup --config ~/.kis-trading/config.ini --check
+    python3 scripts/kis.py balance --config ~/.kis-trading/config.ini
+    python3 scripts/kis.py quote --config ~/.kis-trading/config.ini --codes 005930,000660
+    python3 scripts/kis.py order --help
+
+고른 하위 명령의 모듈만 import하고, requests/urllib3는 첫 API 호출 때 import한다(kis_common._get_session).
+그래서 --help나 setup --check 같은 오프라인 명령은 HTTP 스택을 읽지 않는다.
+하위 명령 모듈은 import로 실행하므로 바이트코드 캐시(__pycache__)도 쓴다.
+시작 시간은 kis_bench.py --only cold_start로 잰다.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+# 하위 명령 → (모듈, 설명), 모듈은 scripts/<모듈>.py
+COMMANDS = {
+    'setup': ('setup', '설정 확인 및 토큰 발급'),
+    'balance': ('balance', '계좌 잔고'),
+    'holdings': ('holdings', '보유 종목 + 수익률'),
+    'quote': ('quote', '현재가/호가/실시간 시세'),
+    'order': ('order', '매수/매도 주문'),
+    'orders': ('orders', '미체결/정정/취소/체결 리포트'),
+    'history': ('history', '매매 내역'),
+    'pnl': ('pnl', '실현손익 (FIFO)'),
+    'market': ('market', '시장 개황'),
+    'screener': ('screener', '종목 스크리너'),
+    'chart': ('chart', '기간별 시세 (일/주/월봉)'),
+    'backtest': ('backtest', '일봉 백테스트'),
+    'symbols': ('symbols', '종목 마스터 갱신/검색'),
+    'kisd': ('kisd', '상주 프로세스'),
+}
+
+
+def usage() -> str:
+    lines = ["사용법: kis <명령> [옵션...]   (명령별 옵션: kis <명령> --help)", "", "명령:"]
+    lines += [f"  {name:<10} {desc}" for name, (_, desc) in COMMANDS.items()]
+    return '\n'.join(lines)
+
+
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"❌ 알 수 없는 명령: {name}")
+        print(usage())
+        sys.exit(1)
+
+    # argparse가 'kis <명령>'을 프로그램 이름으로 쓰도록 argv를 바꿔서 전달
+    sys.argv = [f"kis {name}", *rest]
+    import importlib
+    importlib.import_module(COMMANDS[name][0]).main()
+
+
+if __name__ == '__main__':
+    main()
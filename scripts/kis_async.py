@@ -0,0 +1,113 @@
+"""
+KIS API 비동기 클라이언트 - asyncio 이벤트 루프에서 여러 조회를 동시에 실행
+
+HTTP 호출은 kis_common의 커넥션 풀 세션을 전용 스레드 풀에서 실행한다.
+토큰 재발급(EGW00123/EGW00121), resolve_tr_id 변환, 토큰 버킷 속도 제한은
+동기 api_get/api_post와 동일하게 적용된다.
+
+사용 예:
+    async def refresh(cfg):
+        token = await async_get_token(cfg)
+        return await asyncio.gather(
+            async_get_index(cfg, token, '0001'),
+            async_get_volume_rank(cfg, token),
+            async_get_holdings(cfg, token),
+            async_get_quote(cfg, token, '005930'),
+        )
+    asyncio.run(refresh(cfg))
+"""
+import os
+import sys
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, AsyncIterator, List
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_common import get_token, api_get, api_post, next_page_keys
+from quote import get_quote
+from market import get_index, get_volume_rank
+from holdings import get_holdings
+from history import get_daily_orders
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(cfg: dict) -> ThreadPoolExecutor:
+    """HTTP 호출용 스레드 풀 (커넥션 풀 크기와 동일)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=cfg.get('http_pool_size', 10),
+                                               thread_name_prefix='kis-async')
+    return _executor
+
+
+async def _run(cfg: dict, func, *args, **kwargs):
+    """동기 함수를 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(cfg), functools.partial(func, *args, **kwargs))
+
+
+async def async_get_token(cfg: dict) -> str:
+    """액세스 토큰 발급/캐시 (비동기)"""
+    return await _run(cfg, get_token, cfg)
+
+
+async def async_api_get(cfg: dict, token: str, path: str, tr_id: str, params: dict,
+                        tr_cont: str = '') -> Optional[dict]:
+    """GET API 호출 (비동기)"""
+    # tr_cont는 키워드로 전달 (api_get의 내부 인자 _retried 자리에 들어가지 않게)
+    return await _run(cfg, api_get, cfg, token, path, tr_id, params, tr_cont=tr_cont)
+
+
+async def async_api_post(cfg: dict, token: str, path: str, tr_id: str, body: dict,
+                         use_hashkey: bool = True) -> Optional[dict]:
+    """POST API 호출 (비동기)"""
+    return await _run(cfg, api_post, cfg, token, path, tr_id, body, use_hashkey)
+
+
+async def async_paginate(cfg: dict, token: str, path: str, tr_id: str, params: dict,
+                         output_key: str = 'output1') -> AsyncIterator[dict]:
+    """연속조회(tr_cont) 페이지 순회, 응답(data)을 페이지 단위로 반환"""
+    params = dict(params, CTX_AREA_FK100=params.get('CTX_AREA_FK100', ''),
+                  CTX_AREA_NK100=params.get('CTX_AREA_NK100', ''))
+    tr_cont = ''
+    while True:
+        data = await async_api_get(cfg, token, path, tr_id, params, tr_cont)
+        if not data:
+            return
+        yield data
+        keys = next_page_keys(data, data.get(output_key, []))
+        if not keys:
+            return
+        params['CTX_AREA_FK100'], params['CTX_AREA_NK100'] = keys
+        tr_cont = 'N'
+
+
+async def async_get_quote(cfg: dict, token: str, code: str) -> Optional[dict]:
+    """현재가 조회 (비동기)"""
+    return await _run(cfg, get_quote, cfg, token, code)
+
+
+async def async_get_index(cfg: dict, token: str, index_code: str) -> Optional[dict]:
+    """업종 지수 조회 (비동기)"""
+    return await _run(cfg, get_index, cfg, token, index_code)
+
+
+async def async_get_volume_rank(cfg: dict, token: str, market: str = "0000") -> Optional[dict]:
+    """거래량 순위 조회 (비동기)"""
+    return await _run(cfg, get_volume_rank, cfg, token, market)
+
+
+async def async_get_holdings(cfg: dict, token: str) -> tuple:
+    """보유 종목 조회 (비동기, 페이지네이션 포함)"""
+    return await _run(cfg, get_holdings, cfg, token)
+
+
+async def async_get_daily_orders(cfg: dict, token: str, start: str, end: str) -> List[dict]:
+    """일별 주문체결 조회 (비동기, 페이지네이션 포함)"""
+    return await _run(cfg, get_daily_orders, cfg, token, start, end)
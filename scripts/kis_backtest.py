@@ -0,0 +1,282 @@
+"""
+일봉 백테스트 엔진 - 로컬 차트 캐시(kis_chart) 위에서 여러 종목을 NumPy 2차원 배열로 한꺼번에 계산
+
+주문 규칙은 order.py와 같은 정의를 쓴다:
+    - 호가단위: order.TICK_TABLE / TOP_TICK (round_to_tick과 같은 표, 같은 반올림)
+    - 가격제한폭: order.PRICE_LIMIT_PCT (price_limits와 같은 계산), 제한폭 밖 지정가는 거부
+    - 주문구분: order.ORD_DVSN (00:지정가, 01:시장가)
+
+체결 모델 (신호는 당일 종가로 계산, 주문은 다음 거래일):
+    시장가  다음 날 시가에 체결
+    지정가  매수가 = round_to_tick(전일 종가 × (1 - offset)), 저가가 매수가 이하이면 min(시가, 매수가)에 체결
+            매도가 = round_to_tick(전일 종가 × (1 + offset)), 고가가 매도가 이상이면 max(시가, 매도가)에 체결
+            체결되지 않으면 다음 날 다시 주문
+    거래 정지(봉 없음/거래량 0)인 날은 체결되지 않는다.
+
+포지션은 종목별 롱 전용(0/1), 매수 때마다 capital 안에서 살 수 있는 최대 수량.
+패널: {'codes': [...], 'dates': int 배열, 'open'/'high'/'low'/'close': (종목 수 × 날짜 수) float 배열, 빈 칸은 NaN}
+"""
+import os
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from kis_chart import load_cache, cached_codes
+from order import TICK_TABLE, TOP_TICK, PRICE_LIMIT_PCT, ORD_DVSN
+
+FEE_RATE = 0.00015  # 위탁수수료 (매수/매도 각각)
+TAX_RATE = 0.0018   # 매도 시 증권거래세 + 농특세
+
+_TICK_BOUNDS = np.array([limit for limit, _ in TICK_TABLE], dtype=np.float64)
+_TICKS = np.array([tick for _, tick in TICK_TABLE] + [TOP_TICK], dtype=np.float64)
+
+
+# 호가/가격제한 (order.py의 배열 버전) ---------------------------------------
+def tick_size_array(prices: np.ndarray) -> np.ndarray:
+    """order.tick_size의 배열 버전"""
+    return _TICKS[np.searchsorted(_TICK_BOUNDS, prices, side='right')]
+
+
+def round_to_tick_array(prices: np.ndarray) -> np.ndarray:
+    """order.round_to_tick의 배열 버전 (같은 은행가 반올림)"""
+    tick = tick_size_array(prices)
+    return np.round(prices / tick) * tick
+
+
+def price_limits_array(base: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """order.price_limits의 배열 버전 → (하한가, 상한가)"""
+    upper = np.floor(base * (100 + PRICE_LIMIT_PCT) / 100)
+    lower = np.ceil(base * (100 - PRICE_LIMIT_PCT) / 100)
+    upper -= np.mod(upper, tick_size_array(upper))
+    lower += np.mod(-lower, tick_size_array(lower))
+    return lower, upper
+
+
+# 패널 ------------------------------------------------------------------------
+def load_panel(codes: Optional[List[str]] = None, start: int = 0, end: int = 99991231,
+               adjusted: bool = True) -> Optional[dict]:
+    """캐시된 일봉을 날짜 합집합 기준 2차원 배열로 (캐시 없는 종목은 제외, 하나도 없으면 None)"""
+    series = {}
+    for code in codes or cached_codes('D', adjusted):
+        cached = load_cache(code, 'D', adjusted)
+        if not cached:
+            continue
+        cols = cached[0]
+        lo, hi = np.searchsorted(cols['date'], [start, end + 1])
+        if hi - lo >= 2:
+            series[code] = {name: arr[lo:hi] for name, arr in cols.items()}
+    if not series:
+        return None
+    dates = np.unique(np.concatenate([c['date'] for c in series.values()]))
+    panel = {'codes': list(series), 'dates': dates}
+    for field in ('open', 'high', 'low', 'close'):
+        panel[field] = np.full((len(series), len(dates)), np.nan)
+    for i, cols in enumerate(series.values()):
+        idx = np.searchsorted(dates, cols['date'])
+        halted = cols['volume'] == 0
+        for field in ('open', 'high', 'low', 'close'):
+            values = cols[field].astype(np.float64)
+            values[halted] = np.nan
+            panel[field][i, idx] = values
+    return panel
+
+
+def _ffill(a: np.ndarray) -> np.ndarray:
+    """행마다 NaN을 직전 값으로 채움 (앞쪽 NaN은 그대로)"""
+    idx = np.where(np.isnan(a), 0, np.arange(a.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return a[np.arange(a.shape[0])[:, None], idx]
+
+
+def _shift(a: np.ndarray, fill=np.nan) -> np.ndarray:
+    """하루 뒤로 밀기 (t열에 t-1열 값)"""
+    out = np.empty_like(a)
+    out[:, 0] = fill
+    out[:, 1:] = a[:, :-1]
+    return out
+
+
+def _rolling_mean(a: np.ndarray, n: int) -> np.ndarray:
+    """n일 이동평균 (n개가 모두 있을 때만, 아니면 NaN)"""
+    valid = ~np.isnan(a)
+    cs = np.cumsum(np.where(valid, a, 0.0), axis=1)
+    cnt = np.cumsum(valid, axis=1)
+    total, count = cs.copy(), cnt.copy()
+    total[:, n:] -= cs[:, :-n]
+    count[:, n:] -= cnt[:, :-n]
+    return np.where(count == n, total / n, np.nan)
+
+
+def _rolling(a: np.ndarray, n: int, func) -> np.ndarray:
+    """n일 창의 최대/최소 (창이 덜 찼으면 NaN)"""
+    out = np.full_like(a, np.nan)
+    if a.shape[1] >= n:
+        windows = np.lib.stride_tricks.sliding_window_view(a, n, axis=1)
+        out[:, n - 1:] = func(windows, axis=2)
+    return out
+
+
+# 전략: 패널, 파라미터 → 목표 포지션 (종목 × 날짜, 0/1) -------------------------
+def sma_cross(panel: dict, fast: int = 5, slow: int = 20) -> np.ndarray:
+    """단기 이동평균이 장기 이동평균 위에 있으면 보유"""
+    close = _ffill(panel['close'])
+    return (_rolling_mean(close, fast) > _rolling_mean(close, slow)).astype(np.int8)
+
+
+def breakout(panel: dict, entry: int = 20, exit: int = 10) -> np.ndarray:
+    """종가가 직전 entry일 최고가를 넘으면 매수, 직전 exit일 최저가 아래로 내려가면 매도"""
+    close = _ffill(panel['close'])
+    buy = close > _shift(_rolling(close, entry, np.max))
+    sell = close < _shift(_rolling(close, exit, np.min))
+    # 마지막 신호(매수 1 / 매도 0)를 다음 신호까지 유지
+    event = np.where(buy, 1.0, np.where(sell, 0.0, np.nan))
+    return np.nan_to_num(_ffill(event)).astype(np.int8)
+
+
+STRATEGIES = {
+    'sma_cross': (sma_cross, {'fast': 5, 'slow': 20}),
+    'breakout': (breakout, {'entry': 20, 'exit': 10}),
+}
+
+
+# 체결/손익 ---------------------------------------------------------------------
+def simulate(panel: dict, target: np.ndarray, order: str = 'market', offset: float = 0.0,
+             capital: float = 10_000_000, fee: float = FEE_RATE, tax: float = TAX_RATE) -> Dict[str, np.ndarray]:
+    """목표 포지션을 다음 날 주문으로 체결해 종목별 결과 배열 반환"""
+    if order not in ORD_DVSN:
+        raise ValueError(f"주문구분은 {', '.join(ORD_DVSN)} 중 하나여야 합니다: {order}")
+    o, h, l, c = panel['open'], panel['high'], panel['low'], panel['close']
+    n, m = c.shape
+    rows = np.arange(n)[:, None]
+    bar = ~np.isnan(o)
+    desired = _shift(target.astype(np.int8), 0)  # 전일 신호로 당일 주문
+
+    if order == 'market':
+        buy_px = sell_px = o
+        buy_ok = sell_ok = bar
+    else:
+        base = _shift(_ffill(c))  # 기준가 = 전일 종가
+        lower, upper = price_limits_array(base)
+        buy_limit = round_to_tick_array(base * (1 - offset))
+        sell_limit = round_to_tick_array(base * (1 + offset))
+        with np.errstate(invalid='ignore'):
+            # 가격제한폭 밖의 지정가는 접수 거부
+            buy_ok = bar & (buy_limit >= lower) & (buy_limit <= upper) & (l <= buy_limit)
+            sell_ok = bar & (sell_limit >= lower) & (sell_limit <= upper) & (h >= sell_limit)
+        buy_px = np.fmin(o, buy_limit)
+        sell_px = np.fmax(o, sell_limit)
+
+    # 체결된 날에만 목표 포지션으로 바뀌고, 나머지 날은 전날 포지션 유지
+    filled = np.where(desired == 1, buy_ok, sell_ok)
+    last = np.where(filled, np.arange(m), -1)
+    np.maximum.accumulate(last, axis=1, out=last)
+    pos = np.where(last >= 0, desired[rows, np.maximum(last, 0)], 0).astype(np.int8)
+    prev = _shift(pos, 0)
+    buys = (pos == 1) & (prev == 0)
+    sells = (pos == 0) & (prev == 1)
+
+    qty = np.where(buys, np.floor(capital / (np.nan_to_num(buy_px, nan=np.inf) * (1 + fee))), np.nan)
+    qty_held = np.nan_to_num(_ffill(qty))
+    buy_cost = np.where(buys, qty_held * np.nan_to_num(buy_px) * (1 + fee), 0.0)
+    proceeds = np.where(sells, qty_held * np.nan_to_num(sell_px) * (1 - fee - tax), 0.0)
+    cost_held = np.nan_to_num(_ffill(np.where(buys, buy_cost, np.nan)))
+    pnl = np.where(sells, proceeds - cost_held, 0.0)
+
+    cash = capital - np.cumsum(buy_cost, axis=1) + np.cumsum(proceeds, axis=1)
+    equity = cash + np.where(pos == 1, qty_held * np.nan_to_num(_ffill(c)), 0.0)
+    peak = np.maximum.accumulate(equity, axis=1)
+    return {
+        'equity': equity[:, -1],
+        'pnl': equity[:, -1] - capital,
+        'return': (equity[:, -1] / capital - 1) * 100,
+        'trades': buys.sum(axis=1),
+        'closed': sells.sum(axis=1),
+        'wins': (sells & (pnl > 0)).sum(axis=1),
+        'mdd': ((1 - equity / peak).max(axis=1)) * 100,
+        'exposure': pos.sum(axis=1) / np.maximum(bar.sum(axis=1), 1) * 100,
+        'symbol_days': bar.sum(axis=1),
+    }
+
+
+def run(panel: dict, strategy: str, params: Optional[dict] = None, **opts) -> Dict[str, np.ndarray]:
+    """전략 실행 → 종목별 결과 배열"""
+    func, defaults = STRATEGIES[strategy]
+    return simulate(panel, func(panel, **dict(defaults, **(params or {}))), **opts)
+
+
+def summarize(result: Dict[str, np.ndarray], params: dict) -> dict:
+    """종목별 결과 → 파라미터 조합 하나의 요약"""
+    closed = int(result['closed'].sum())
+    return {
+        'params': params,
+        'mean_return': float(result['return'].mean()),
+        'median_return': float(np.median(result['return'])),
+        'pnl': float(result['pnl'].sum()),
+        'trades': int(result['trades'].sum()),
+        'win_rate': float(result['wins'].sum() / closed * 100) if closed else 0.0,
+        'mean_mdd': float(result['mdd'].mean()),
+        'symbol_days': int(result['symbol_days'].sum()),
+    }
+
+
+# 파라미터 스윕 ----------------------------------------------------------------
+def parse_params(text: str) -> Dict[str, List[int]]:
+    """'fast=5,10 slow=20' → {'fast': [5, 10], 'slow': [20]}"""
+    grid = {}
+    for part in (text or '').split():
+        key, sep, values = part.partition('=')
+        if not sep or not values:
+            raise ValueError(f"파라미터 형식 오류: {part} (예: fast=5,10,20)")
+        try:
+            grid[key] = [int(v) for v in values.split(',') if v]
+        except ValueError:
+            raise ValueError(f"파라미터 값은 정수여야 합니다: {part}")
+    return grid
+
+
+def param_grid(strategy: str, text: str) -> List[dict]:
+    """전략 기본값 + 스윕 값의 모든 조합"""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"알 수 없는 전략: {strategy} (가능: {', '.join(STRATEGIES)})")
+    defaults = STRATEGIES[strategy][1]
+    grid = parse_params(text)
+    for key in grid:
+        if key not in defaults:
+            raise ValueError(f"{strategy} 전략에 없는 파라미터: {key} (가능: {', '.join(defaults)})")
+        if min(grid[key]) < 1:
+            raise ValueError(f"파라미터 값은 1 이상이어야 합니다: {key}")
+    keys = list(grid)
+    return [dict(defaults, **dict(zip(keys, combo))) for combo in itertools.product(*grid.values())] \
+        if keys else [dict(defaults)]
+
+
+_PANEL = None
+
+
+def _init_worker(panel: dict):
+    global _PANEL
+    _PANEL = panel
+
+
+def _run_one(task: tuple) -> dict:
+    strategy, params, opts = task
+    return summarize(run(_PANEL, strategy, params, **opts), params)
+
+
+def sweep(panel: dict, strategy: str, grid: List[dict], jobs: int = 0, **opts) -> Tuple[List[dict], float]:
+    """파라미터 조합별 요약 목록과 처리량(종목-일/초) 반환, 패널은 작업 프로세스마다 한 번만 전달"""
+    jobs = min(jobs or os.cpu_count() or 1, len(grid))
+    tasks = [(strategy, params, opts) for params in grid]
+    t0 = time.perf_counter()
+    if jobs <= 1:
+        _init_worker(panel)
+        results = [_run_one(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(panel,)) as pool:
+            results = list(pool.map(_run_one, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+    elapsed = time.perf_counter() - t0
+    throughput = sum(r['symbol_days'] for r in results) / elapsed if elapsed > 0 else 0.0
+    return results, throughput
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+클라이언트 핫패스 벤치마크 - 내장 시뮬레이터(kis_sim) 대상으로 측정하고 기준치와 비교
+
+측정 항목:
+    cold_start.<스크립트>    CLI 시작 시간 (--help, 인터프리터 기동 포함, ms)
+    cold_start.kis.*         kis.py 오프라인 명령 시작 시간 (인터프리터 기동 대비 STARTUP_BUDGET_MS 이내인지 확인)
+    token.cache_hit          get_token 토큰 파일 캐시 적중 (us/op)
+    api_get.overhead         api_get에서 네트워크(같은 요청의 requests 직접 호출)를 뺀 시간 (us/op)
+    api_get.cache_hit        응답 캐시 적중 시 api_get (us/op)
+    paging.holdings          get_holdings 연속조회 처리량 (rows/s)
+    paging.daily_orders      get_daily_orders 연속조회 처리량 (rows/s)
+    format.*                 fmt_num/fmt_price/safe_int 대량 행 (ns/op)
+    resolve_code             종목명 → 코드 (맵/마스터/초성/오타 혼합, us/op)
+
+사용 예:
+    python3 scripts/kis_bench.py --save-baseline            # 기준치 저장
+    python3 scripts/kis_bench.py --compare                  # 기준치 대비 회귀 확인 (회귀 시 종료 코드 1)
+    python3 scripts/kis_bench.py --only paging,api_get --json
+"""
+import argparse
+import gc
+import glob
+import json
+import statistics
+import subprocess
+import sys
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+# 기준치 경로는 실제 HOME 기준 (main이 HOME을 임시 디렉터리로 바꾸기 전에 계산)
+BASELINE_FILE = os.path.expanduser('~/.kis-trading/bench_baseline.json')
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_loadtest import isolated_home, make_config
+from kis_sim import SimServer, _NAMES
+# kis_common 등 ~/.kis-trading 경로를 쓰는 모듈은 isolated_home() 뒤에 각 측정 함수 안에서 import
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# kis.py 오프라인 명령 (API 호출 없이 끝남) → 인자, {config}는 임시 설정 파일
+KIS_OFFLINE = {
+    'help': ['--help'],
+    'setup_check': ['setup', '--config', '{config}', '--check'],
+    'balance_help': ['balance', '--help'],
+    'quote_help': ['quote', '--help'],
+    'order_help': ['order', '--help'],
+}
+STARTUP_BUDGET_MS = 50.0  # 인터프리터 기동(cold_start.python) 대비 허용 시간
+
+_PREFIXES = ('삼성', '현대', 'LG', 'SK', '한화', '롯데', 'CJ', '두산', '포스코', '한국', '대한', '동원', '신세계',
+             '효성', '코오롱', '대웅', '한미', '유한', '녹십자', '농심', '오리온', '하이트', '금호', '동국',
+             '세아', '영풍', '고려', '태광', '대상', '한진', '현대차', '미래', '키움', '메리츠', '한솔', '아모레',
+             '셀트', '에코', '카카오', '네이버')
+_SUFFIXES = ('전자', '화학', '건설', '증권', '생명', '제약', '바이오', '에너지', '홀딩스', '중공업', '물산', '통신',
+             '반도체', '식품', '소재', '로직스', '테크', '시스템', '엔지니어링', '리츠', '화재', '정밀', '전기',
+             '디스플레이', '글로벌')
+_RESOLVE_QUERIES = ('삼성전자', 'SK하이닉스', '카카오', '한화에너지', 'ㄷㅅㅈㄱㅇ', '포스코소재', '롯데식픔',
+                    '현대차글로벌', '오리온바이오', 'ㅋㅋㅇㅌㅅ', '키움증권', '없는종목이름')
+
+
+def timeit(fn: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """fn을 number번 실행하는 시행을 repeat번 반복해 가장 빠른 회당 시간(초)"""
+    best = float('inf')
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - t0) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def bench_cold_start(home: str, runs: int) -> Dict[str, float]:
+    """스크립트별 --help 실행 시간 (ms, runs회 중 최소)"""
+    out = {}
+    env = dict(os.environ, HOME=home, KIS_NO_DAEMON='1')
+    targets = [('python', ['-c', 'pass'])]
+    for path in sorted(glob.glob(os.path.join(SCRIPTS_DIR, '*.py'))):
+        with open(path, encoding='utf-8') as f:
+            src = f.read()
+        if "if __name__ == '__main__':" in src and 'argparse' in src:
+            targets.append((os.path.basename(path)[:-3], [path, '--help']))
+    make_config(home, 'http://127.0.0.1:9', 0, False)  # setup --check용 (연결하지 않음)
+    config = os.path.join(home, 'config.ini')
+    kis = os.path.join(SCRIPTS_DIR, 'kis.py')
+    for name, argv in KIS_OFFLINE.items():
+        targets.append((f"kis.{name}", [kis, *(a.format(config=config) for a in argv)]))
+    for name, argv in targets:
+        best = float('inf')
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, *argv], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            best = min(best, time.perf_counter() - t0)
+        out[f"cold_start.{name}"] = best * 1000
+    return out
+
+
+def bench_client(home: str, scale: float) -> Dict[str, float]:
+    """시뮬레이터(지연 0, 서버 속도 제한 없음)를 대상으로 토큰/api_get/연속조회 측정"""
+    import kis_ratelimit
+    from kis_common import get_token, api_get, _get_session
+    out = {}
+    server = SimServer({'latency_ms': 0, 'jitter_ms': 0, 'rate_limit': 0, 'holdings': 1000,
+                        'page_size': 50}).start()
+    try:
+        cfg = make_config(home, server.url, 1_000_000, False)
+        # 주문/잔고 버킷(초당 10)까지 풀어 대기 없이 버킷 처리 비용만 남긴다
+        kis_ratelimit._limiters[cfg['app_key']] = kis_ratelimit.RateLimiter(
+            cfg['app_key'], {name: (1e6, 1e6) for name in kis_ratelimit.DEFAULT_BUCKETS})
+        token = get_token(cfg)
+        n = max(50, int(2000 * scale))
+        out['token.cache_hit'] = timeit(lambda: get_token(cfg), n) * 1e6
+
+        path = '/uapi/domestic-stock/v1/quotations/inquire-price'
+        params = {"FID_COND_MRKT_DIV_CODE": "J", "FID_INPUT_ISCD": "005930"}
+        headers = {"Content-Type": "application/json; charset=utf-8", "authorization": f"Bearer {token}",
+                   "appkey": cfg['app_key'], "appsecret": cfg['app_secret'], "tr_id": 'FHKST01010100',
+                   "custtype": "P"}
+        session = _get_session(cfg)
+        n = max(50, int(500 * scale))
+        # 같은 요청을 번갈아 보내 서버/네트워크 변동을 상쇄하고 중앙값 차이를 본다
+        raw, full = [], []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            session.get(cfg['base_url'] + path, headers=headers, params=params, timeout=10).json()
+            t1 = time.perf_counter()
+            api_get(cfg, token, path, 'FHKST01010100', params)
+            raw.append(t1 - t0)
+            full.append(time.perf_counter() - t1)
+        out['api_get.overhead'] = max(0.0, statistics.median(full) - statistics.median(raw)) * 1e6
+
+        cache_cfg = dict(cfg, cache_enabled=True)
+        api_get(cache_cfg, token, path, 'FHKST01010100', params)
+        out['api_get.cache_hit'] = timeit(lambda: api_get(cache_cfg, token, path, 'FHKST01010100', params),
+                                          max(100, int(5000 * scale))) * 1e6
+
+        from holdings import get_holdings
+        from history import get_daily_orders
+        rows = len(get_holdings(cfg, token)[0])
+        out['paging.holdings'] = rows / timeit(lambda: get_holdings(cfg, token), max(2, int(10 * scale)), 3)
+
+        today = datetime.today().strftime('%Y%m%d')
+        now = time.time()
+        for i in range(2000):
+            odno = f"{i:010d}"
+            server.state.orders[odno] = {'odno': odno, 'orgn_odno': '', 'ord_dt': today, 'ord_tmd': '090000',
+                                         'pdno': '005930', 'side': '02', 'qty': 1, 'price': 70000,
+                                         'fill_price': 70000, 't': now - 60, 'cancelled': False}
+        rows = len(get_daily_orders(cfg, token, today, today))
+        out['paging.daily_orders'] = rows / timeit(lambda: get_daily_orders(cfg, token, today, today),
+                                                   max(2, int(5 * scale)), 3)
+    finally:
+        server.shutdown()
+    return out
+
+
+def bench_format(n: int = 100_000) -> Dict[str, float]:
+    """대량 행 포맷/변환 (ns/op)"""
+    from kis_common import fmt_num, fmt_price, safe_int
+    values = [str(i * 7919 % 100_000_000) for i in range(n)]
+    ints = [int(v) for v in values]
+    out = {}
+    for name, fn, data in (('format.fmt_num', fmt_num, ints), ('format.fmt_price', fmt_price, ints),
+                           ('format.safe_int', safe_int, values)):
+        out[name] = timeit(lambda: [fn(v) for v in data], 1) / n * 1e9
+    return out
+
+
+def bench_resolve(n: int = 200) -> Dict[str, float]:
+    """종목명 → 코드 (합성 마스터 약 1,000종목 + 주요 종목)"""
+    import kis_symbols
+    from kis_symbols import save_master, SYMBOLS_FILE
+    rows = [(code, name, 'KOSPI') for code, name in _NAMES.items()]
+    i = 0
+    for p in _PREFIXES:
+        for s in _SUFFIXES:
+            rows.append((f"{100000 + i:06d}", p + s, 'KOSDAQ' if i % 3 else 'KOSPI'))
+            i += 1
+    save_master(rows, SYMBOLS_FILE)
+    kis_symbols._master = None
+    from quote import resolve_code
+    resolve_code('삼성전자')  # 마스터 로드
+    return {'resolve_code': timeit(lambda: [resolve_code(q) for q in _RESOLVE_QUERIES], n)
+            / len(_RESOLVE_QUERIES) * 1e6}
+
+
+# 지표 단위와 좋아지는 방향
+def metric_meta(name: str) -> tuple:
+    if name.startswith('cold_start.'):
+        return 'ms', 'lower'
+    if name.startswith('paging.'):
+        return 'rows/s', 'higher'
+    if name.startswith('format.'):
+        return 'ns/op', 'lower'
+    return 'us/op', 'lower'
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> list:
+    """기준치 대비 변화 → [(지표, 기준, 현재, 변화율, 회귀 여부)]"""
+    rows = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        _, better = metric_meta(name)
+        change = value / base - 1
+        worse = change > threshold if better == 'lower' else change < -threshold
+        rows.append((name, base, value, change, worse))
+    return rows
+
+
+def startup_overhead(results: Dict[str, float]) -> Dict[str, float]:
+    """kis.py 오프라인 명령별 인터프리터 기동(cold_start.python) 대비 추가 시간 (ms)"""
+    base = results.get('cold_start.python')
+    if base is None:
+        return {}
+    return {name: value - base for name, value in results.items() if name.startswith('cold_start.kis.')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='클라이언트 핫패스 벤치마크 (시뮬레이터 대상)')
+    parser.add_argument('--only', help='측정 그룹 (쉼표 구분: cold_start,token,api_get,paging,format,resolve)')
+    parser.add_argument('--quick', action='store_true', help='시작 시간/네트워크 측정 반복 횟수를 줄여 빠르게 측정')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help=f'기준치 파일 (기본: {BASELINE_FILE})')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준치로 저장')
+    parser.add_argument('--compare', action='store_true', help='기준치 대비 회귀 확인 (회귀 시 종료 코드 1)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='회귀 판정 변화율 (기본: 0.2 = 20%%)')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_MS,
+                        help=f'kis.py 오프라인 명령 시작 시간 예산 (인터프리터 기동 대비 ms, 기본: {STARTUP_BUDGET_MS:g}, '
+                             f'넘으면 종료 코드 1)')
+    args = parser.parse_args()
+    baseline_path = os.path.expanduser(args.baseline)  # 임시 HOME으로 바꾸기 전에 펼침
+
+    # 토큰/속도 제한/캐시/종목 마스터 파일이 실제 계정 것과 섞이지 않도록 임시 HOME에서 측정
+    home = isolated_home()
+
+    groups = set(args.only.split(',')) if args.only else {'cold_start', 'token', 'api_get', 'paging',
+                                                           'format', 'resolve'}
+    scale = 0.2 if args.quick else 1.0
+    results = {}
+    if 'cold_start' in groups:
+        results.update(bench_cold_start(home, 2 if args.quick else 5))
+    if groups & {'token', 'api_get', 'paging'}:
+        client = bench_client(home, scale)
+        results.update({k: v for k, v in client.items() if k.split('.')[0] in groups})
+    if 'format' in groups:
+        results.update(bench_format())
+    if 'resolve' in groups:
+        results.update(bench_resolve())
+
+    report = {'python': sys.version.split()[0], 'time': datetime.now().isoformat(timespec='seconds'),
+              'results': {k: round(v, 3) for k, v in results.items()}}
+    regressions = []
+    diffs = []
+    if args.compare:
+        try:
+            with open(baseline_path) as f:
+                baseline = json.load(f)['results']
+        except (OSError, ValueError, KeyError):
+            print(f"❌ 기준치 파일을 읽을 수 없습니다: {args.baseline} (--save-baseline으로 먼저 저장)")
+            sys.exit(1)
+        diffs = compare(results, baseline, args.threshold)
+        regressions = [d[0] for d in diffs if d[4]]
+        report['regressions'] = regressions
+    overhead = startup_overhead(results)
+    over_budget = [name for name, ms in overhead.items() if ms > args.startup_budget]
+    if overhead:
+        report['startup'] = {'budget_ms': args.startup_budget, 'over_budget': over_budget,
+                             'overhead_ms': {k: round(v, 1) for k, v in overhead.items()}}
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(f"⏱️ 벤치마크 (Python {report['python']})")
+        print()
+        base_of = {d[0]: d for d in diffs}
+        for name, value in results.items():
+            unit, better = metric_meta(name)
+            line = f"  {name:<32} {value:>12,.1f} {unit:<7}"
+            if name in base_of:
+                _, base, _, change, worse = base_of[name]
+                line += f" 기준 {base:>10,.1f} ({change:+.1%}) {'⚠️ 회귀' if worse else ''}"
+            print(line)
+        if args.compare:
+            print()
+            print(f"{'❌ 회귀 ' + str(len(regressions)) + '건: ' + ', '.join(regressions) if regressions else '✅ 회귀 없음'}"
+                  f" (허용 {args.threshold:.0%})")
+        if overhead:
+            worst = max(overhead, key=overhead.get)
+            print()
+            print(f"{'❌' if over_budget else '✅'} kis 오프라인 명령 시작 시간: 인터프리터 기동 대비 최대 "
+                  f"+{overhead[worst]:.1f}ms ({worst[len('cold_start.kis.'):]}, 예산 {args.startup_budget:g}ms)")
+
+    if args.save_baseline:
+        path = baseline_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        if not args.json:
+            print(f"💾 기준치 저장: {path}")
+    if regressions or over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+KIS 시세 응답 캐시 - TR ID별 TTL, LRU 제한, 선택적 디스크(SQLite) 공유 저장소
+
+키는 (base_url, tr_id, params)이며 TTL이 정의된 시세 TR ID만 캐시한다.
+주문/계좌 TR ID(TTTC*, VTTC*)는 어떤 경우에도 캐시하지 않는다.
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict
+
+_CACHE_DB = os.path.expanduser('~/.kis-trading/cache.db')
+
+# TR ID별 캐시 유효시간(초), 없는 TR ID는 캐시하지 않음
+CACHE_TTL = {
+    'FHKST01010100': 0.5,    # 주식 현재가
+    'FHPUP02100000': 1.0,    # 업종 지수
+    'FHPST01710000': 2.0,    # 거래량 순위
+    'FHPST01700000': 2.0,    # 등락률 순위
+    'CTPF1002R': 86400.0,    # 종목 기본정보 (종목명)
+}
+
+_NEVER_CACHE_PREFIXES = ('TTTC', 'VTTC')
+
+
+def cache_ttl(tr_id: str) -> float:
+    """TR ID의 캐시 유효시간 (0이면 캐시 안함)"""
+    if tr_id.startswith(_NEVER_CACHE_PREFIXES):
+        return 0.0
+    return CACHE_TTL.get(tr_id, 0.0)
+
+
+class ResponseCache:
+    """LRU 메모리 캐시 + 선택적 SQLite 디스크 캐시"""
+
+    def __init__(self, max_size: int = 1024, disk_path: Optional[str] = None):
+        self.max_size = max_size
+        self.disk_path = disk_path
+        self._mem = OrderedDict()  # key → (만료시각, data)
+        self._lock = threading.Lock()
+        self._db = None
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(base_url: str, tr_id: str, params: dict) -> str:
+        return f"{base_url}|{tr_id}|{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+    def _get_db(self):
+        """디스크 캐시 연결 (실패 시 디스크 캐시 비활성화)"""
+        if self._db is None and self.disk_path:
+            try:
+                os.makedirs(os.path.dirname(self.disk_path), exist_ok=True)
+                db = sqlite3.connect(self.disk_path, timeout=1, check_same_thread=False,
+                                     isolation_level=None)
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute('CREATE TABLE IF NOT EXISTS cache '
+                           '(key TEXT PRIMARY KEY, expires REAL, data TEXT)')
+                self._db = db
+            except sqlite3.Error:
+                self.disk_path = None
+        return self._db
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._mem.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return dict(entry[1])
+                del self._mem[key]
+
+            db = self._get_db()
+            if db is not None:
+                try:
+                    row = db.execute('SELECT expires, data FROM cache WHERE key=? AND expires>?',
+                                     (key, now)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row:
+                    data = json.loads(row[1])
+                    self._put_mem(key, row[0], data)
+                    self.stats['disk_hits'] += 1
+                    return dict(data)
+
+            self.stats['misses'] += 1
+            return None
+
+    def _put_mem(self, key: str, expires: float, data: dict):
+        self._mem[key] = (expires, data)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_size:
+            self._mem.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def put(self, key: str, data: dict, ttl: float):
+        expires = time.time() + ttl
+        with self._lock:
+            self._put_mem(key, expires, dict(data))
+            self.stats['stores'] += 1
+            db = self._get_db()
+            if db is not None:
+                try:
+                    db.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?)',
+                               (key, expires, json.dumps(data, ensure_ascii=False)))
+                    if self.stats['stores'] % 256 == 0:
+                        db.execute('DELETE FROM cache WHERE expires<?', (time.time(),))
+                except sqlite3.Error:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            db = self._get_db()
+            if db is not None:
+                try:
+                    db.execute('DELETE FROM cache')
+                except sqlite3.Error:
+                    pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache(cfg: dict) -> Optional[ResponseCache]:
+    """프로세스 공유 응답 캐시 (CACHE_ENABLED=false면 None)"""
+    global _cache
+    if not cfg.get('cache_enabled', True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(cfg.get('cache_size', 1024),
+                                       _CACHE_DB if cfg.get('cache_disk') else None)
+    return _cache
+
+
+def cache_stats() -> Dict[str, int]:
+    """캐시 적중/미스 통계"""
+    return dict(_cache.stats) if _cache else {}
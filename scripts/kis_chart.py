@@ -0,0 +1,194 @@
+"""
+기간별 시세(일/주/월봉) 다운로드 및 컬럼형 디스크 캐시
+
+inquire-daily-itemchartprice(FHKST03010100)는 한 번에 최대 100봉을 최신순으로 돌려주므로
+기간 끝에서부터 거슬러 올라가며 받는다. 받은 봉은 종목별로
+~/.kis-trading/chart/<주기>/<종목코드>.col 에 컬럼 단위로 저장해 두고,
+다음 조회 때는 캐시가 덮지 못하는 기간만 API로 받는다.
+
+파일 구조 (리틀엔디언):
+    헤더 32바이트: magic(8) + 행 수(u4) + 캐시 시작일(i4) + 캐시 종료일(i4) + 예약
+    컬럼: date(i4) open(i4) high(i4) low(i4) close(i4) volume(i8) amount(i8), 각 컬럼 연속 배치
+"""
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from kis_common import api_get
+
+CHART_DIR = os.path.expanduser('~/.kis-trading/chart')
+
+_MAGIC = b'KISCOL1\x00'
+_HEADER = struct.Struct('<8sIii')
+_HEADER_SIZE = 32
+COLUMNS = (
+    ('date', '<i4'), ('open', '<i4'), ('high', '<i4'), ('low', '<i4'), ('close', '<i4'),
+    ('volume', '<i8'), ('amount', '<i8'),
+)
+# API 응답 필드 → 컬럼
+_FIELDS = {
+    'date': 'stck_bsop_date', 'open': 'stck_oprc', 'high': 'stck_hgpr', 'low': 'stck_lwpr',
+    'close': 'stck_clpr', 'volume': 'acml_vol', 'amount': 'acml_tr_pbmn',
+}
+_MAX_ROWS_PER_CALL = 100
+
+
+def _cache_path(code: str, period: str, adjusted: bool) -> str:
+    return os.path.join(CHART_DIR, period + ('' if adjusted else '_raw'), f"{code}.col")
+
+
+def _empty() -> Dict[str, np.ndarray]:
+    return {name: np.empty(0, dtype=dt) for name, dt in COLUMNS}
+
+
+def _day(d: int, delta: int) -> int:
+    return int((datetime.strptime(str(d), '%Y%m%d') + timedelta(days=delta)).strftime('%Y%m%d'))
+
+
+def cached_codes(period: str = 'D', adjusted: bool = True) -> List[str]:
+    """캐시 파일이 있는 종목코드 목록 (정렬)"""
+    directory = os.path.dirname(_cache_path('000000', period, adjusted))
+    try:
+        return sorted(f[:-len('.col')] for f in os.listdir(directory) if f.endswith('.col'))
+    except OSError:
+        return []
+
+
+def load_cache(code: str, period: str = 'D', adjusted: bool = True) -> Optional[tuple]:
+    """캐시 파일을 메모리 매핑으로 읽기 → (컬럼 dict, 캐시 시작일, 캐시 종료일), 없으면 None"""
+    path = _cache_path(code, period, adjusted)
+    try:
+        mm = np.memmap(path, dtype=np.uint8, mode='r')
+    except (OSError, ValueError):
+        return None
+    if len(mm) < _HEADER_SIZE:
+        return None
+    magic, n, cov_start, cov_end = _HEADER.unpack(bytes(mm[:_HEADER.size]))
+    if magic != _MAGIC:
+        return None
+    cols = {}
+    offset = _HEADER_SIZE
+    for name, dt in COLUMNS:
+        size = np.dtype(dt).itemsize * n
+        cols[name] = mm[offset:offset + size].view(dt)
+        offset += size
+    return cols, cov_start, cov_end
+
+
+def save_cache(code: str, cols: Dict[str, np.ndarray], cov_start: int, cov_end: int,
+               period: str = 'D', adjusted: bool = True):
+    """컬럼 캐시 저장 (임시 파일에 쓴 뒤 교체)"""
+    path = _cache_path(code, period, adjusted)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    n = len(cols['date'])
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, n, cov_start, cov_end).ljust(_HEADER_SIZE, b'\x00'))
+        for name, dt in COLUMNS:
+            f.write(np.ascontiguousarray(cols[name], dtype=dt).tobytes())
+    os.replace(tmp, path)
+
+
+def _to_columns(rows: List[dict]) -> Dict[str, np.ndarray]:
+    """API 응답 행 → 날짜 오름차순 컬럼 배열"""
+    rows = [r for r in rows if r.get('stck_bsop_date')]
+    if not rows:
+        return _empty()
+    cols = {}
+    for name, dt in COLUMNS:
+        field = _FIELDS[name]
+        cols[name] = np.array([r.get(field) or 0 for r in rows]).astype(dt)
+    order = np.argsort(cols['date'], kind='stable')
+    return {name: arr[order] for name, arr in cols.items()}
+
+
+def _merge(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """두 컬럼 묶음 병합 (같은 날짜는 new 우선)"""
+    if not len(old['date']):
+        return new
+    if not len(new['date']):
+        return {name: np.array(arr) for name, arr in old.items()}
+    keep = ~np.isin(old['date'], new['date'])
+    merged = {name: np.concatenate([old[name][keep], new[name]]) for name in old}
+    order = np.argsort(merged['date'], kind='stable')
+    return {name: arr[order] for name, arr in merged.items()}
+
+
+def fetch_candles(cfg: dict, token: str, code: str, start: str, end: str,
+                  period: str = 'D', adjusted: bool = True) -> Optional[Dict[str, np.ndarray]]:
+    """API로 기간별 시세 조회 (100봉 단위로 끝에서부터), 실패 시 None"""
+    rows = []
+    cur_end = end
+    while cur_end >= start:
+        params = {
+            "FID_COND_MRKT_DIV_CODE": "J",
+            "FID_INPUT_ISCD": code,
+            "FID_INPUT_DATE_1": start,
+            "FID_INPUT_DATE_2": cur_end,
+            "FID_PERIOD_DIV_CODE": period,
+            "FID_ORG_ADJ_PRC": "0" if adjusted else "1",  # 0:수정주가, 1:원주가
+        }
+        data = api_get(cfg, token, '/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice',
+                       'FHKST03010100', params)
+        if not data:
+            return None
+        page = [r for r in data.get('output2', []) if r.get('stck_bsop_date')]
+        rows.extend(page)
+        if len(page) < _MAX_ROWS_PER_CALL:
+            break
+        oldest = min(r['stck_bsop_date'] for r in page)
+        cur_end = str(_day(int(oldest), -1))
+    return _to_columns(rows)
+
+
+def _slice(cols: Dict[str, np.ndarray], start: int, end: int) -> Dict[str, np.ndarray]:
+    dates = cols['date']
+    lo = np.searchsorted(dates, start, side='left')
+    hi = np.searchsorted(dates, end, side='right')
+    return {name: arr[lo:hi] for name, arr in cols.items()}
+
+
+def get_candles(cfg: dict, token: str, code: str, start: str, end: str,
+                period: str = 'D', adjusted: bool = True) -> Optional[Dict[str, np.ndarray]]:
+    """기간별 시세 (캐시에 없는 기간만 API 조회), 날짜 오름차순 컬럼 배열 dict 반환"""
+    s, e = int(start), int(end)
+    today = int(datetime.today().strftime('%Y%m%d'))
+    cached = load_cache(code, period, adjusted)
+
+    if cached:
+        cols, cov_start, cov_end = cached
+        missing = []
+        if s < cov_start:
+            missing.append((s, _day(cov_start, -1)))
+        if e > cov_end:
+            missing.append((_day(cov_end, 1), e))
+        if not missing:
+            return _slice(cols, s, e)
+    else:
+        cols, cov_start, cov_end = _empty(), s, e
+        missing = [(s, e)]
+
+    merged = cols
+    for ms, me in missing:
+        fresh = fetch_candles(cfg, token, code, str(ms), str(me), period, adjusted)
+        if fresh is None:
+            return None
+        merged = _merge(merged, fresh)
+    cov_start = min(cov_start, s)
+    # 오늘 봉은 장중에 바뀌므로 어제까지만 확정 캐시로 표시
+    cov_end = min(max(cov_end, e), _day(today, -1))
+    save_cache(code, merged, cov_start, cov_end, period, adjusted)
+    return _slice(merged, s, e)
+
+
+def bulk_get_candles(cfg: dict, token: str, codes: List[str], start: str, end: str,
+                     period: str = 'D', adjusted: bool = True,
+                     workers: int = 8) -> Dict[str, Optional[Dict[str, np.ndarray]]]:
+    """여러 종목 기간별 시세 동시 조회 (속도 제한은 api_get 토큰 버킷이 처리)"""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(codes)))) as pool:
+        results = pool.map(lambda c: get_candles(cfg, token, c, start, end, period, adjusted), codes)
+        return dict(zip(codes, results))
@@ -5,19 +5,38 @@ import os
 import sys
 import json
 import time
+import queue
+import threading
 import configparser
-import requests
-from datetime import datetime
-from typing import Optional, Dict
-
-# API 호출 속도 제한
-_last_api_call_time = None
-_MIN_API_INTERVAL = 0.06  # 60ms (초당 ~16건, KIS 제한: 20건)
-
-def load_config(config_path: str) -> dict:
-    """설정 파일 로드"""
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Callable, Iterator, List
+from kis_ratelimit import get_limiter, rate_limit_stats
+from kis_cache import get_cache, cache_ttl, cache_stats
+from kis_symbols import get_master
+from kis_token import TokenManager, get_token_manager, token_stats
+import kis_daemon
+import kis_trace
+
+# HTTP 커넥션 풀 기본값 (config.ini [KIS] 섹션에서 변경 가능)
+_HTTP_POOL_SIZE = 10
+_HTTP_MAX_RETRIES = 2
+_HTTP_BACKOFF = 0.3
+
+# 파싱한 설정 파일 (경로 → (mtime_ns, ConfigParser)), 파일이 바뀌면 다시 읽는다
+_config_cache: Dict[str, tuple] = {}
+
+
+def _read_config(config_path: str) -> configparser.ConfigParser:
+    """설정 파일 읽기 (없으면 안내 후 종료, 같은 프로세스에서는 한 번만 파싱)"""
     config_path = os.path.expanduser(config_path)
-    if not os.path.exists(config_path):
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _config_cache.get(config_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    if mtime is None:
         print(f"❌ 설정 파일을 찾을 수 없습니다: {config_path}")
         print(f"📝 설정 파일을 생성하세요:")
         print(f"   mkdir -p ~/.kis-trading")
@@ -26,63 +45,158 @@ def load_config(config_path: str) -> dict:
 
     cp = configparser.ConfigParser()
     cp.read(config_path, encoding='utf-8')
+    _config_cache[config_path] = (mtime, cp)
+    return cp
+
 
-    if 'KIS' not in cp:
+def account_sections(cp: configparser.ConfigParser) -> List[str]:
+    """계좌 섹션 이름 목록 ([KIS] → '', [KIS:이름] → '이름')"""
+    names = [''] if 'KIS' in cp else []
+    return names + [s[4:] for s in cp.sections() if s.startswith('KIS:')]
+
+
+def load_config(config_path: str, account: str = '') -> dict:
+    """설정 파일 로드 (account: [KIS:이름] 섹션, 비어 있으면 [KIS])"""
+    return _account_config(_read_config(config_path), account)
+
+
+def load_accounts(config_path: str) -> List[dict]:
+    """설정된 모든 계좌 설정 ([KIS] + [KIS:이름] 섹션 순서)"""
+    cp = _read_config(config_path)
+    names = account_sections(cp)
+    if not names:
         print("❌ 설정 파일에 [KIS] 섹션이 없습니다.")
         sys.exit(1)
+    return [_account_config(cp, name) for name in names]
+
+
+def _account_config(cp: configparser.ConfigParser, account: str) -> dict:
+    name = f'KIS:{account}' if account else 'KIS'
+    if name not in cp:
+        print(f"❌ 설정 파일에 [{name}] 섹션이 없습니다.")
+        sys.exit(1)
+
+    section = cp[name]
+    if account:
+        # [KIS:이름] 섹션에 없는 값은 [KIS] 값을 사용 (BASE_URL, 연결/캐시 설정 등)
+        merged = configparser.ConfigParser(interpolation=None)
+        merged.read_dict({name: dict(cp['KIS']) if 'KIS' in cp else {}})
+        merged[name].update(section)
+        section = merged[name]
 
-    section = cp['KIS']
     required = ['APP_KEY', 'APP_SECRET', 'ACCOUNT_NO']
     for key in required:
         if not section.get(key):
-            print(f"❌ 설정값 누락: {key}")
+            print(f"❌ 설정값 누락: {key}" + (f" [{name}]" if account else ''))
             sys.exit(1)
 
     acct = section['ACCOUNT_NO'].replace('-', '')
-    return {
+    cfg = {
         'app_key': section['APP_KEY'],
         'app_secret': section['APP_SECRET'],
         'account_no': acct[:8],
         'product_code': acct[8:10] if len(acct) >= 10 else '01',
         'base_url': section.get('BASE_URL', 'https://openapi.koreainvestment.com:9443'),
+        'http_pool_size': section.getint('HTTP_POOL_SIZE', _HTTP_POOL_SIZE),
+        'http_max_retries': section.getint('HTTP_MAX_RETRIES', _HTTP_MAX_RETRIES),
+        'http_backoff': section.getfloat('HTTP_BACKOFF', _HTTP_BACKOFF),
+        'http_keep_alive': section.getboolean('HTTP_KEEP_ALIVE', True),
+        'rate_limit_per_sec': section.getfloat('RATE_LIMIT_PER_SEC', 0.0),
+        'cache_enabled': section.getboolean('CACHE_ENABLED', True),
+        'cache_disk': section.getboolean('CACHE_DISK', False),
+        'cache_size': section.getint('CACHE_SIZE', 1024),
+        'ws_url': section.get('WS_URL', ''),
+        'stream_max_age': section.getfloat('STREAM_MAX_AGE', 5.0),
+        'trace_log': section.get('TRACE_LOG', '') or os.environ.get('KIS_TRACE_LOG', ''),
+        'account_name': section.get('ACCOUNT_NAME', account),
+        'risk_max_order_amount': section.getint('RISK_MAX_ORDER_AMOUNT', 0),
+        'risk_max_position_pct': section.getfloat('RISK_MAX_POSITION_PCT', 0.0),
+        'risk_max_daily_orders': section.getint('RISK_MAX_DAILY_ORDERS', 0),
+        'risk_dup_window': section.getfloat('RISK_DUP_WINDOW', 10.0),
+        'fee_rate': section.getfloat('FEE_RATE', 0.00015),
+        'sell_tax_rate': section.getfloat('SELL_TAX_RATE', 0.0),
     }
-
-
-# 토큰 캐시
-_token_cache = {'token': None, 'expired': None}
-_TOKEN_FILE = os.path.expanduser('~/.kis-trading/token.json')
-
-
-def _save_token(token: str, expired: str):
-    """토큰 파일 저장 (권한 600)"""
-    os.makedirs(os.path.dirname(_TOKEN_FILE), exist_ok=True)
-    with open(_TOKEN_FILE, 'w') as f:
-        json.dump({'token': token, 'expired': expired}, f)
-    try:
-        os.chmod(_TOKEN_FILE, 0o600)
-    except OSError:
-        pass
-
-
-def _load_token() -> Optional[str]:
-    """토큰 파일 로드 (유효한 경우만)"""
-    try:
-        with open(_TOKEN_FILE) as f:
-            data = json.load(f)
-        if data.get('expired') and datetime.strptime(data['expired'], '%Y-%m-%d %H:%M:%S') > datetime.now():
-            return data['token']
-    except:
-        pass
-    return None
-
-
-def get_token(cfg: dict) -> str:
-    """액세스 토큰 발급/캐시"""
-    # 캐시 확인
-    cached = _load_token()
-    if cached:
-        return cached
-
+    if cfg['trace_log']:
+        kis_trace.enable(cfg['trace_log'])
+    return cfg
+
+
+# base_url별 공유 세션 (TCP/TLS 연결 재사용)
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(cfg: dict) -> 'requests.Session':
+    """base_url별 커넥션 풀 세션 반환 (최초 호출 시 생성)
+
+    requests/urllib3는 여기서 처음 import한다 (설정 확인 등 오프라인 명령의 시작 시간 단축).
+    """
+    base_url = cfg['base_url']
+    session = _sessions.get(base_url)
+    if session is not None:
+        return session
+    t0 = time.perf_counter()
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session is not None:
+            # 다른 스레드가 만드는 동안 기다린 시간도 로딩으로 잡는다
+            if kis_trace.enabled:
+                kis_trace.add('import', time.perf_counter() - t0)
+            return session
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        pool_size = cfg.get('http_pool_size', _HTTP_POOL_SIZE)
+        max_retries = cfg.get('http_max_retries', _HTTP_MAX_RETRIES)
+        # 연결 실패는 모든 메서드 재시도, 응답 오류(5xx)는 GET만 재시도 (주문 중복 방지)
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=cfg.get('http_backoff', _HTTP_BACKOFF),
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=retry)
+        kis_trace.instrument_adapter(adapter)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not cfg.get('http_keep_alive', True):
+            session.headers['Connection'] = 'close'
+        _sessions[base_url] = session
+        if kis_trace.enabled:
+            kis_trace.add('import', time.perf_counter() - t0)
+        return session
+
+
+def http_stats() -> Dict[str, dict]:
+    """base_url별 커넥션 재사용 통계 (요청 수, 신규 연결 수, 재사용 수)"""
+    stats = {}
+    for base_url, session in list(_sessions.items()):
+        requests_cnt = 0
+        connections = 0
+        for adapter in set(session.adapters.values()):
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                requests_cnt += pool.num_requests
+                connections += pool.num_connections
+        stats[base_url] = {
+            'requests': requests_cnt,
+            'connections': connections,
+            'reused': max(requests_cnt - connections, 0),
+        }
+    return stats
+
+
+def _issue_token(cfg: dict) -> Optional[tuple]:
+    """/oauth2/tokenP 토큰 발급 → (토큰, 만료시각), 실패 시 None"""
+    import requests
     url = f"{cfg['base_url']}/oauth2/tokenP"
     body = {
         "grant_type": "client_credentials",
@@ -91,32 +205,92 @@ def get_token(cfg: dict) -> str:
     }
     headers = {"Content-Type": "application/json"}
 
-    resp = requests.post(url, json=body, headers=headers, timeout=10)
+    session = _get_session(cfg)  # 첫 호출의 requests import가 추적 구간에 들어가지 않도록 먼저
+    span = kis_trace.enter('token') if kis_trace.enabled else None
+    try:
+        resp = session.post(url, json=body, headers=headers, timeout=10)
+    except requests.RequestException as e:
+        print(f"❌ 토큰 발급 실패: {e}", file=sys.stderr)
+        return None
+    finally:
+        if span:
+            kis_trace.leave(span)
     if resp.status_code != 200:
-        print(f"❌ 토큰 발급 실패: {resp.status_code} {resp.text}")
-        sys.exit(1)
+        print(f"❌ 토큰 발급 실패: {resp.status_code} {resp.text}", file=sys.stderr)
+        return None
+    try:
+        result = resp.json()
+        return result['access_token'], result['access_token_token_expired']
+    except (ValueError, KeyError):
+        print(f"❌ 토큰 발급 실패: {resp.text[:200]}", file=sys.stderr)
+        return None
+
+
+def _token_manager(cfg: dict) -> TokenManager:
+    return get_token_manager(cfg, lambda: _issue_token(cfg))
+
 
-    result = resp.json()
-    token = result['access_token']
-    expired = result['access_token_token_expired']
-    _save_token(token, expired)
+def get_token(cfg: dict) -> str:
+    """액세스 토큰 (메모리 → kisd → 토큰 파일 → 발급 순)"""
+    manager = _token_manager(cfg)
+    token = manager.cached()
+    if token:
+        return token
+
+    # kisd 실행 중이면 데몬이 보유한 토큰 사용
+    try:
+        resp = kis_daemon.request(cfg, 'get_token')
+    except (kis_daemon.DaemonLost, kis_daemon.DaemonError):
+        resp = None
+    if resp and resp.get('ok'):
+        return resp['result']
+
+    token = manager.get()
+    if token is None:
+        sys.exit(1)
     return token
 
 
-def _wait_rate_limit():
-    """API 호출 속도 제한"""
-    global _last_api_call_time
-    now = time.time()
-    if _last_api_call_time and (now - _last_api_call_time) < _MIN_API_INTERVAL:
-        time.sleep(_MIN_API_INTERVAL - (now - _last_api_call_time))
-    _last_api_call_time = time.time()
+def _wait_rate_limit(cfg: dict, tr_id: str) -> float:
+    """API 호출 속도 제한 (프로세스 간 공유 토큰 버킷), 대기 시간(초) 반환"""
+    if not kis_trace.enabled:
+        return get_limiter(cfg).acquire(tr_id)
+    span = kis_trace.enter('rate_wait')
+    try:
+        return get_limiter(cfg).acquire(tr_id)
+    finally:
+        kis_trace.leave(span)
 
 
+@kis_trace.traced('GET')
 def api_get(cfg: dict, token: str, path: str, tr_id: str, params: dict,
-            _retried: bool = False) -> Optional[dict]:
-    """GET API 호출 (토큰 만료 시 자동 재발급)"""
-    _wait_rate_limit()
+            tr_cont: str = '', _retried: bool = False) -> Optional[dict]:
+    """GET API 호출 (토큰 만료 시 자동 재발급, 시세 TR ID는 응답 캐시 사용)"""
     tr_id = resolve_tr_id(cfg, tr_id)
+
+    # 응답 캐시 확인 (TTL이 정의된 시세 TR ID만)
+    cache = get_cache(cfg) if cache_ttl(tr_id) > 0 else None
+    if cache is not None:
+        cache_key = cache.make_key(cfg['base_url'], tr_id, params)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if kis_trace.enabled:
+                kis_trace.count('cache_hit')
+            return cached
+
+    # kisd 실행 중이면 데몬으로 전달 (조회는 실패 시 직접 재호출해도 안전)
+    try:
+        resp = kis_daemon.request(cfg, 'api_get', path=path, tr_id=tr_id, params=params,
+                                  tr_cont=tr_cont)
+    except kis_daemon.DaemonLost:
+        resp = None
+    if resp is not None:
+        data = resp.get('result')
+        if cache is not None and data is not None:
+            cache.put(cache_key, data, cache_ttl(tr_id))
+        return data
+
+    _wait_rate_limit(cfg, tr_id)
     url = f"{cfg['base_url']}{path}"
     headers = {
         "Content-Type": "application/json; charset=utf-8",
@@ -126,27 +300,73 @@ def api_get(cfg: dict, token: str, path: str, tr_id: str, params: dict,
         "tr_id": tr_id,
         "custtype": "P",
     }
-    resp = requests.get(url, headers=headers, params=params, timeout=10)
+    if tr_cont:
+        headers['tr_cont'] = tr_cont  # N: 연속조회 다음 페이지
+    session = _get_session(cfg)  # 첫 호출의 requests import가 'server' 구간에 들어가지 않도록 먼저
+    if kis_trace.enabled:
+        span = kis_trace.enter('server')
+        resp = session.get(url, headers=headers, params=params, timeout=10)
+        kis_trace.leave_http(span, resp)
+    else:
+        resp = session.get(url, headers=headers, params=params, timeout=10)
     if resp.status_code != 200:
-        print(f"❌ API 오류: {resp.status_code} {resp.text[:200]}")
+        print(f"❌ API 오류: {resp.status_code} {resp.text[:200]}", file=sys.stderr)
         return None
     data = resp.json()
     # 토큰 만료 감지 → 재발급 후 재시도
     if data.get('msg_cd') in ('EGW00123', 'EGW00121') and not _retried:
-        new_token = _force_refresh_token(cfg)
-        return api_get(cfg, new_token, path, tr_id, params, _retried=True)
+        new_token = _force_refresh_token(cfg, token)
+        return api_get(cfg, new_token, path, tr_id, params, tr_cont, _retried=True)
     if data.get('rt_cd') != '0':
-        print(f"❌ API 오류: [{data.get('msg_cd')}] {data.get('msg1')}")
+        print(f"❌ API 오류: [{data.get('msg_cd')}] {data.get('msg1')}", file=sys.stderr)
         return None
     # 연속조회 키를 data에 포함
     data['_tr_cont'] = resp.headers.get('tr_cont', '')
+    if cache is not None:
+        cache.put(cache_key, data, cache_ttl(tr_id))
     return data
 
 
+def get_hashkey(cfg: dict, token: str, body: dict) -> str:
+    """POST 본문 해시키 발급 (/uapi/hashkey), 실패 시 빈 문자열"""
+    import requests
+    headers = {
+        "Content-Type": "application/json; charset=utf-8",
+        "authorization": f"Bearer {token}",
+        "appkey": cfg['app_key'],
+        "appsecret": cfg['app_secret'],
+    }
+    session = _get_session(cfg)
+    span = kis_trace.enter('hashkey') if kis_trace.enabled else None
+    _wait_rate_limit(cfg, 'hashkey')
+    try:
+        resp = session.post(f"{cfg['base_url']}/uapi/hashkey", headers=headers, json=body, timeout=5)
+        if resp.status_code == 200:
+            return resp.json().get('HASH', '')
+    except (requests.RequestException, ValueError):
+        pass
+    finally:
+        if span:
+            kis_trace.leave(span)
+    return ''
+
+
+@kis_trace.traced('POST')
 def api_post(cfg: dict, token: str, path: str, tr_id: str, body: dict,
-             use_hashkey: bool = True, _retried: bool = False) -> Optional[dict]:
-    """POST API 호출 (토큰 만료 시 자동 재발급)"""
-    _wait_rate_limit()
+             use_hashkey: bool = True, hashkey: Optional[str] = None,
+             _retried: bool = False) -> Optional[dict]:
+    """POST API 호출 (토큰 만료 시 자동 재발급, hashkey를 미리 받아 왔으면 재사용)"""
+    # kisd 실행 중이면 데몬으로 전달 (전송 후 응답 유실 시 중복 주문 방지를 위해 재호출 안함)
+    try:
+        resp = kis_daemon.request(cfg, 'api_post', path=path, tr_id=tr_id, body=body,
+                                  use_hashkey=use_hashkey, hashkey=hashkey)
+    except kis_daemon.DaemonLost:
+        # 직접 호출의 타임아웃/연결 끊김과 같이 예외로 올려 호출 측이 결과 불명으로 처리하게 한다
+        print("❌ kisd 연결 끊김: 요청 처리 여부를 확인할 수 없습니다. 주문/체결 내역을 확인하세요.", file=sys.stderr)
+        raise
+    if resp is not None:
+        return resp.get('result')
+
     tr_id = resolve_tr_id(cfg, tr_id)
     url = f"{cfg['base_url']}{path}"
     headers = {
@@ -160,31 +380,190 @@ def api_post(cfg: dict, token: str, path: str, tr_id: str, body: dict,
 
     # 해시키 설정
     if use_hashkey:
-        try:
-            hk_resp = requests.post(
-                f"{cfg['base_url']}/uapi/hashkey",
-                headers=headers, json=body, timeout=5
-            )
-            if hk_resp.status_code == 200:
-                headers['hashkey'] = hk_resp.json().get('HASH', '')
-        except:
-            pass
-
-    resp = requests.post(url, headers=headers, json=body, timeout=10)
+        headers['hashkey'] = hashkey if hashkey is not None else get_hashkey(cfg, token, body)
+
+    _wait_rate_limit(cfg, tr_id)
+    session = _get_session(cfg)
+    if kis_trace.enabled:
+        span = kis_trace.enter('server')
+        resp = session.post(url, headers=headers, json=body, timeout=10)
+        kis_trace.leave_http(span, resp)
+    else:
+        resp = session.post(url, headers=headers, json=body, timeout=10)
     if resp.status_code != 200:
-        print(f"❌ API 오류: {resp.status_code} {resp.text[:200]}")
+        print(f"❌ API 오류: {resp.status_code} {resp.text[:200]}", file=sys.stderr)
         return None
     data = resp.json()
     # 토큰 만료 감지 → 재발급 후 재시도
     if data.get('msg_cd') in ('EGW00123', 'EGW00121') and not _retried:
-        new_token = _force_refresh_token(cfg)
+        new_token = _force_refresh_token(cfg, token)
         return api_post(cfg, new_token, path, tr_id, body, use_hashkey, _retried=True)
     if data.get('rt_cd') != '0':
-        print(f"❌ API 오류: [{data.get('msg_cd')}] {data.get('msg1')}")
+        print(f"❌ API 오류: [{data.get('msg_cd')}] {data.get('msg1')}", file=sys.stderr)
         return None
     return data
 
 
+def next_page_keys(data: dict, items: list) -> Optional[tuple]:
+    """연속조회 키 (CTX_AREA_FK100, CTX_AREA_NK100) 반환, 마지막 페이지면 None"""
+    # tr_cont: F/M = 다음 페이지 있음, D/E = 마지막
+    if data.get('_tr_cont', '') not in ('F', 'M') or not items:
+        return None
+    ctx_fk = data.get('ctx_area_fk100', data.get('CTX_AREA_FK100', ''))
+    ctx_nk = data.get('ctx_area_nk100', data.get('CTX_AREA_NK100', ''))
+    if not ctx_fk and not ctx_nk:
+        return None
+    return ctx_fk, ctx_nk
+
+
+class PageIterator:
+    """연속조회(tr_cont) 페이지 스트리밍
+
+    페이지 응답이 도착하면 다음 페이지 요청을 먼저 보내고 현재 페이지를 넘겨주므로,
+    호출 측이 N페이지를 처리하는 동안 N+1페이지를 받아온다.
+    중간에 API 오류가 나면 순회를 멈추고 failed를 True로 둔다.
+    """
+
+    def __init__(self, cfg: dict, token: str, path: str, tr_id: str, params: dict,
+                 output_key: str = 'output1'):
+        self.cfg = cfg
+        self.token = token
+        self.path = path
+        self.tr_id = tr_id
+        self.params = dict(params)
+        self.output_key = output_key
+        self.failed = False
+        self.pages = 0
+        self.last = None  # 마지막 페이지 응답
+
+    def _fetch(self, params: dict, tr_cont: str) -> Optional[dict]:
+        return api_get(self.cfg, self.token, self.path, self.tr_id, params, tr_cont)
+
+    def __iter__(self) -> Iterator[dict]:
+        from concurrent.futures import ThreadPoolExecutor
+        prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kis-page')
+        try:
+            future = prefetch.submit(self._fetch, self.params, '')
+            while future is not None:
+                data = future.result()
+                if data is None:
+                    self.failed = True
+                    return
+                self.pages += 1
+                self.last = data
+                keys = next_page_keys(data, data.get(self.output_key, []))
+                future = None
+                if keys:
+                    params = dict(self.params, CTX_AREA_FK100=keys[0], CTX_AREA_NK100=keys[1])
+                    future = prefetch.submit(self._fetch, params, 'N')
+                yield data
+        finally:
+            prefetch.shutdown(wait=False)
+
+    def rows(self) -> Iterator[dict]:
+        """페이지 순서대로 행 단위 반환"""
+        for data in self:
+            yield from data.get(self.output_key, [])
+
+
+def split_date_range(start: str, end: str, days: int) -> List[tuple]:
+    """YYYYMMDD 기간을 days일 단위 구간으로 분할"""
+    d0 = datetime.strptime(start, '%Y%m%d')
+    d1 = datetime.strptime(end, '%Y%m%d')
+    shards = []
+    while d0 <= d1:
+        stop = min(d0 + timedelta(days=days - 1), d1)
+        shards.append((d0.strftime('%Y%m%d'), stop.strftime('%Y%m%d')))
+        d0 = stop + timedelta(days=1)
+    return shards
+
+
+def _split_at(start: str, end: str, breaks: List[str]) -> List[tuple]:
+    """기간을 breaks 날짜 직전에서 나눔"""
+    pieces = []
+    for b in sorted(breaks):
+        if start < b <= end:
+            prev = (datetime.strptime(b, '%Y%m%d') - timedelta(days=1)).strftime('%Y%m%d')
+            pieces.append((start, prev))
+            start = b
+    pieces.append((start, end))
+    return pieces
+
+
+_SHARD_END = object()
+_SHARD_BUFFER = 2000  # 뒤 구간이 미리 받아 둘 최대 행 수 (차면 앞 구간을 다 읽을 때까지 대기)
+
+
+class ShardedRows:
+    """기간을 구간으로 나눠 동시 조회하고 날짜 순서대로 행 반환
+
+    make_pages(start, end)는 구간별 PageIterator를 만든다. 첫 구간은 도착하는 대로
+    흘려보내고, 뒤 구간은 동시에 받아 두었다가(구간마다 _SHARD_BUFFER행까지) 순서대로 이어 붙인다.
+    """
+
+    def __init__(self, make_pages: Callable[[str, str], PageIterator], start: str, end: str,
+                 shard_days: int = 31, workers: int = 4, breaks: List[str] = ()):
+        self.make_pages = make_pages
+        # breaks: 구간이 걸치면 안 되는 날짜 (해당 날짜에서 새 구간 시작)
+        self.shards = []
+        for s, e in _split_at(start, end, breaks):
+            self.shards += split_date_range(s, e, shard_days) if shard_days > 0 else [(s, e)]
+        self.workers = workers
+        self.failed = False
+
+    def __iter__(self) -> Iterator[dict]:
+        if len(self.shards) == 1:
+            pages = self.make_pages(*self.shards[0])
+            yield from pages.rows()
+            self.failed = pages.failed
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+        queues = [queue.Queue(maxsize=_SHARD_BUFFER) for _ in self.shards]
+        stop = threading.Event()
+
+        def put(i: int, item) -> bool:
+            # 읽는 쪽이 중간에 그만두면(stop) 막혀 있던 구간 스레드도 끝낸다
+            while not stop.is_set():
+                try:
+                    queues[i].put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def run(i: int):
+            if stop.is_set():
+                return
+            pages = self.make_pages(*self.shards[i])
+            try:
+                for row in pages.rows():
+                    if not put(i, row):
+                        return
+            except Exception as e:
+                print(f"❌ 조회 오류 ({self.shards[i][0]}~{self.shards[i][1]}): {e}", file=sys.stderr)
+                pages.failed = True
+            finally:
+                if pages.failed:
+                    self.failed = True
+                put(i, _SHARD_END)
+
+        # 구간은 순서대로 시작되므로 지금 읽는 구간은 항상 실행 중이거나 끝나 있다 (버퍼가 차도 교착 없음)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(self.shards)),
+                                thread_name_prefix='kis-shard') as pool:
+            for i in range(len(self.shards)):
+                pool.submit(run, i)
+            try:
+                for q in queues:
+                    while True:
+                        row = q.get()
+                        if row is _SHARD_END:
+                            break
+                        yield row
+            finally:
+                stop.set()
+
+
 def safe_int(v, default=0):
     """문자열→int 변환 (실패 시 default)"""
     try:
@@ -206,10 +585,13 @@ VIRTUAL_TR_ID_MAP = {
     # 주문
     'TTTC0012U': 'VTTC0802U',  # 매수
     'TTTC0011U': 'VTTC0801U',  # 매도
+    'TTTC0013U': 'VTTC0803U',  # 정정/취소
     # 잔고/보유종목 조회
     'TTTC8434R': 'VTTC8434R',
+    'TTTC8908R': 'VTTC8908R',  # 매수 가능 조회
     # 일별 주문체결 조회
     'TTTC0081R': 'VTTC0081R',  # 모의투자 TR ID 동일 패턴
+    'CTSC9215R': 'VTSC9215R',  # 3개월 이전
 }
 
 
@@ -220,14 +602,14 @@ def resolve_tr_id(cfg: dict, tr_id: str) -> str:
     return tr_id
 
 
-def _force_refresh_token(cfg: dict) -> str:
-    """토큰 강제 재발급"""
-    # 캐시 파일 삭제
-    try:
-        os.remove(_TOKEN_FILE)
-    except OSError:
-        pass
-    return get_token(cfg)
+def _force_refresh_token(cfg: dict, token: Optional[str] = None) -> str:
+    """서버가 거절한 토큰 재발급 (동시에 거절된 다른 스레드/프로세스와 발급 1회 공유)"""
+    if kis_trace.enabled:
+        kis_trace.count('token_refresh')
+    new_token = _token_manager(cfg).invalidate(token)
+    if new_token is None:
+        sys.exit(1)
+    return new_token
 
 
 def fmt_num(n, suffix='') -> str:
@@ -255,7 +637,10 @@ def fmt_price(n) -> str:
 
 
 def get_stock_name_from_api(cfg: dict, token: str, code: str) -> str:
-    """종목명 조회 (search-stock-info API)"""
+    """종목명 조회 (종목 마스터 → search-stock-info API)"""
+    name = get_master().name_of(code)
+    if name:
+        return name
     params = {"PRDT_TYPE_CD": "300", "PDNO": code}
     data = api_get(cfg, token, '/uapi/domestic-stock/v1/quotations/search-stock-info', 'CTPF1002R', params)
     if data:
@@ -264,7 +649,41 @@ def get_stock_name_from_api(cfg: dict, token: str, code: str) -> str:
     return code
 
 
+def account_label(cfg: dict) -> str:
+    """계좌 표시 이름 (예: 'isa 12345678-01')"""
+    acct = f"{cfg['account_no']}-{cfg['product_code']}"
+    return f"{cfg['account_name']} {acct}" if cfg.get('account_name') else acct
+
+
+def fan_out(accounts: List[dict], fn: Callable[[dict, str], object], workers: int = 4) -> List[tuple]:
+    """계좌별 fn(cfg, token)을 동시에 실행 → [(cfg, 결과)] (설정 순서 유지, 실패한 계좌는 None)
+
+    토큰과 속도 제한은 APP_KEY별로 따로 관리되므로 계좌마다 독립적으로 호출 한도를 쓴다.
+    """
+    def run(cfg: dict):
+        try:
+            return fn(cfg, get_token(cfg))
+        except SystemExit:
+            return None
+        except Exception as e:
+            print(f"❌ [{account_label(cfg)}] 조회 오류: {e}", file=sys.stderr)
+            return None
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(accounts))),
+                            thread_name_prefix='kis-account') as pool:
+        return list(zip(accounts, pool.map(run, accounts)))
+
+
+def add_account_args(parser):
+    """다중 계좌 인자 추가 ([KIS:이름] 섹션)"""
+    parser.add_argument('--account', default='', help='계좌 섹션 이름 ([KIS:이름], 기본: [KIS])')
+    parser.add_argument('--all-accounts', action='store_true', help='설정된 모든 계좌를 동시에 조회해 합산')
+
+
 def add_common_args(parser):
     """공통 인자 추가"""
     parser.add_argument('--config', '-c', default='~/.kis-trading/config.ini',
                         help='설정 파일 경로 (기본: ~/.kis-trading/config.ini)')
+    parser.add_argument('--profile', action=kis_trace.ProfileAction,
+                        help='API 호출별 소요 시간 분석 출력 (대기/토큰/해시키/연결/서버/수신)')
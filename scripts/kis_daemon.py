@@ -0,0 +1,114 @@
+"""
+kisd 상주 프로세스 클라이언트 - Unix 도메인 소켓으로 API 호출 전달
+
+kisd가 실행 중이면 get_token/api_get/api_post가 이 모듈을 통해 요청을 넘긴다.
+데몬이 없거나 연결에 실패하면 None을 반환하고 호출 측이 직접 호출한다.
+
+프로토콜: 요청/응답 모두 한 줄짜리 JSON
+    → {"op": "api_get", "path": ..., "tr_id": ..., "params": {...}}
+    ← {"ok": true, "result": {...}, "output": "데몬 stdout 출력", "errors": "데몬 stderr 출력 (API 오류 등)"}
+kisd 안에서 예외가 나면 응답에 "exception"(예외 이름)이 오고 클라이언트는 DaemonError를 발생시킨다.
+추적이 켜져 있으면 요청에 "trace": true를 붙이고, kisd는 처리 단계별 시간을 "trace"로 돌려준다.
+"""
+import os
+import sys
+import json
+import threading
+import time
+from typing import Optional
+import kis_trace
+
+_DAEMON_DIR = os.path.expanduser('~/.kis-trading')
+
+# KIS_NO_DAEMON=1 이면 항상 직접 호출 (kisd 자신도 이 플래그를 끈다)
+enabled = os.environ.get('KIS_NO_DAEMON') != '1'
+
+_local = threading.local()
+
+
+class DaemonLost(Exception):
+    """요청 전송 후 응답을 받지 못함 (실행 여부 불명)"""
+
+
+class DaemonError(Exception):
+    """kisd가 요청 처리 중 예외로 끝남 (예: 주문 전송 후 응답 타임아웃, 실행 여부 불명)"""
+
+
+def socket_path(cfg: dict) -> str:
+    """설정(base_url + APP_KEY)별 kisd 소켓 경로"""
+    import hashlib
+    key = hashlib.sha1(f"{cfg['base_url']}|{cfg['app_key']}".encode()).hexdigest()[:12]
+    return os.path.join(_DAEMON_DIR, f'kisd-{key}.sock')
+
+
+def _connect(path: str):
+    """스레드별 kisd 연결 (없으면 생성, 실패 시 None)"""
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is not None:
+        return conn
+    if not os.path.exists(path):
+        return None
+    import socket
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(60)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    conn = conns[path] = sock.makefile('rwb')
+    return conn
+
+
+def _drop(path: str):
+    conn = getattr(_local, 'conns', {}).pop(path, None)
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+
+def request(cfg: dict, op: str, **kwargs) -> Optional[dict]:
+    """kisd에 요청 전달, 응답 dict 반환 (데몬 없음/연결 실패 시 None)
+
+    요청을 보낸 뒤 연결이 끊기면 DaemonLost, kisd 안에서 예외가 나면 DaemonError를 발생시킨다.
+    데몬의 stdout/stderr 출력은 이 프로세스의 stdout/stderr로 그대로 옮긴다.
+    """
+    if not enabled:
+        return None
+    path = socket_path(cfg)
+    conn = _connect(path)
+    if conn is None:
+        return None
+    if kis_trace.enabled:
+        kwargs['trace'] = True
+        t0 = time.perf_counter()
+    try:
+        conn.write(json.dumps(dict(kwargs, op=op), ensure_ascii=False).encode() + b'\n')
+        conn.flush()
+    except OSError:
+        _drop(path)
+        return None
+    try:
+        line = conn.readline()
+    except OSError:
+        line = b''
+    if not line:
+        _drop(path)
+        raise DaemonLost(op)
+    resp = json.loads(line)
+    if kis_trace.enabled:
+        kis_trace.merge_remote(resp.get('trace'), time.perf_counter() - t0)
+    if resp.get('output'):
+        print(resp['output'], end='')
+    if resp.get('errors'):
+        print(resp['errors'], end='', file=sys.stderr)
+    if resp.get('exception'):
+        raise DaemonError(f"{resp['exception']}: {resp.get('error', '')}")
+    return resp
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+KIS API 부하 테스트 - 시뮬레이터(kis_sim)에 api_get/api_post를 동시에 보내 처리량과 지연 분포 측정
+
+토큰/속도 제한/캐시 파일이 실제 계정 것과 섞이지 않도록 임시 HOME에서 실행하고 kisd는 쓰지 않는다.
+
+사용 예:
+    python3 scripts/kis_loadtest.py --scenario quote --concurrency 16 --requests 500
+    python3 scripts/kis_loadtest.py --scenario mixed --duration 10 --sim-latency-ms 30 --expire-after 200
+    python3 scripts/kis_loadtest.py --url http://127.0.0.1:9443 --scenario order   # 따로 띄운 kis_sim
+"""
+import argparse
+import atexit
+import json
+import shutil
+import sys
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(__file__))
+import requests
+from kis_sim import SimServer, SIM_CONFIG, _NAMES
+
+_CODES = list(_NAMES)
+
+
+def isolated_home() -> str:
+    """임시 HOME을 만들어 환경변수를 바꾸고 종료 시 삭제 (kisd도 끔)
+
+    kis_* 모듈은 import 시점에 ~/.kis-trading 경로를 정하므로 kis_common 등을 import하기 전에 불러야 한다.
+    """
+    home = tempfile.mkdtemp(prefix='kis-loadtest-')
+    atexit.register(shutil.rmtree, home, True)
+    os.environ['HOME'] = home
+    os.environ['KIS_NO_DAEMON'] = '1'
+    return home
+
+
+def make_config(home: str, url: str, rate_limit: float, cache: bool) -> dict:
+    """시뮬레이터용 설정 (home에 config.ini를 써서 load_config로 읽어 기본값 유지)"""
+    from kis_common import load_config
+    path = os.path.join(home, 'config.ini')
+    with open(path, 'w') as f:
+        f.write(f"[KIS]\nAPP_KEY = SIMAPPKEY{os.getpid()}\nAPP_SECRET = SIMSECRET\nACCOUNT_NO = 12345678-01\n"
+                f"BASE_URL = {url}\nRATE_LIMIT_PER_SEC = {rate_limit}\nCACHE_ENABLED = {str(cache).lower()}\n")
+    return load_config(path)
+
+
+def scenarios(cfg: dict) -> Dict[str, Callable[[int], object]]:
+    """시나리오 이름 → 요청 i번을 보내는 함수 (실패 시 None 반환)"""
+    from kis_common import get_token, api_get, api_post
+
+    def quote(i):
+        return api_get(cfg, get_token(cfg), '/uapi/domestic-stock/v1/quotations/inquire-price', 'FHKST01010100',
+                       {"FID_COND_MRKT_DIV_CODE": "J", "FID_INPUT_ISCD": _CODES[i % len(_CODES)]})
+
+    def balance(i):
+        return api_get(cfg, get_token(cfg), '/uapi/domestic-stock/v1/trading/inquire-balance', 'TTTC8434R', {
+            "CANO": cfg['account_no'], "ACNT_PRDT_CD": cfg['product_code'], "AFHR_FLPR_YN": "N", "OFL_YN": "",
+            "INQR_DVSN": "02", "UNPR_DVSN": "01", "FUND_STTL_ICLD_YN": "N", "FNCG_AMT_AUTO_RDPT_YN": "N",
+            "PRCS_DVSN": "00", "CTX_AREA_FK100": "", "CTX_AREA_NK100": ""})
+
+    def order(i):
+        return api_post(cfg, get_token(cfg), '/uapi/domestic-stock/v1/trading/order-cash', 'TTTC0012U', {
+            "CANO": cfg['account_no'], "ACNT_PRDT_CD": cfg['product_code'], "PDNO": _CODES[i % len(_CODES)],
+            "ORD_DVSN": "01", "ORD_QTY": "1", "ORD_UNPR": "0"})
+
+    def mixed(i):
+        # 조회 위주 (시세 8 : 잔고 1 : 주문 1)
+        return (order if i % 10 == 9 else balance if i % 10 == 4 else quote)(i)
+
+    return {'quote': quote, 'balance': balance, 'order': order, 'mixed': mixed}
+
+
+def percentile(sorted_ms: List[float], p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * p / 100))]
+
+
+def run_load(fn: Callable[[int], object], concurrency: int, requests_n: int = 0,
+             duration: float = 0) -> dict:
+    """동시 concurrency개로 requests_n건(또는 duration초) 실행 → 처리량/지연 통계"""
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+    counter = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker():
+        while True:
+            with lock:
+                i = counter[0]
+                if (requests_n and i >= requests_n) or (deadline and time.perf_counter() >= deadline):
+                    return
+                counter[0] += 1
+            t0 = time.perf_counter()
+            ok = fn(i) is not None
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(ms)
+                if not ok:
+                    failures[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - start
+    ms = sorted(latencies)
+    return {
+        'requests': len(ms), 'failures': failures[0], 'elapsed': elapsed,
+        'throughput': len(ms) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(ms, 50), 'p90_ms': percentile(ms, 90), 'p99_ms': percentile(ms, 99),
+        'max_ms': ms[-1] if ms else 0.0, 'mean_ms': sum(ms) / len(ms) if ms else 0.0,
+    }
+
+
+def print_report(name: str, concurrency: int, r: dict, server_stats: dict = None):
+    from kis_common import fmt_num
+    print(f"📊 {name} | 동시 {concurrency} | {fmt_num(r['requests'])}건 / {r['elapsed']:.2f}초")
+    print(f"  처리량: {r['throughput']:.1f} req/s | 실패: {fmt_num(r['failures'])}건")
+    print(f"  지연(ms): p50 {r['p50_ms']:.1f} | p90 {r['p90_ms']:.1f} | p99 {r['p99_ms']:.1f} | "
+          f"최대 {r['max_ms']:.1f} | 평균 {r['mean_ms']:.1f}")
+    if server_stats:
+        print(f"  서버: 요청 {fmt_num(server_stats['requests'])} | 속도 제한 거절 {fmt_num(server_stats['rate_limited'])} | "
+              f"토큰 오류 {fmt_num(server_stats['expired'])} | 토큰 발급 {fmt_num(server_stats['tokens_issued'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KIS API 부하 테스트 (시뮬레이터 대상)')
+    parser.add_argument('--url', help='이미 실행 중인 시뮬레이터 주소 (기본: 내장 시뮬레이터 자동 실행)')
+    parser.add_argument('--scenario', default='quote', choices=['quote', 'balance', 'order', 'mixed'],
+                        help='요청 종류 (기본: quote)')
+    parser.add_argument('--concurrency', type=int, default=8, help='동시 요청 수 (기본: 8)')
+    parser.add_argument('--requests', type=int, default=200, help='총 요청 수 (기본: 200)')
+    parser.add_argument('--duration', type=float, default=0, help='요청 수 대신 N초 동안 실행')
+    parser.add_argument('--client-rate', type=float, default=0,
+                        help='클라이언트 초당 호출 한도 (RATE_LIMIT_PER_SEC, 기본: 설정 기본값)')
+    parser.add_argument('--cache', action='store_true', help='응답 캐시 사용 (기본: 끔)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    for key in ('latency_ms', 'jitter_ms', 'rate_limit', 'expire_after', 'error_rate', 'holdings', 'page_size'):
+        parser.add_argument('--sim-' + key.replace('_', '-'), dest='sim_' + key, type=type(SIM_CONFIG[key]),
+                            default=SIM_CONFIG[key], help=f'시뮬레이터 {key} (기본: {SIM_CONFIG[key]})')
+    args = parser.parse_args()
+
+    # 토큰/속도 제한/캐시 파일이 실제 계정 것과 섞이지 않도록 임시 HOME에서 실행
+    home = isolated_home()
+    from kis_common import get_token, http_stats, rate_limit_stats
+
+    server = None
+    url = args.url
+    if not url:
+        server = SimServer({k[4:]: v for k, v in vars(args).items() if k.startswith('sim_')}).start()
+        url = server.url
+
+    cfg = make_config(home, url, args.client_rate, args.cache)
+    get_token(cfg)
+    result = run_load(scenarios(cfg)[args.scenario], args.concurrency,
+                      0 if args.duration else args.requests, args.duration)
+    if server:
+        stats = server.state.stats
+    else:
+        try:
+            stats = requests.get(f"{url}/sim/stats", timeout=5).json()
+        except (requests.RequestException, ValueError):
+            stats = None
+
+    if args.json:
+        print(json.dumps({'scenario': args.scenario, 'concurrency': args.concurrency, **result,
+                          'server': stats, 'rate_limit': rate_limit_stats(), 'http': http_stats()},
+                         ensure_ascii=False, indent=2))
+    else:
+        print_report(args.scenario, args.concurrency, result, stats)
+    if server:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
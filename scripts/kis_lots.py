@@ -0,0 +1,312 @@
+"""
+FIFO 로트 회계 - 로컬 체결 내역(kis_trades)으로 종목별 매수 로트를 쌓고 매도 시 먼저 산 로트부터 소진해 실현손익 계산
+
+같은 trades.db에 테이블을 추가한다:
+    lots       종목별 매수 로트 (남은 수량, 매수금액 + 매수 수수료)
+    realized   매도 체결별 실현손익 + 계좌 누적합(cum_*) + 종목 누적합(sym_*)
+    lot_state  반영된 마지막 확정일, 반영한 체결 행 수
+
+체결 내역 중 확정일(synced_through)까지는 한 번만 반영해 저장하고(증분), 오늘처럼 아직 바뀔 수 있는 날은
+조회할 때마다 저장된 로트 위에 메모리로만 반영한다.
+기간 실현손익은 누적합 두 개의 차(끝일까지 - 시작 전날까지)이므로 인덱스 탐색 두 번, O(log n)이다.
+
+수수료/세금은 체결 응답에 없으므로 추정한다: 수수료 = 체결금액 × fee_rate (매수/매도 각각, 원 미만 버림),
+매도 세금 = 매도금액 × 매도일의 세율 (SELL_TAX_SCHEDULE, 설정 SELL_TAX_RATE가 있으면 그 값).
+KIS 기간별 손익(TTTC8708R)과의 차이는 reconcile()로 일자별 비교한다.
+
+로컬 내역에 매수가 없는 매도 수량(동기화 시작 전 매수분)은 unmatched로 따로 세고 손익 0으로 처리한다.
+"""
+import sqlite3
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from kis_trades import TradeStore
+
+DEFAULT_FEE_RATE = 0.00015
+
+# 매도 세율 (증권거래세 + 농특세): (적용 시작일, 세율), 날짜 오름차순
+SELL_TAX_SCHEDULE = (
+    ('00000000', 0.0023),
+    ('20230101', 0.0020),
+    ('20240101', 0.0018),
+    ('20250101', 0.0015),
+    ('20260101', 0.0020),
+)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS lots (
+    account TEXT NOT NULL, pdno TEXT NOT NULL, seq INTEGER NOT NULL,
+    buy_dt TEXT, odno TEXT, qty INTEGER, remaining INTEGER, cost REAL,
+    PRIMARY KEY (account, pdno, seq)
+);
+CREATE TABLE IF NOT EXISTS realized (
+    account TEXT NOT NULL, seq INTEGER NOT NULL,
+    sell_dt TEXT, pdno TEXT, odno TEXT,
+    qty INTEGER, proceeds REAL, cost REAL, fee REAL, tax REAL, pnl REAL, unmatched INTEGER,
+    cum_qty INTEGER, cum_proceeds REAL, cum_cost REAL, cum_fee REAL, cum_tax REAL, cum_pnl REAL,
+    cum_unmatched INTEGER, cum_sells INTEGER,
+    sym_qty INTEGER, sym_proceeds REAL, sym_cost REAL, sym_fee REAL, sym_tax REAL, sym_pnl REAL,
+    sym_unmatched INTEGER, sym_sells INTEGER,
+    PRIMARY KEY (account, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_realized_dt ON realized (account, sell_dt, seq);
+CREATE INDEX IF NOT EXISTS idx_realized_sym ON realized (account, pdno, sell_dt, seq);
+CREATE TABLE IF NOT EXISTS lot_state (
+    account TEXT PRIMARY KEY,
+    through TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    seq INTEGER NOT NULL
+);
+'''
+
+# 실현손익 합계 항목 (누적합 컬럼 cum_*/sym_*), sells는 매도 체결 건수
+FIELDS = ('qty', 'proceeds', 'cost', 'fee', 'tax', 'pnl', 'unmatched', 'sells')
+
+
+def sell_tax_rate(day: str) -> float:
+    """매도일의 세율"""
+    rate = SELL_TAX_SCHEDULE[0][1]
+    for start, r in SELL_TAX_SCHEDULE:
+        if day >= start:
+            rate = r
+    return rate
+
+
+def _prev_day(day: str) -> str:
+    return (datetime.strptime(day, '%Y%m%d') - timedelta(days=1)).strftime('%Y%m%d')
+
+
+def _zero() -> Dict[str, float]:
+    return dict.fromkeys(FIELDS, 0)
+
+
+class LotBook:
+    """계좌 하나의 FIFO 로트 장부 (TradeStore와 같은 DB 연결 사용)"""
+
+    def __init__(self, store: TradeStore, fee_rate: float = DEFAULT_FEE_RATE, tax_rate: float = 0.0):
+        self.store = store
+        self.db = store.db
+        self.account = store.account
+        self.fee_rate = fee_rate
+        self.tax_rate = tax_rate  # 0이면 SELL_TAX_SCHEDULE
+        self.db.executescript(_SCHEMA)
+        self.pending: List[dict] = []  # 미확정일 실현손익 (메모리)
+        self._open: Dict[str, deque] = {}  # 미확정일까지 반영한 종목별 로트 [buy_dt, odno, 남은 수량, 남은 원가]
+
+    # 상태 ----------------------------------------------------------------
+    def _state(self) -> tuple:
+        row = self.db.execute('SELECT through, rows, seq FROM lot_state WHERE account=?', (self.account,)).fetchone()
+        return tuple(row) if row else ('', 0, 0)
+
+    def _exec_rows(self, after: str, through: str) -> List[sqlite3.Row]:
+        return self.db.execute(
+            'SELECT ord_dt, ord_tmd, odno, pdno, sll_buy_dvsn_cd, tot_ccld_qty, avg_prvs, tot_ccld_amt'
+            ' FROM executions WHERE account=? AND ord_dt > ? AND ord_dt <= ? AND tot_ccld_qty > 0'
+            ' ORDER BY ord_dt, ord_tmd, odno', (self.account, after, through)).fetchall()
+
+    def _count_rows(self, through: str) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM executions WHERE account=? AND ord_dt <= ? AND tot_ccld_qty > 0',
+                               (self.account, through)).fetchone()[0]
+
+    def _load_lots(self) -> Dict[str, deque]:
+        lots: Dict[str, deque] = {}
+        for r in self.db.execute('SELECT pdno, buy_dt, odno, remaining, cost, qty FROM lots'
+                                 ' WHERE account=? AND remaining > 0 ORDER BY pdno, seq', (self.account,)):
+            lots.setdefault(r['pdno'], deque()).append([r['buy_dt'], r['odno'], r['remaining'],
+                                                        r['cost'] * r['remaining'] / r['qty']])
+        return lots
+
+    def update(self, rebuild: bool = False) -> int:
+        """확정일까지의 새 체결을 로트/실현손익에 반영 (증분), 반영한 체결 수 반환
+
+        저장된 행 수가 맞지 않으면(과거 기간을 백필한 경우) 처음부터 다시 계산한다.
+        """
+        final = self.store.synced_through() or ''
+        through, rows, seq = self._state()
+        if rebuild or (through and self._count_rows(through) != rows):
+            with self.db:
+                for table in ('lots', 'realized', 'lot_state'):
+                    self.db.execute(f'DELETE FROM {table} WHERE account=?', (self.account,))
+            through, rows, seq = '', 0, 0
+
+        applied = 0
+        if final > through:
+            new = self._exec_rows(through, final)
+            lots = self._load_lots()
+            events, bought = [], set()
+            for r in new:
+                self._apply(lots, r, events, bought)
+            seq = self._store(events, bought, lots, seq)
+            with self.db:
+                self.db.execute('INSERT OR REPLACE INTO lot_state VALUES (?, ?, ?, ?)',
+                                (self.account, final, rows + len(new), seq))
+            applied = len(new)
+            through = final
+
+        # 미확정일(오늘 등)은 메모리에서만 반영
+        self._open = self._load_lots()
+        self.pending = []
+        for r in self._exec_rows(through, '99999999'):
+            self._apply(self._open, r, self.pending, set())
+        return applied
+
+    def _apply(self, lots: Dict[str, deque], r, events: List[dict], bought: set):
+        """체결 한 건 반영 (매수: 로트 추가, 매도: FIFO 소진 후 실현손익 이벤트)"""
+        qty = r['tot_ccld_qty']
+        amount = r['tot_ccld_amt'] or round(qty * r['avg_prvs'])
+        fee = int(amount * self.fee_rate)
+        code, day = r['pdno'], r['ord_dt']
+        if r['sll_buy_dvsn_cd'] == '02':
+            lots.setdefault(code, deque()).append([day, r['odno'], qty, float(amount + fee)])
+            bought.add(code)
+            return
+        tax = int(amount * (self.tax_rate or sell_tax_rate(day)))
+        left, cost = qty, 0.0
+        queue = lots.get(code, deque())
+        while left and queue:
+            lot = queue[0]
+            take = min(left, lot[2])
+            part = lot[3] * take / lot[2]
+            cost += part
+            lot[2] -= take
+            lot[3] -= part
+            left -= take
+            if not lot[2]:
+                queue.popleft()
+        # 매수 내역 없는 수량은 원가를 매도금액(수수료/세금 제외)으로 보아 손익 0
+        unmatched_cost = (amount - fee - tax) * left / qty if left else 0.0
+        events.append({'sell_dt': day, 'pdno': code, 'odno': r['odno'], 'qty': qty, 'unmatched': left,
+                       'proceeds': amount, 'cost': cost + unmatched_cost, 'fee': fee, 'tax': tax,
+                       'pnl': amount - fee - tax - cost - unmatched_cost, 'sells': 1})
+
+    def _store(self, events: List[dict], bought: set, lots: Dict[str, deque], seq: int) -> int:
+        """새 실현손익(누적합 포함)과 로트 변경 저장, 마지막 seq 반환"""
+        last = self.db.execute('SELECT ' + ', '.join(f'cum_{f}' for f in FIELDS) +
+                               ' FROM realized WHERE account=? ORDER BY seq DESC LIMIT 1', (self.account,)).fetchone()
+        cum = dict(zip(FIELDS, last)) if last else _zero()
+        sym: Dict[str, dict] = {}
+        values = []
+        for e in events:
+            code = e['pdno']
+            if code not in sym:
+                row = self.db.execute('SELECT ' + ', '.join(f'sym_{f}' for f in FIELDS) +
+                                      ' FROM realized WHERE account=? AND pdno=? ORDER BY seq DESC LIMIT 1',
+                                      (self.account, code)).fetchone()
+                sym[code] = dict(zip(FIELDS, row)) if row else _zero()
+            seq += 1
+            for f in FIELDS:
+                cum[f] += e[f]
+                sym[code][f] += e[f]
+            values.append((self.account, seq, e['sell_dt'], code, e['odno'], *(e[f] for f in FIELDS[:-1]),
+                           *(cum[f] for f in FIELDS), *(sym[code][f] for f in FIELDS)))
+
+        with self.db:
+            self.db.executemany(f"INSERT INTO realized VALUES ({', '.join('?' * (5 + len(FIELDS) * 3 - 1))})", values)
+            # 로트는 바뀐 종목만 다시 쓴다
+            touched = {e['pdno'] for e in events} | bought
+            for code in touched:
+                self.db.execute('DELETE FROM lots WHERE account=? AND pdno=?', (self.account, code))
+                self.db.executemany(
+                    'INSERT INTO lots (account, pdno, seq, buy_dt, odno, qty, remaining, cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(self.account, code, i, buy_dt, odno, remaining, remaining, cost)
+                     for i, (buy_dt, odno, remaining, cost) in enumerate(lots.get(code, ()))])
+        return seq
+
+    # 조회 ----------------------------------------------------------------
+    def _cum(self, day: str, code: str = '') -> Dict[str, float]:
+        """day까지의 누적 실현손익 (인덱스 탐색 1번)"""
+        prefix = 'sym' if code else 'cum'
+        sql = (f"SELECT {', '.join(f'{prefix}_{f}' for f in FIELDS)}, seq FROM realized WHERE account=?"
+               + (' AND pdno=?' if code else '') + ' AND sell_dt <= ? ORDER BY sell_dt DESC, seq DESC LIMIT 1')
+        row = self.db.execute(sql, (self.account, code, day) if code else (self.account, day)).fetchone()
+        return dict(zip(FIELDS, row)) if row else _zero()
+
+    def realized(self, start: str, end: str, code: str = '') -> Dict[str, float]:
+        """기간(+종목) 실현손익 합계: 수량, 매도금액, 원가, 수수료, 세금, 손익, 매수 내역 없는 수량, 매도 건수"""
+        hi, lo = self._cum(end, code), self._cum(_prev_day(start), code)
+        total = {f: hi[f] - lo[f] for f in FIELDS}
+        for e in self.pending:
+            if start <= e['sell_dt'] <= end and (not code or e['pdno'] == code):
+                for f in FIELDS:
+                    total[f] += e[f]
+        return total
+
+    def realized_by_symbol(self, start: str, end: str) -> Dict[str, Dict[str, float]]:
+        """기간 실현손익 종목별 (매도가 있는 종목만)"""
+        codes = {r[0] for r in self.db.execute(
+            'SELECT DISTINCT pdno FROM realized WHERE account=? AND sell_dt BETWEEN ? AND ?',
+            (self.account, start, end))}
+        codes |= {e['pdno'] for e in self.pending if start <= e['sell_dt'] <= end}
+        return {code: self.realized(start, end, code) for code in sorted(codes)}
+
+    def realized_by_day(self, start: str, end: str) -> Dict[str, Dict[str, float]]:
+        """기간 실현손익 일별 (매도가 있는 날만)"""
+        days = [r[0] for r in self.db.execute(
+            'SELECT DISTINCT sell_dt FROM realized WHERE account=? AND sell_dt BETWEEN ? AND ? ORDER BY sell_dt',
+            (self.account, start, end))]
+        days += sorted({e['sell_dt'] for e in self.pending if start <= e['sell_dt'] <= end} - set(days))
+        return {day: self.realized(day, day) for day in days}
+
+    def open_lots(self, code: str = '') -> Dict[str, List[dict]]:
+        """보유 로트 (미확정일 체결까지 반영), 종목별 오래된 순"""
+        return {c: [{'buy_dt': d, 'odno': o, 'qty': q, 'cost': cost} for d, o, q, cost in queue]
+                for c, queue in sorted(self._open.items()) if queue and (not code or c == code)}
+
+    def unrealized(self, prices: Dict[str, int]) -> Dict[str, dict]:
+        """보유 로트의 평가손익 (현재가 기준, 매도 시 수수료/세금 추정 차감)"""
+        today = datetime.today().strftime('%Y%m%d')
+        out = {}
+        for code, lots in self.open_lots().items():
+            qty = sum(l['qty'] for l in lots)
+            cost = sum(l['cost'] for l in lots)
+            price = prices.get(code, 0)
+            value = qty * price
+            charges = int(value * self.fee_rate) + int(value * (self.tax_rate or sell_tax_rate(today)))
+            out[code] = {'qty': qty, 'cost': cost, 'avg_cost': cost / qty if qty else 0, 'price': price,
+                         'value': value, 'pnl': value - charges - cost if price else 0.0}
+        return out
+
+
+def get_period_profit(cfg: dict, token: str, start: str, end: str):
+    """KIS 기간별 손익 일별 합산 (TTTC8708R) 페이지 스트림"""
+    from kis_common import PageIterator
+    params = {
+        "CANO": cfg['account_no'],
+        "ACNT_PRDT_CD": cfg['product_code'],
+        "INQR_STRT_DT": start,
+        "INQR_END_DT": end,
+        "PDNO": "",
+        "SORT_DVSN": "00",
+        "INQR_DVSN": "00",
+        "CBLC_DVSN": "00",
+        "CTX_AREA_FK100": "",
+        "CTX_AREA_NK100": "",
+    }
+    return PageIterator(cfg, token, '/uapi/domestic-stock/v1/trading/inquire-period-profit', 'TTTC8708R', params)
+
+
+def reconcile(book: LotBook, cfg: dict, token: str, start: str, end: str) -> Optional[List[dict]]:
+    """로컬 실현손익과 KIS 기간별 손익을 일자별로 비교 (조회 실패 시 None)"""
+    from kis_common import safe_int
+    pages = get_period_profit(cfg, token, start, end)
+    remote = {}
+    for r in pages.rows():
+        day = r.get('trad_dt', '')
+        if day:
+            remote[day] = {'pnl': safe_int(r.get('rlzt_pfls')), 'fee': safe_int(r.get('fee')),
+                           'tax': safe_int(r.get('tl_tax')), 'proceeds': safe_int(r.get('sll_amt'))}
+    if pages.failed:
+        return None
+    local = book.realized_by_day(start, end)
+    rows = []
+    for day in sorted(set(remote) | set(local)):
+        mine = local.get(day) or _zero()
+        kis = remote.get(day, {'pnl': 0, 'fee': 0, 'tax': 0, 'proceeds': 0})
+        rows.append({'day': day, 'local_pnl': round(mine['pnl']), 'kis_pnl': kis['pnl'],
+                     'diff_pnl': round(mine['pnl']) - kis['pnl'],
+                     'local_fee': round(mine['fee']), 'kis_fee': kis['fee'],
+                     'local_tax': round(mine['tax']), 'kis_tax': kis['tax'],
+                     'local_proceeds': round(mine['proceeds']), 'kis_proceeds': kis['proceeds'],
+                     'unmatched': mine['unmatched']})
+    return rows
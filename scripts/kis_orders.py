@@ -0,0 +1,279 @@
+"""
+주문 추적 저장소 - 제출한 주문번호(ODNO)를 ~/.kis-trading/trades.db 에 기록하고 체결될 때까지 추적
+
+미체결 주문만 inquire-daily-ccld로 조회한다 (건수가 적으면 주문번호 필터, 많으면 해당 일자 1회 조회).
+주문별 조회 간격은 변화가 없으면 두 배씩 늘리고(최대 MAX_POLL초) 체결이 진행되면 MIN_POLL초로 되돌린다.
+정정/취소는 order-rvsecncl(TTTC0013U)로 보내며, 정정 주문은 새 주문번호로 이어서 추적한다.
+
+체결 시각은 조회로 체결을 확인한 시각이므로 오차는 해당 주문의 조회 간격 이내다.
+지난 영업일에 낸 주문은 당일 주문이라 장 마감으로 끝났으므로 마지막으로 한 번 조회하고 만료 처리한다.
+"""
+import os
+import time
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from kis_common import api_post, safe_int, safe_float
+from kis_trades import TRADES_DB
+from history import account_key, daily_orders_pages
+
+RVSECNCL_PATH = '/uapi/domestic-stock/v1/trading/order-rvsecncl'
+
+MIN_POLL = 0.5
+MAX_POLL = 30.0
+OPEN_STATUSES = ('open', 'partial')
+# 지난 날짜 주문의 최종 상태 (체결 없음 / 일부 체결)
+EXPIRED, PARTIAL_EXPIRED = 'expired', 'partial_expired'
+# 미체결 주문이 이보다 많으면 주문번호별 조회 대신 일자 전체 1회 조회
+_PER_ORDER_LIMIT = 3
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS orders (
+    account TEXT NOT NULL,
+    ord_dt TEXT NOT NULL,
+    odno TEXT NOT NULL,
+    orgn_odno TEXT, krx_orgno TEXT,
+    pdno TEXT, side TEXT,
+    qty INTEGER, price INTEGER, market INTEGER, ref_price INTEGER,
+    submitted_at REAL,
+    status TEXT,
+    filled_qty INTEGER DEFAULT 0, avg_price REAL DEFAULT 0,
+    first_fill_at REAL, filled_at REAL,
+    poll_interval REAL, next_poll_at REAL,
+    PRIMARY KEY (account, ord_dt, odno)
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (account, status);
+'''
+
+
+class OrderStore:
+    """계좌별 주문 추적 저장소"""
+
+    def __init__(self, account: str, path: str = TRADES_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.account = account
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record(self, output: dict, side: str, code: str, qty: int, price: int = 0,
+               market: bool = False, ref_price: int = 0, orgn_odno: str = '',
+               submitted_at: float = None, ord_dt: str = None) -> str:
+        """제출한 주문 기록 (주문 응답 output 기준), 주문번호 반환"""
+        odno = output.get('ODNO', output.get('odno', ''))
+        if not odno:
+            return ''
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO orders (account, ord_dt, odno, orgn_odno, krx_orgno, pdno, side, qty, price,'
+                ' market, ref_price, submitted_at, status, poll_interval, next_poll_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.account, ord_dt or datetime.today().strftime('%Y%m%d'), odno, orgn_odno,
+                 output.get('KRX_FWDG_ORD_ORGNO', output.get('krx_fwdg_ord_orgno', '')), code, side,
+                 qty, 0 if market else price, int(market), ref_price or price,
+                 submitted_at or now, 'open', MIN_POLL, now))
+        return odno
+
+    def get(self, odno: str) -> Optional[dict]:
+        row = self.db.execute('SELECT * FROM orders WHERE account=? AND odno=? ORDER BY ord_dt DESC LIMIT 1',
+                              (self.account, odno)).fetchone()
+        return dict(row) if row else None
+
+    def open_orders(self, due_only: bool = False) -> List[dict]:
+        """미체결 주문 (due_only면 조회 시각이 된 것과 지난 날짜 주문만)"""
+        sql = f"SELECT * FROM orders WHERE account=? AND status IN {OPEN_STATUSES}"
+        args = [self.account]
+        if due_only:
+            sql += ' AND (next_poll_at <= ? OR ord_dt < ?)'
+            args += [time.time(), datetime.today().strftime('%Y%m%d')]
+        return [dict(r) for r in self.db.execute(sql + ' ORDER BY submitted_at', args)]
+
+    def orders(self, since: str, until: str = '99999999') -> List[dict]:
+        return [dict(r) for r in self.db.execute(
+            'SELECT * FROM orders WHERE account=? AND ord_dt BETWEEN ? AND ? ORDER BY submitted_at',
+            (self.account, since, until))]
+
+    def next_poll_at(self) -> Optional[float]:
+        row = self.db.execute(f"SELECT MIN(next_poll_at) FROM orders WHERE account=? AND status IN {OPEN_STATUSES}",
+                              (self.account,)).fetchone()
+        return row[0]
+
+    def update(self, odno: str, ord_dt: str, **fields):
+        cols = ', '.join(f"{k}=?" for k in fields)
+        with self.db:
+            self.db.execute(f"UPDATE orders SET {cols} WHERE account=? AND ord_dt=? AND odno=?",
+                            (*fields.values(), self.account, ord_dt, odno))
+
+    def apply_row(self, order: dict, row: Optional[dict], now: float, final: bool = False) -> bool:
+        """체결 조회 행 반영 + 다음 조회 시각 조정, 변화가 있었으면 True (final이면 남은 미체결은 만료)"""
+        fields = {}
+        if row:
+            filled = safe_int(row.get('tot_ccld_qty'))
+            if filled != order['filled_qty']:
+                fields['filled_qty'] = filled
+                fields['avg_price'] = safe_float(row.get('avg_prvs'))
+                if filled and not order['first_fill_at']:
+                    fields['first_fill_at'] = now
+            if filled >= order['qty']:
+                fields['status'] = 'filled'
+                fields['filled_at'] = order['filled_at'] or now
+            elif row.get('cncl_yn') == 'Y' or (safe_int(row.get('rmn_qty'), -1) == 0 and filled < order['qty']):
+                fields['status'] = 'cancelled'
+            elif filled:
+                fields['status'] = 'partial'
+        if final and fields.get('status', order['status']) in OPEN_STATUSES:
+            fields['status'] = PARTIAL_EXPIRED if fields.get('filled_qty', order['filled_qty']) else EXPIRED
+        if fields.get('status') == order['status']:
+            del fields['status']
+        changed = bool(fields)
+        interval = MIN_POLL if changed else min(order['poll_interval'] * 2, MAX_POLL)
+        self.update(order['odno'], order['ord_dt'], poll_interval=interval, next_poll_at=now + interval, **fields)
+        return changed
+
+
+def slippage_bps(side: str, ref_price: float, avg_price: float) -> float:
+    """기준가 대비 불리한 방향 체결 차이 (bp, 양수면 불리)"""
+    if not ref_price or not avg_price:
+        return 0.0
+    diff = avg_price - ref_price if side == 'buy' else ref_price - avg_price
+    return diff / ref_price * 10000
+
+
+def _fetch_rows(cfg: dict, token: str, due: List[dict]) -> Dict[tuple, dict]:
+    """미체결 주문의 체결 조회 행 → {(주문일자, 주문번호): 행}"""
+    rows = {}
+    if len(due) <= _PER_ORDER_LIMIT:
+        def one(o):
+            return list(daily_orders_pages(cfg, token, o['ord_dt'], o['ord_dt'],
+                                           odno=o['odno'], code=o['pdno']).rows())
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, len(due))) as pool:
+            for o, found in zip(due, pool.map(one, due)):
+                for r in found:
+                    if r.get('odno') == o['odno']:
+                        rows[(o['ord_dt'], o['odno'])] = r
+        return rows
+    for day in sorted({o['ord_dt'] for o in due}):
+        for r in daily_orders_pages(cfg, token, day, day).rows():
+            rows[(day, r.get('odno', ''))] = r
+    return rows
+
+
+def poll_open_orders(cfg: dict, token: str, store: OrderStore, force: bool = False) -> List[dict]:
+    """조회 시각이 된 미체결 주문만 체결 조회 → 상태가 바뀐 주문 목록"""
+    due = store.open_orders(due_only=not force)
+    if not due:
+        return []
+    rows = _fetch_rows(cfg, token, due)
+    now = time.time()
+    today = datetime.today().strftime('%Y%m%d')
+    changed = [o['odno'] for o in due
+               if store.apply_row(o, rows.get((o['ord_dt'], o['odno'])), now, final=o['ord_dt'] < today)]
+    return [store.get(odno) for odno in changed]
+
+
+def wait_for_fills(cfg: dict, token: str, store: OrderStore, timeout: float = 60,
+                   on_change=None) -> List[dict]:
+    """미체결 주문이 없어지거나 timeout초가 지날 때까지 조회 → 남은 미체결 주문"""
+    deadline = time.time() + timeout
+    while store.open_orders() and time.time() < deadline:
+        for o in poll_open_orders(cfg, token, store):
+            if on_change:
+                on_change(o)
+        nxt = store.next_poll_at()
+        if nxt is None:
+            break
+        time.sleep(max(0.0, min(nxt, deadline) - time.time()))
+    return store.open_orders()
+
+
+def lookup_order(cfg: dict, token: str, store: OrderStore, odno: str) -> Optional[dict]:
+    """추적 중인 주문 찾기 (없으면 오늘 체결 조회에서 찾아 추적 시작)"""
+    order = store.get(odno)
+    if order:
+        return order
+    today = datetime.today().strftime('%Y%m%d')
+    for r in daily_orders_pages(cfg, token, today, today, odno=odno).rows():
+        if r.get('odno') == odno:
+            store.record({'ODNO': odno, 'KRX_FWDG_ORD_ORGNO': r.get('ord_gno_brno', '')},
+                         'sell' if r.get('sll_buy_dvsn_cd') == '01' else 'buy', r.get('pdno', ''),
+                         safe_int(r.get('ord_qty')), safe_int(r.get('ord_unpr')), ord_dt=r.get('ord_dt'))
+            order = store.get(odno)
+            store.apply_row(order, r, time.time())
+            return store.get(odno)
+    return None
+
+
+def _rvsecncl(cfg: dict, token: str, order: dict, kind: str, qty: int, price: int,
+              market: bool) -> Optional[dict]:
+    body = {
+        "CANO": cfg['account_no'],
+        "ACNT_PRDT_CD": cfg['product_code'],
+        "KRX_FWDG_ORD_ORGNO": order['krx_orgno'] or '',
+        "ORGN_ODNO": order['odno'],
+        "ORD_DVSN": "01" if market else "00",
+        "RVSE_CNCL_DVSN_CD": kind,  # 01:정정, 02:취소
+        "ORD_QTY": str(qty),
+        "ORD_UNPR": str(0 if market else price),
+        "QTY_ALL_ORD_YN": "N" if qty else "Y",  # 수량 0이면 잔량 전부
+    }
+    return api_post(cfg, token, RVSECNCL_PATH, 'TTTC0013U', body)
+
+
+def cancel_order(cfg: dict, token: str, store: OrderStore, order: dict, qty: int = 0) -> Optional[dict]:
+    """주문 취소 (qty 0이면 잔량 전부)"""
+    result = _rvsecncl(cfg, token, order, '02', qty, 0, False)
+    if result:
+        remaining = order['qty'] - order['filled_qty']
+        if not qty or qty >= remaining:
+            store.update(order['odno'], order['ord_dt'], status='cancelled')
+        else:
+            store.update(order['odno'], order['ord_dt'], qty=order['qty'] - qty)
+    return result
+
+
+def modify_order(cfg: dict, token: str, store: OrderStore, order: dict, price: int,
+                 qty: int = 0, market: bool = False) -> Optional[dict]:
+    """주문 정정 (qty 0이면 잔량 전부), 새 주문번호로 이어서 추적"""
+    result = _rvsecncl(cfg, token, order, '01', qty, price, market)
+    if result:
+        remaining = order['qty'] - order['filled_qty']
+        new_qty = qty if qty and qty < remaining else remaining
+        store.update(order['odno'], order['ord_dt'], status='replaced' if new_qty == remaining else order['status'],
+                     **({} if new_qty == remaining else {'qty': order['qty'] - new_qty}))
+        store.record(result.get('output', {}), order['side'], order['pdno'], new_qty, price, market,
+                     ref_price=order['ref_price'] if market else price, orgn_odno=order['odno'])
+    return result
+
+
+def execution_report(orders: List[dict]) -> dict:
+    """체결 소요시간/슬리피지 집계 (체결이 시작된 주문 기준)"""
+    rows = []
+    for o in orders:
+        if not o['first_fill_at']:
+            continue
+        rows.append({
+            **o,
+            'first_fill_sec': o['first_fill_at'] - o['submitted_at'],
+            'fill_sec': (o['filled_at'] - o['submitted_at']) if o['filled_at'] else None,
+            'slippage_bps': slippage_bps(o['side'], o['ref_price'], o['avg_price']),
+        })
+    firsts = sorted(r['first_fill_sec'] for r in rows)
+    notional = sum(r['filled_qty'] * r['ref_price'] for r in rows)
+    return {
+        'orders': rows,
+        'count': len(rows),
+        'median_first_fill_sec': firsts[len(firsts) // 2] if firsts else 0.0,
+        'p90_first_fill_sec': firsts[min(len(firsts) - 1, int(len(firsts) * 0.9))] if firsts else 0.0,
+        'slippage_bps': (sum(r['slippage_bps'] * r['filled_qty'] * r['ref_price'] for r in rows) / notional
+                         if notional else 0.0),
+    }
+
+
+def open_store(cfg: dict) -> OrderStore:
+    return OrderStore(account_key(cfg))
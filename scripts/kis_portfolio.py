@@ -0,0 +1,229 @@
+"""
+컬럼형 보유 종목 모델 - 잔고 응답을 한 번만 파싱해 타입 배열로 보관하고 분석 지표를 컬럼 단위로 계산
+
+holdings.py는 numpy 없이 동작해야 하므로 표준 라이브러리 array를 컬럼으로 쓴다.
+가격 갱신(update_prices)은 현재가 컬럼만 바꾸고 평가금액/손익/비중은 필요할 때 다시 계산한다.
+"""
+import os
+import json
+from array import array
+from typing import Dict, List, Optional
+
+from kis_common import safe_int, safe_float
+
+# 계좌 총평가금액(예수금 포함) 고점, 예전 보유평가 기준 파일(portfolio_peak.json)과는 값이 달라 따로 둔다
+_PEAK_FILE = os.path.expanduser('~/.kis-trading/equity_peak.json')
+
+SORT_KEYS = ('weight', 'eval', 'pl', 'pl_rate', 'qty', 'name', 'code')
+
+
+class Portfolio:
+    """보유 종목 컬럼 묶음"""
+
+    def __init__(self, codes: List[str], names: List[str], qty: array, avg_price: array,
+                 price: array, purchase: array):
+        self.codes = codes
+        self.names = names
+        self.qty = qty              # 보유수량 (q)
+        self.avg_price = avg_price  # 매입평균가 (d)
+        self.price = price          # 현재가 (q)
+        self.purchase = purchase    # 매입금액 (q)
+        self.markets = [''] * len(codes)
+        self.sectors = [''] * len(codes)
+        self._index = {c: i for i, c in enumerate(codes)}
+        self._derived = None
+        self.equity = 0             # 계좌 총평가금액 (output2.tot_evlu_amt, 예수금 포함)
+
+    @classmethod
+    def from_rows(cls, rows: List[dict], summary: dict = None) -> 'Portfolio':
+        """inquire-balance output1 → 컬럼 (보유수량 0 종목 제외), summary는 output2 첫 행"""
+        rows = [h for h in rows if safe_int(h.get('hldg_qty')) > 0]
+        pf = cls(
+            codes=[h.get('pdno', '') for h in rows],
+            names=[h.get('prdt_name', '???') for h in rows],
+            qty=array('q', [safe_int(h.get('hldg_qty')) for h in rows]),
+            avg_price=array('d', [safe_float(h.get('pchs_avg_pric')) for h in rows]),
+            price=array('q', [safe_int(h.get('prpr')) for h in rows]),
+            purchase=array('q', [safe_int(h.get('pchs_amt')) for h in rows]),
+        )
+        pf.equity = safe_int((summary or {}).get('tot_evlu_amt'))
+        return pf
+
+    @classmethod
+    def combine(cls, portfolios: List['Portfolio']) -> 'Portfolio':
+        """여러 계좌 합산 (같은 종목은 수량/매입금액 합산, 평균가는 매입금액 / 수량)"""
+        codes, names, index = [], [], {}
+        qty, purchase, price = array('q'), array('q'), array('q')
+        markets, sectors = [], []
+        for pf in portfolios:
+            for i, code in enumerate(pf.codes):
+                j = index.get(code)
+                if j is None:
+                    j = index[code] = len(codes)
+                    codes.append(code)
+                    names.append(pf.names[i])
+                    markets.append(pf.markets[i])
+                    sectors.append(pf.sectors[i])
+                    qty.append(0)
+                    purchase.append(0)
+                    price.append(0)
+                qty[j] += pf.qty[i]
+                purchase[j] += pf.purchase[i]
+                price[j] = pf.price[i] or price[j]
+                markets[j] = markets[j] or pf.markets[i]
+                sectors[j] = sectors[j] or pf.sectors[i]
+        avg = array('d', [p / q if q else 0.0 for p, q in zip(purchase, qty)])
+        combined = cls(codes, names, qty, avg, price, purchase)
+        combined.markets, combined.sectors = markets, sectors
+        combined.equity = sum(pf.equity for pf in portfolios)
+        return combined
+
+    def __len__(self):
+        return len(self.codes)
+
+    def update_prices(self, prices: Dict[str, int]):
+        """현재가 컬럼만 갱신 (종목코드 → 현재가)"""
+        for code, p in prices.items():
+            i = self._index.get(code)
+            if i is not None and p > 0:
+                if self.equity:  # 총평가금액도 현재가 변동분만큼 보정
+                    self.equity += (p - self.price[i]) * self.qty[i]
+                self.price[i] = p
+        self._derived = None
+
+    def set_labels(self, markets: Dict[str, str] = None, sectors: Dict[str, str] = None):
+        """시장/업종 라벨 지정 (노출도 계산용)"""
+        for code, m in (markets or {}).items():
+            if code in self._index:
+                self.markets[self._index[code]] = m
+        for code, s in (sectors or {}).items():
+            if code in self._index:
+                self.sectors[self._index[code]] = s
+
+    def _compute(self) -> dict:
+        if self._derived is None:
+            evals = array('q', map(int.__mul__, self.qty, self.price))
+            pl = array('q', map(int.__sub__, evals, self.purchase))
+            total_eval = sum(evals)
+            total_purchase = sum(self.purchase)
+            self._derived = {
+                'eval': evals,
+                'pl': pl,
+                'pl_rate': array('d', [p / b * 100 if b else 0.0 for p, b in zip(pl, self.purchase)]),
+                'weight': array('d', [e / total_eval if total_eval else 0.0 for e in evals]),
+                'total_eval': total_eval,
+                'total_purchase': total_purchase,
+            }
+        return self._derived
+
+    @property
+    def eval_amt(self) -> array:
+        return self._compute()['eval']
+
+    @property
+    def pl(self) -> array:
+        return self._compute()['pl']
+
+    @property
+    def pl_rate(self) -> array:
+        return self._compute()['pl_rate']
+
+    @property
+    def weight(self) -> array:
+        return self._compute()['weight']
+
+    def totals(self) -> dict:
+        """포트폴리오 합계"""
+        d = self._compute()
+        total_pl = d['total_eval'] - d['total_purchase']
+        return {
+            'purchase': d['total_purchase'],
+            'eval': d['total_eval'],
+            'pl': total_pl,
+            'pl_rate': total_pl / d['total_purchase'] * 100 if d['total_purchase'] else 0.0,
+        }
+
+    def exposure(self, labels: List[str]) -> Dict[str, float]:
+        """라벨(시장/업종)별 비중 합계, 비중 내림차순"""
+        out = {}
+        for label, w in zip(labels, self.weight):
+            key = label or '기타'
+            out[key] = out.get(key, 0.0) + w
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]))
+
+    def concentration(self, top: int = 5) -> dict:
+        """집중도 (HHI, 유효 종목 수, 상위 N 비중, 최대 비중 종목)"""
+        w = self.weight
+        hhi = sum(x * x for x in w)
+        top_w = sorted(w, reverse=True)[:top]
+        i_max = max(range(len(w)), key=w.__getitem__) if len(w) else None
+        return {
+            'hhi': hhi,
+            'effective_n': 1 / hhi if hhi else 0.0,
+            f'top{top}': sum(top_w),
+            'max_code': self.codes[i_max] if i_max is not None else '',
+            'max_weight': w[i_max] if i_max is not None else 0.0,
+        }
+
+    @staticmethod
+    def _load_peaks(path: str) -> dict:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def drawdown(self, account: str, path: str = _PEAK_FILE) -> dict:
+        """계좌 총평가금액(예수금 포함) 기준 고점 대비 하락률 (파일은 읽기만 하고 기록은 record_peak)"""
+        peak = max(self._load_peaks(path).get(account, 0), self.equity)
+        # 포지션별로는 매입가 대비 최대 손실 종목
+        worst = min(range(len(self)), key=self.pl_rate.__getitem__) if len(self) else None
+        return {
+            'equity': self.equity,
+            'peak_equity': peak,
+            'drawdown': (self.equity / peak - 1) * 100 if peak else 0.0,
+            'worst_code': self.codes[worst] if worst is not None else '',
+            'worst_pl_rate': self.pl_rate[worst] if worst is not None else 0.0,
+        }
+
+    def record_peak(self, account: str, path: str = _PEAK_FILE):
+        """총평가금액이 기록된 고점보다 클 때만 고점 파일 갱신"""
+        peaks = self._load_peaks(path)
+        if self.equity <= peaks.get(account, 0):
+            return
+        peaks[account] = self.equity
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(peaks, f)
+        except OSError:
+            pass
+
+    def order(self, sort: Optional[str] = None, desc: bool = True) -> List[int]:
+        """정렬된 행 인덱스"""
+        idx = list(range(len(self)))
+        if not sort:
+            return idx
+        if sort in ('name', 'code'):
+            col = self.names if sort == 'name' else self.codes
+            return sorted(idx, key=col.__getitem__, reverse=desc)
+        col = self.qty if sort == 'qty' else getattr(self, {'eval': 'eval_amt'}.get(sort, sort))
+        return sorted(idx, key=col.__getitem__, reverse=desc)
+
+    def rows(self, sort: Optional[str] = None, desc: bool = True) -> List[dict]:
+        """행 단위 dict (출력/내보내기용)"""
+        d = self._compute()
+        return [{
+            'code': self.codes[i],
+            'name': self.names[i],
+            'market': self.markets[i],
+            'sector': self.sectors[i],
+            'qty': self.qty[i],
+            'avg_price': round(self.avg_price[i], 2),
+            'price': self.price[i],
+            'purchase': self.purchase[i],
+            'eval': d['eval'][i],
+            'pl': d['pl'][i],
+            'pl_rate': round(d['pl_rate'][i], 2),
+            'weight': round(d['weight'][i] * 100, 2),
+        } for i in self.order(sort, desc)]
@@ -0,0 +1,164 @@
+"""
+KIS API 호출 속도 제한 - 프로세스 간 공유 토큰 버킷
+
+버킷 상태(잔여 토큰, 마지막 갱신 시각)를 ~/.kis-trading/ratelimit/ 아래 파일에
+저장하고 파일 잠금(fcntl.flock)으로 보호한다. 동시에 실행된 여러 스크립트가
+같은 APP_KEY의 초당 호출 제한을 함께 나눠 쓴다.
+"""
+import os
+import time
+import struct
+import threading
+from typing import Dict, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내부 잠금만 사용
+    fcntl = None
+
+_RATE_LIMIT_DIR = os.path.expanduser('~/.kis-trading/ratelimit')
+_STATE_FMT = 'dd'  # (잔여 토큰, 마지막 갱신 시각)
+_STATE_SIZE = struct.calcsize(_STATE_FMT)
+
+# 1초 구간 최대 호출 수: KIS 제한 20건/초에 여유분 2건 (시계 차이, 서버 쪽 구간 경계)
+DEFAULT_RATE_LIMIT = 18.0
+
+
+def window_bucket(limit: float) -> Tuple[float, float]:
+    """초당 한도 limit → (충전량, 버스트), 1초 구간 최대 호출 수가 limit을 넘지 않게 버스트를 1/4로"""
+    burst = max(1.0, float(int(limit / 4)))
+    return max(limit - burst, 1.0), burst
+
+
+# TR ID 분류별 버킷 (초당 충전량, 최대 버스트)
+# 'total'은 APP_KEY 전체 한도로, 모든 호출이 분류 버킷과 함께 차감한다.
+# 버킷은 어떤 1초 구간에도 최대 버스트 + 충전량만큼 내보내므로 둘의 합을 DEFAULT_RATE_LIMIT로 맞춘다.
+DEFAULT_BUCKETS = {
+    'total': window_bucket(DEFAULT_RATE_LIMIT),      # (14, 4): 1초 구간 최대 18건
+    'quotation': window_bucket(DEFAULT_RATE_LIMIT),  # 시세 조회 (FH*, CTPF*)
+    'trading': (10.0, 5.0),     # 계좌/주문 (TTTC*, VTTC*, CTSC*, VTSC*)
+    'hashkey': (10.0, 5.0),     # /uapi/hashkey
+}
+
+_TRADING_PREFIXES = ('TTTC', 'VTTC', 'CTSC', 'VTSC')
+
+
+def classify_tr_id(tr_id: str) -> str:
+    """TR ID → 버킷 분류"""
+    if tr_id == 'hashkey':
+        return 'hashkey'
+    if tr_id.startswith(_TRADING_PREFIXES):
+        return 'trading'
+    return 'quotation'
+
+
+class TokenBucket:
+    """파일 잠금 기반 프로세스 간 공유 토큰 버킷
+
+    토큰이 부족하면 잔여량을 음수로 예약하고 부족분만큼 대기한다.
+    잠금은 상태 갱신 동안만 잡으므로 대기 중인 호출이 다른 프로세스를 막지 않는다.
+    """
+
+    def __init__(self, path: str, rate: float, burst: float):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._fd = None
+        self._local = None  # 파일을 쓸 수 없을 때의 프로세스 내부 상태
+
+    def _open(self):
+        if self._fd is None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError:
+                self._fd = -1
+        return self._fd
+
+    def _reserve(self, now: float) -> float:
+        """토큰 1개 차감 후 필요한 대기 시간 반환 (잠금 보유 상태에서 호출)"""
+        fd = self._open()
+        if fd >= 0:
+            raw = os.pread(fd, _STATE_SIZE, 0)
+            tokens, last = struct.unpack(_STATE_FMT, raw) if len(raw) == _STATE_SIZE else (self.burst, now)
+        else:
+            tokens, last = self._local or (self.burst, now)
+
+        tokens = min(self.burst, tokens + max(now - last, 0.0) * self.rate) - 1.0
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+
+        if fd >= 0:
+            os.pwrite(fd, struct.pack(_STATE_FMT, tokens, now), 0)
+        else:
+            self._local = (tokens, now)
+        return wait
+
+    def acquire(self) -> float:
+        """토큰 1개 획득 (필요 시 대기), 대기한 시간(초) 반환"""
+        with self._lock:
+            fd = self._open()
+            if fcntl is not None and fd >= 0:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    wait = self._reserve(time.time())
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                wait = self._reserve(time.time())
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """APP_KEY별 분류 버킷 묶음"""
+
+    def __init__(self, app_key: str, buckets: Dict[str, Tuple[float, float]] = None):
+        import hashlib
+        key = hashlib.sha1(app_key.encode()).hexdigest()[:12]
+        self.buckets = {
+            name: TokenBucket(os.path.join(_RATE_LIMIT_DIR, f"{key}-{name}.bucket"), rate, burst)
+            for name, (rate, burst) in (buckets or DEFAULT_BUCKETS).items()
+        }
+        self.stats = {name: {'calls': 0, 'waited': 0.0, 'max_wait': 0.0}
+                      for name in self.buckets if name != 'total'}
+        self.last_wait = 0.0
+
+    def acquire(self, tr_id: str) -> float:
+        """TR ID 분류 버킷 + 전체 버킷에서 토큰 획득, 총 대기 시간(초) 반환"""
+        name = classify_tr_id(tr_id)
+        waited = self.buckets[name].acquire() + self.buckets['total'].acquire()
+        st = self.stats[name]
+        st['calls'] += 1
+        st['waited'] += waited
+        st['max_wait'] = max(st['max_wait'], waited)
+        self.last_wait = waited
+        return waited
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(cfg: dict) -> RateLimiter:
+    """설정(APP_KEY)별 공유 RateLimiter 반환"""
+    app_key = cfg.get('app_key', '')
+    limiter = _limiters.get(app_key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(app_key)
+            if limiter is None:
+                rate = cfg.get('rate_limit_per_sec')
+                buckets = dict(DEFAULT_BUCKETS)
+                if rate:
+                    buckets['total'] = buckets['quotation'] = window_bucket(float(rate))
+                limiter = RateLimiter(app_key, buckets)
+                _limiters[app_key] = limiter
+    return limiter
+
+
+def rate_limit_stats() -> Dict[str, dict]:
+    """APP_KEY별(앞 8자리) 버킷 대기 통계"""
+    return {app_key[:8]: {name: dict(st) for name, st in limiter.stats.items()}
+            for app_key, limiter in _limiters.items()}
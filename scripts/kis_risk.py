@@ -0,0 +1,316 @@
+"""
+주문 전 리스크 점검 - 주문가능현금/보유 종목/당일 주문 현황을 스냅샷으로 들고 주문마다 메모리에서 검사
+
+스냅샷은 계좌별 ~/.kis-trading/risk/<키>.json 에 저장해 연달아 실행한 order.py가 함께 쓴다:
+    cash        주문가능현금 (inquire-psbl-order TTTC8908R)                 CASH_TTL초 지나면 재조회
+    positions   종목별 [보유수량, 주문가능수량, 현재가] + 총평가금액 (TTTC8434R)  POSITIONS_TTL초 지나면 재조회
+    bands       종목별 [기준가, 하한가, 상한가] (현재가 조회, 당일 1회)
+    orders      당일 주문 수, 최근 주문 (중복 검사)
+
+prepare()가 오래된 부분만 REST로 다시 채우고, check()는 dict 조회와 산술만 하므로 주문당 수 마이크로초다.
+재조회에 실패해 필요한 부분(매수: 현금, 비중 한도: 총평가금액, 매도: 보유 종목, 지정가: 기준가)이 없거나 오래됐으면
+check()는 통과시키지 않고 거부한다 (점검 없이 주문하려면 order.py --no-risk-check).
+주문을 낸 뒤에는 record()가 재조회 없이 스냅샷을 고친다 (매수: 현금 차감, 매도: 주문가능수량 차감, 주문 수 +1).
+
+한도 (config.ini [KIS], 0이면 제한 없음):
+    RISK_MAX_ORDER_AMOUNT   주문 1건 최대 금액 (원)
+    RISK_MAX_POSITION_PCT   매수 후 종목 비중 상한 (총평가금액 대비 %)
+    RISK_MAX_DAILY_ORDERS   당일 최대 주문 수
+    RISK_DUP_WINDOW         같은 주문(구분/종목/수량/가격)을 이 시간(초) 안에 다시 내면 중복으로 거부 (기본 10)
+"""
+import os
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from kis_common import api_get, fmt_price, fmt_num, safe_int
+from kis_token import FileLock
+from order import round_to_tick, tick_size, price_limits
+
+_RISK_DIR = os.path.expanduser('~/.kis-trading/risk')
+
+CASH_TTL = 30.0       # 주문가능현금 재조회 간격 (초)
+POSITIONS_TTL = 60.0  # 보유 종목 재조회 간격 (초)
+_RECENT_MAX = 500     # 중복 검사용 최근 주문 보관 수
+_STALE_FACTOR = 2     # check()는 TTL의 이 배수까지 지난 스냅샷을 쓴다 (prepare 직후 확인표 출력 등 여유)
+_NO_SNAPSHOT = "재조회 실패 - 점검 없이 주문하려면 --no-risk-check"
+
+
+def risk_limits(cfg: dict) -> Dict[str, float]:
+    """설정의 리스크 한도"""
+    return {
+        'max_order_amount': cfg.get('risk_max_order_amount', 0),
+        'max_position_pct': cfg.get('risk_max_position_pct', 0.0),
+        'max_daily_orders': cfg.get('risk_max_daily_orders', 0),
+        'dup_window': cfg.get('risk_dup_window', 10.0),
+    }
+
+
+def snapshot_path(cfg: dict) -> str:
+    """계좌(base_url + 계좌번호)별 스냅샷 파일 경로"""
+    key = hashlib.sha1(f"{cfg['base_url']}|{cfg['account_no']}|{cfg['product_code']}".encode()).hexdigest()[:12]
+    return os.path.join(_RISK_DIR, f'{key}.json')
+
+
+def get_buying_power(cfg: dict, token: str, code: str = '', price: int = 0) -> Optional[dict]:
+    """매수 가능 조회 (종목/가격을 비우면 주문가능현금만 의미 있음)"""
+    params = {
+        "CANO": cfg['account_no'],
+        "ACNT_PRDT_CD": cfg['product_code'],
+        "PDNO": code,
+        "ORD_UNPR": str(price) if price else "",
+        "ORD_DVSN": "00" if price else "01",
+        "CMA_EVLU_AMT_ICLD_YN": "N",
+        "OVRS_ICLD_YN": "N",
+    }
+    return api_get(cfg, token, '/uapi/domestic-stock/v1/trading/inquire-psbl-order', 'TTTC8908R', params)
+
+
+def _empty_snapshot(today: str) -> dict:
+    return {'date': today, 'cash': None, 'cash_at': 0.0, 'positions': {}, 'total_eval': 0,
+            'positions_at': 0.0, 'bands': {}, 'order_count': 0, 'recent': []}
+
+
+class RiskGuard:
+    """계좌 하나의 주문 전 점검"""
+
+    def __init__(self, cfg: dict, path: Optional[str] = None):
+        self.cfg = cfg
+        self.limits = risk_limits(cfg)
+        self.path = path or snapshot_path(cfg)
+        self.lock_path = self.path[:-len('.json')] + '.lock'
+        self.snap = self._load()
+
+    # 스냅샷 파일 ---------------------------------------------------------
+    def _load(self) -> dict:
+        """파일의 스냅샷 (없거나 날짜가 바뀌었으면 빈 스냅샷, 당일 주문 수는 주문 추적 저장소에서 채움)"""
+        today = datetime.today().strftime('%Y%m%d')
+        try:
+            with open(self.path) as f:
+                snap = json.load(f)
+            if snap.get('date') == today:
+                return snap
+        except (OSError, ValueError):
+            pass
+        snap = _empty_snapshot(today)
+        try:
+            from kis_orders import open_store
+            store = open_store(self.cfg)
+            orders = store.orders(today)
+            store.close()
+        except sqlite3.Error:
+            orders = []
+        snap['order_count'] = len(orders)
+        snap['recent'] = [[o['submitted_at'], o['side'], o['pdno'], o['qty'], o['price'], bool(o['market'])]
+                          for o in orders[-_RECENT_MAX:]]
+        return snap
+
+    def _save(self):
+        """임시 파일에 쓰고 교체"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.risk-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.snap, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    # 재조회 --------------------------------------------------------------
+    def stale(self, codes: List[str] = ()) -> List[str]:
+        """다시 조회해야 하는 항목 (cash, positions, bands)"""
+        now, s = time.time(), self.snap
+        parts = []
+        if s['cash'] is None or now - s['cash_at'] > CASH_TTL:
+            parts.append('cash')
+        if now - s['positions_at'] > POSITIONS_TTL:
+            parts.append('positions')
+        if any(c not in s['bands'] for c in codes):
+            parts.append('bands')
+        return parts
+
+    def prepare(self, token: str, codes: List[str] = ()) -> List[str]:
+        """오래된 항목만 동시에 재조회, 실패한 항목 설명 목록 반환"""
+        parts = self.stale(codes)
+        if not parts:
+            return []
+        import requests
+        fetch = {'cash': self._fetch_cash, 'positions': self._fetch_positions,
+                 'bands': lambda t: self._fetch_bands(t, [c for c in codes if c not in self.snap['bands']])}
+
+        def run(part: str):
+            try:
+                return fetch[part](token)
+            except requests.RequestException:
+                return None  # 연결 실패도 조회 실패와 같이 (해당 항목이 필요한 주문은 check에서 거부)
+
+        with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            results = dict(zip(parts, pool.map(run, parts)))
+
+        errors = []
+        with FileLock(self.lock_path):
+            # 다른 프로세스가 그 사이 기록한 주문 수/최근 주문을 잃지 않도록 파일을 다시 읽고 합침
+            self.snap = self._load()
+            now = time.time()
+            if 'cash' in results:
+                if results['cash'] is None:
+                    errors.append('주문가능현금 조회 실패')
+                else:
+                    self.snap['cash'], self.snap['cash_at'] = results['cash'], now
+            if 'positions' in results:
+                if results['positions'] is None:
+                    errors.append('보유 종목 조회 실패')
+                else:
+                    self.snap['positions'], self.snap['total_eval'] = results['positions']
+                    self.snap['positions_at'] = now
+            if 'bands' in results:
+                self.snap['bands'].update(results['bands'] or {})
+                missing = [c for c in codes if c not in self.snap['bands']]
+                if missing:
+                    errors.append(f"기준가 조회 실패: {', '.join(missing)}")
+            self._save()
+        return errors
+
+    def _fetch_cash(self, token: str) -> Optional[int]:
+        data = get_buying_power(self.cfg, token)
+        if not data:
+            return None
+        return safe_int(data.get('output', {}).get('ord_psbl_cash'))
+
+    def _fetch_positions(self, token: str) -> Optional[tuple]:
+        from holdings import get_holdings
+        rows, last = get_holdings(self.cfg, token)
+        if last is None:
+            return None
+        positions = {r.get('pdno'): [safe_int(r.get('hldg_qty')), safe_int(r.get('ord_psbl_qty', r.get('hldg_qty'))),
+                                     safe_int(r.get('prpr'))]
+                     for r in rows if safe_int(r.get('hldg_qty')) > 0}
+        summary = last.get('output2', [{}])
+        if isinstance(summary, list):
+            summary = summary[0] if summary else {}
+        return positions, safe_int(summary.get('tot_evlu_amt'))
+
+    def _fetch_bands(self, token: str, codes: List[str]) -> Dict[str, list]:
+        from quote import get_quotes
+        bands = {}
+        for code, data in get_quotes(self.cfg, token, codes).items():
+            out = (data or {}).get('output', {})
+            base = safe_int(out.get('stck_sdpr'))
+            if not base:
+                continue
+            lower, upper = price_limits(base)
+            # 응답에 상/하한가가 있으면 그 값을 쓴다 (배분 등으로 기준가가 바뀐 날)
+            bands[code] = [base, safe_int(out.get('stck_llam')) or lower, safe_int(out.get('stck_mxpr')) or upper]
+        return bands
+
+    # 점검 ----------------------------------------------------------------
+    def check(self, side: str, code: str, qty: int, price: int = 0, market: bool = False) -> List[str]:
+        """주문 한 건 점검 (REST 호출 없음), 위반 내용 목록 반환 (비어 있으면 통과)"""
+        s, lim = self.snap, self.limits
+        errors = []
+        band = s['bands'].get(code)
+        now = time.time()
+        cash_ok = s['cash'] is not None and now - s['cash_at'] <= CASH_TTL * _STALE_FACTOR
+        positions_ok = now - s['positions_at'] <= POSITIONS_TTL * _STALE_FACTOR
+        if qty <= 0:
+            errors.append("수량은 1 이상이어야 합니다")
+        if market:
+            # 시장가 매수는 상한가 기준으로 주문가능금액을 잡는다 (KIS와 같은 방식)
+            ref = band[0] if band else 0
+            unit = band[2] if band else 0
+            if not band:
+                errors.append(f"{code}: 기준가를 몰라 시장가 주문 금액을 계산할 수 없습니다")
+        else:
+            ref = unit = price
+            if price <= 0:
+                errors.append("지정가 주문은 가격이 필요합니다")
+            elif price != round_to_tick(price):
+                errors.append(f"호가단위가 아닙니다: {fmt_price(price)} (호가단위 {fmt_num(tick_size(price))}원,"
+                              f" {fmt_price(round_to_tick(price))} 가능)")
+            if not band:
+                errors.append(f"{code}: 기준가를 몰라 가격제한폭을 확인할 수 없습니다 ({_NO_SNAPSHOT})")
+            elif price > 0 and not band[1] <= price <= band[2]:
+                errors.append(f"가격제한폭 밖: {fmt_price(price)} (하한 {fmt_price(band[1])} ~ 상한 {fmt_price(band[2])})")
+
+        amount = qty * ref
+        if lim['max_order_amount'] and amount > lim['max_order_amount']:
+            errors.append(f"주문 금액 {fmt_price(amount)} > 1건 한도 {fmt_price(lim['max_order_amount'])}")
+        held = s['positions'].get(code)
+        if side == 'buy':
+            if not cash_ok:
+                errors.append(f"주문가능현금을 확인할 수 없습니다 ({_NO_SNAPSHOT})")
+            elif qty * unit > s['cash']:
+                errors.append(f"주문가능현금 부족: 필요 {fmt_price(qty * unit)} > 가능 {fmt_price(s['cash'])}")
+            if lim['max_position_pct'] and (not positions_ok or s['total_eval'] <= 0):
+                errors.append(f"총평가금액을 몰라 종목 비중 한도를 확인할 수 없습니다 ({_NO_SNAPSHOT})")
+            elif lim['max_position_pct']:
+                value = (held[0] * (held[2] or ref) if held else 0) + amount
+                pct = value / s['total_eval'] * 100
+                if pct > lim['max_position_pct']:
+                    errors.append(f"매수 후 비중 {pct:.1f}% > 종목 비중 한도 {lim['max_position_pct']:g}%")
+        elif not positions_ok:
+            errors.append(f"주문가능수량을 확인할 수 없습니다 ({_NO_SNAPSHOT})")
+        else:
+            available = held[1] if held else 0
+            if qty > available:
+                errors.append(f"매도 수량 {fmt_num(qty)}주 > 주문가능 {fmt_num(available)}주")
+        if lim['max_daily_orders'] and s['order_count'] >= lim['max_daily_orders']:
+            errors.append(f"당일 주문 수 한도 도달 ({s['order_count']}/{lim['max_daily_orders']}건)")
+        if lim['dup_window']:
+            key = [side, code, qty, 0 if market else price, market]
+            for ts, *k in reversed(s['recent']):
+                if now - ts > lim['dup_window']:
+                    break
+                if k == key:
+                    errors.append(f"중복 주문: {now - ts:.0f}초 전에 같은 주문을 냈습니다")
+                    break
+        return errors
+
+    def _apply(self, side: str, code: str, qty: int, price: int, market: bool, at: float):
+        s = self.snap
+        band = s['bands'].get(code)
+        if side == 'buy':
+            unit = (band[2] if band else 0) if market else price
+            if s['cash'] is not None:
+                s['cash'] = max(0, s['cash'] - qty * unit)
+            held = s['positions'].setdefault(code, [0, 0, band[0] if band else price])
+            held[0] += qty  # 체결 전이라도 비중 계산에는 포함 (주문가능수량은 체결 후 재조회 때 반영)
+        else:
+            held = s['positions'].get(code)
+            if held:
+                held[1] = max(0, held[1] - qty)
+        s['order_count'] += 1
+        s['recent'].append([at, side, code, qty, 0 if market else price, market])
+        del s['recent'][:-_RECENT_MAX]
+
+    def check_batch(self, orders: List[dict]) -> List[str]:
+        """여러 주문을 순서대로 반영하며 점검 (현금/수량/주문 수 누적), 스냅샷은 바꾸지 않음"""
+        saved = copy.deepcopy(self.snap)
+        errors = []
+        try:
+            for o in orders:
+                label = f"{o['line']}행: " if 'line' in o else ''
+                # 호가단위 검사는 반올림 전 입력 가격으로
+                problems = self.check(o['side'], o['code'], o['qty'], o.get('raw_price', o['price']), o['market'])
+                errors.extend(label + p for p in problems)
+                self._apply(o['side'], o['code'], o['qty'], o['price'], o['market'], time.time())
+        finally:
+            self.snap = saved
+        return errors
+
+    def record(self, side: str, code: str, qty: int, price: int = 0, market: bool = False):
+        """제출한 주문을 스냅샷에 반영 (재조회 없이), 다른 프로세스의 기록과 합쳐 저장"""
+        with FileLock(self.lock_path):
+            self.snap = self._load()
+            self._apply(side, code, qty, price, market, time.time())
+            self._save()
@@ -0,0 +1,290 @@
+"""
+순위 API 기반 종목 스크리너 - 시장 × 순위 종류 × 가격대를 동시에 조회해 컬럼 표로 합치고 로컬에서 필터/정렬
+
+한 번의 스캔은 (시장 × 순위 종류 × 가격대) 조합마다 순위 API를 1번씩 부르며(각 최대 30종목),
+호출을 스레드로 동시에 보내 시세 토큰 버킷의 1초 구간(버스트 + 초당 충전량, 기본 18건) 안에 끝낸다.
+결과는 종목코드로 합쳐 numpy 컬럼 표(dict[str, ndarray])로 만든다.
+
+합친 표는 ~/.kis-trading/screen/<조합 키>.npz 에 저장하고, refresh초 안의 반복 스크린은
+API를 부르지 않고 저장된 표에서 필터/정렬만 다시 한다.
+
+필터 식 (컬럼 전체에 대한 numpy 벡터 연산으로 평가, 파이썬 eval 미사용):
+    "rate >= 3 and turnover > 1e10 and 1000 <= price < 50000"
+    "market == 'KOSDAQ' or vol_rate > 200"
+정렬: "-turnover,rate" (앞에 -는 내림차순, 앞의 키가 우선)
+"""
+import os
+import ast
+import time
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple
+
+import numpy as np
+
+from kis_common import safe_int, safe_float
+from kis_ratelimit import DEFAULT_BUCKETS
+from market import get_volume_rank, get_fluctuation_rank
+
+_SCREEN_DIR = os.path.expanduser('~/.kis-trading/screen')
+
+MARKETS = {'KOSPI': '0001', 'KOSDAQ': '1001'}
+
+# 순위 종류: (이름, 조회 함수, 정렬 구분 코드)
+SOURCES = {
+    'volume': ('거래량', get_volume_rank, '0'),
+    'amount': ('거래대금', get_volume_rank, '3'),
+    'surge': ('거래증가율', get_volume_rank, '1'),
+    'rise': ('상승률', get_fluctuation_rank, '0'),
+    'fall': ('하락률', get_fluctuation_rank, '1'),
+}
+DEFAULT_SOURCES = ('volume', 'amount', 'rise', 'fall')
+
+# 컬럼 이름 → (dtype, 설명)
+COLUMNS = {
+    'code': ('U6', '종목코드'),
+    'name': ('U40', '종목명'),
+    'market': ('U6', '시장 (KOSPI/KOSDAQ)'),
+    'price': ('i8', '현재가'),
+    'change': ('i8', '전일 대비'),
+    'rate': ('f8', '등락률(%)'),
+    'volume': ('i8', '누적 거래량'),
+    'turnover': ('i8', '누적 거래대금(원)'),
+    'vol_rate': ('f8', '거래량 증가율(%)'),
+    'vol_turnover': ('f8', '거래 회전율(%)'),
+    'hits': ('i4', '잡힌 순위 조회 수'),
+    'sources': ('i4', '잡힌 순위 종류 비트마스크'),
+}
+
+
+def parse_bands(text: str) -> List[Tuple[str, str]]:
+    """'0-5000,5000-50000,50000-' → [('', '5000'), ('5000', '50000'), ('50000', '')] (빈 값은 제한 없음)"""
+    bands = []
+    for part in filter(None, (p.strip() for p in (text or '').split(','))):
+        lo, sep, hi = part.partition('-')
+        if not sep or not (lo.strip() or hi.strip()):
+            raise ValueError(f"가격대 형식 오류: {part} (예: 5000-50000, 50000-)")
+        lo, hi = str(int(lo)) if lo.strip() else '', str(int(hi)) if hi.strip() else ''
+        bands.append(('' if lo == '0' else lo, hi))
+    return bands or [('', '')]
+
+
+def scan_calls(markets: List[str], sources: List[str], bands: List[Tuple[str, str]]) -> List[tuple]:
+    """스캔 한 번의 순위 API 호출 목록 [(시장, 순위 종류, 최저가, 최고가), ...]"""
+    for m in markets:
+        if m not in MARKETS:
+            raise ValueError(f"알 수 없는 시장: {m} (가능: {', '.join(MARKETS)})")
+    for s in sources:
+        if s not in SOURCES:
+            raise ValueError(f"알 수 없는 순위 종류: {s} (가능: {', '.join(SOURCES)})")
+    return [(m, s, lo, hi) for m in markets for s in sources for lo, hi in bands]
+
+
+def scan_budget() -> int:
+    """1초 안에 보낼 수 있는 시세 호출 수 (버스트 + 초당 충전량, 이보다 많으면 1초를 넘김)"""
+    rate, burst = DEFAULT_BUCKETS['quotation']
+    return int(rate + burst)
+
+
+def _rank_call(cfg: dict, token: str, call: tuple) -> Optional[dict]:
+    market, source, lo, hi = call
+    _, fetch, sort = SOURCES[source]
+    return fetch(cfg, token, MARKETS[market], sort, lo, hi)
+
+
+def scan(cfg: dict, token: str, calls: List[tuple], workers: int = 8) -> Tuple[Dict[str, np.ndarray], int]:
+    """순위 API를 동시에 호출하고 종목코드로 합친 컬럼 표 반환 (표, 실패한 호출 수)"""
+    if not calls:
+        return empty_table(), 0
+    with ThreadPoolExecutor(max_workers=min(workers, len(calls))) as pool:
+        results = list(pool.map(lambda c: _rank_call(cfg, token, c), calls))
+
+    source_bits = {s: 1 << i for i, s in enumerate(SOURCES)}
+    rows: Dict[str, list] = {}
+    failed = 0
+    for (market, source, _, _), data in zip(calls, results):
+        if not data:
+            failed += 1
+            continue
+        for item in data.get('output') or []:
+            code = item.get('mksc_shrn_iscd') or item.get('stck_shrn_iscd')
+            if not code:
+                continue
+            row = rows.get(code)
+            if row is None:
+                row = rows[code] = [code, item.get('hts_kor_isnm', ''), market,
+                                    safe_int(item.get('stck_prpr')), safe_int(item.get('prdy_vrss')),
+                                    safe_float(item.get('prdy_ctrt')), safe_int(item.get('acml_vol')),
+                                    0, 0.0, 0.0, 0, 0]
+            # 등락률 순위에는 거래대금/증가율/회전율이 없으므로 거래량 순위에서 채운다
+            if 'acml_tr_pbmn' in item:
+                row[7] = safe_int(item.get('acml_tr_pbmn'))
+                row[8] = safe_float(item.get('vol_inrt'))
+                row[9] = safe_float(item.get('vol_tnrt'))
+            row[10] += 1
+            row[11] |= source_bits[source]
+
+    table = empty_table()
+    if rows:
+        cols = list(zip(*rows.values()))
+        for (name, (dtype, _)), values in zip(COLUMNS.items(), cols):
+            table[name] = np.array(values, dtype=dtype)
+    # 거래대금이 없는 종목(등락률 순위에만 잡힘)은 현재가 × 거래량으로 추정
+    missing = table['turnover'] == 0
+    table['turnover'][missing] = table['price'][missing] * table['volume'][missing]
+    return table, failed
+
+
+def empty_table() -> Dict[str, np.ndarray]:
+    return {name: np.empty(0, dtype=dtype) for name, (dtype, _) in COLUMNS.items()}
+
+
+def source_names(mask: int) -> List[str]:
+    """sources 비트마스크 → 순위 종류 이름 목록"""
+    return [SOURCES[s][0] for i, s in enumerate(SOURCES) if mask & (1 << i)]
+
+
+# 필터 식 ------------------------------------------------------------------
+_COMPARE = {ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater,
+            ast.GtE: np.greater_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal}
+_ARITH = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide}
+
+
+def _check(node: ast.AST) -> str:
+    """허용된 문법(비교/and/or/not/사칙연산/컬럼 이름/숫자·문자열 상수)인지 검사, 값 종류('num'/'str'/'bool') 반환
+
+    문자열과 숫자를 섞어 쓰면 numpy가 TypeError를 내므로 여기서 ValueError로 거른다.
+    """
+    if isinstance(node, ast.Expression):
+        return _check(node.body)
+    if isinstance(node, ast.BoolOp):
+        _expect([_check(v) for v in node.values], ('num', 'bool'), node)
+        return 'bool'
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        kind = _check(node.operand)
+        _expect([kind], ('num', 'bool') if isinstance(node.op, ast.Not) else ('num',), node)
+        return 'bool' if isinstance(node.op, ast.Not) else kind
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        kinds = [_check(v) for v in [node.left] + node.comparators]
+        if 'str' in kinds and any(k != 'str' for k in kinds):
+            raise ValueError(f"문자열과 숫자는 비교할 수 없습니다: {ast.unparse(node)}")
+        return 'bool'
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITH:
+        _expect([_check(node.left), _check(node.right)], ('num',), node)
+        return 'num'
+    if isinstance(node, ast.Name):
+        if node.id not in COLUMNS:
+            raise ValueError(f"알 수 없는 컬럼: {node.id} (가능: {', '.join(COLUMNS)})")
+        return 'str' if COLUMNS[node.id][0].startswith('U') else 'num'
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)) \
+            and not isinstance(node.value, bool):
+        return 'str' if isinstance(node.value, str) else 'num'
+    raise ValueError(f"지원하지 않는 식: {ast.unparse(node)}")
+
+
+def _expect(kinds: List[str], allowed: Tuple[str, ...], node: ast.AST):
+    if any(k not in allowed for k in kinds):
+        raise ValueError(f"문자열에는 쓸 수 없는 연산입니다: {ast.unparse(node)}")
+
+
+def _eval(node: ast.AST, table: Dict[str, np.ndarray]):
+    if isinstance(node, ast.BoolOp):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        result = _eval(node.values[0], table)
+        for v in node.values[1:]:
+            result = combine(result, _eval(v, table))
+        return result
+    if isinstance(node, ast.UnaryOp):
+        value = _eval(node.operand, table)
+        return np.logical_not(value) if isinstance(node.op, ast.Not) else np.negative(value)
+    if isinstance(node, ast.Compare):
+        # 1000 <= price < 50000 → (1000 <= price) & (price < 50000)
+        left, result = _eval(node.left, table), None
+        for op, comp in zip(node.ops, node.comparators):
+            right = _eval(comp, table)
+            r = _COMPARE[type(op)](left, right)
+            result = r if result is None else np.logical_and(result, r)
+            left = right
+        return result
+    if isinstance(node, ast.BinOp):
+        return _ARITH[type(node.op)](_eval(node.left, table), _eval(node.right, table))
+    if isinstance(node, ast.Name):
+        return table[node.id]
+    return node.value
+
+
+def compile_filter(expr: str) -> ast.Expression:
+    """필터 식을 파싱/검사 (형식 오류면 ValueError)"""
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"필터 식 문법 오류: {e.msg}")
+    _check(tree)
+    return tree
+
+
+def apply_filter(table: Dict[str, np.ndarray], expr: Optional[str]) -> np.ndarray:
+    """필터 식을 만족하는 행 인덱스 (식이 없으면 전체)"""
+    n = len(table['code'])
+    if not expr:
+        return np.arange(n)
+    mask = np.broadcast_to(np.asarray(_eval(compile_filter(expr).body, table), dtype=bool), (n,))
+    return np.flatnonzero(mask)
+
+
+def sort_rows(table: Dict[str, np.ndarray], rows: np.ndarray, spec: Optional[str]) -> np.ndarray:
+    """'-turnover,rate' 순서로 행 인덱스 정렬 (앞의 키 우선, 같으면 원래 순서 유지)"""
+    keys = []
+    for key in filter(None, (k.strip() for k in (spec or '').split(','))):
+        desc = key.startswith('-')
+        name = key.lstrip('+-')
+        if name not in COLUMNS:
+            raise ValueError(f"알 수 없는 정렬 컬럼: {name} (가능: {', '.join(COLUMNS)})")
+        col = table[name][rows]
+        if col.dtype.kind == 'U':
+            col = np.unique(col, return_inverse=True)[1]
+        keys.append(-col if desc else col)
+    if not keys:
+        return rows
+    return rows[np.lexsort(keys[::-1])]
+
+
+# 스크린 캐시 --------------------------------------------------------------
+def screen_key(cfg: dict, calls: List[tuple]) -> str:
+    """서버(실전/모의) + 호출 조합별 캐시 키"""
+    text = cfg['base_url'] + '|' + ';'.join(','.join(c) for c in calls)
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def _screen_path(key: str) -> str:
+    return os.path.join(_SCREEN_DIR, f'{key}.npz')
+
+
+def load_screen(key: str, refresh: float) -> Optional[Tuple[Dict[str, np.ndarray], float]]:
+    """refresh초 안에 저장된 표 (표, 경과 초), 없거나 오래됐으면 None"""
+    path = _screen_path(key)
+    try:
+        age = time.time() - os.path.getmtime(path)
+        if refresh <= 0 or age > refresh:
+            return None
+        with np.load(path) as data:
+            table = {name: data[name] for name in COLUMNS}
+        return table, age
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_screen(key: str, table: Dict[str, np.ndarray]):
+    """임시 파일에 쓰고 교체 (동시에 실행된 스크린이 반쯤 쓴 파일을 읽지 않음)"""
+    os.makedirs(_SCREEN_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=_SCREEN_DIR, prefix='.screen-', suffix='.npz')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **table)
+        os.replace(tmp, _screen_path(key))
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
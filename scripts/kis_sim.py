@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+KIS Open API 로컬 시뮬레이터 - 실전/모의 서버 없이 스크립트를 실행하고 부하 테스트하기 위한 대역 서버
+
+스크립트가 쓰는 엔드포인트/TR ID를 실제와 같은 응답 형태로 흉내 낸다:
+    토큰/실시간 접속키/해시키, 현재가, 업종 지수, 거래량/등락률 순위, 종목 정보, 기간별 시세,
+    잔고(tr_cont 연속조회), 매수 가능, 일별 주문체결, 기간별 손익, 현금 주문, 정정/취소
+
+조절 가능한 항목 (SimConfig):
+    latency_ms/jitter_ms     응답 지연
+    rate_limit               APP_KEY당 초당 허용 건수 (초과 시 HTTP 500 + EGW00201, 0이면 제한 없음)
+    expire_after             토큰 하나로 N건 처리 후 만료 (EGW00123, 0이면 만료 없음)
+    error_rate               무작위 HTTP 500 비율
+    holdings/page_size       보유 종목 수, 잔고 페이지당 행 수
+    fill_delay               주문 후 체결까지 걸리는 시간(초)
+
+사용 예:
+    python3 scripts/kis_sim.py --port 9443 --latency-ms 30 --rate-limit 20
+    config.ini 의 BASE_URL = http://127.0.0.1:9443
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+SIM_CONFIG = {
+    'latency_ms': 20.0,
+    'jitter_ms': 5.0,
+    'rate_limit': 20.0,
+    'expire_after': 0,
+    'error_rate': 0.0,
+    'holdings': 30,
+    'page_size': 20,
+    'fill_delay': 1.0,
+    'token_error_status': 200,
+}
+
+_NAMES = {
+    '005930': '삼성전자', '000660': 'SK하이닉스', '035420': 'NAVER', '035720': '카카오',
+    '005380': '현대차', '000270': '기아', '051910': 'LG화학', '006400': '삼성SDI',
+    '068270': '셀트리온', '105560': 'KB금융', '055550': '신한지주', '012330': '현대모비스',
+    '028260': '삼성물산', '066570': 'LG전자', '003550': 'LG', '034730': 'SK',
+    '015760': '한국전력', '032830': '삼성생명', '017670': 'SK텔레콤', '030200': 'KT',
+}
+_SECTORS = ('전기·전자', '운송장비·부품', '화학', '금융', '서비스업', '제약', '유통')
+
+
+def _seed(*parts) -> int:
+    return int(hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def _tick(price: int) -> int:
+    for limit, tick in ((1000, 1), (5000, 5), (10000, 10), (50000, 50), (100000, 100), (500000, 500)):
+        if price < limit:
+            return tick
+    return 1000
+
+
+def sim_price(code: str, day: str = None) -> dict:
+    """종목/일자별로 고정된 가상 시세 (같은 입력이면 항상 같은 값)"""
+    day = day or datetime.today().strftime('%Y%m%d')
+    base = 5000 + _seed(code) % 200000
+    prev = base + (_seed(code, day, 'p') % 2001 - 1000) * base // 20000
+    prev -= prev % _tick(prev)
+    change = (_seed(code, day) % 601 - 300) * prev // 10000
+    price = prev + change
+    price -= price % _tick(price)
+    open_ = prev + (price - prev) // 3
+    open_ -= open_ % _tick(open_)
+    return {'price': price, 'prev': prev, 'open': open_,
+            'high': max(prev, price) + _tick(price) * 3, 'low': min(prev, price) - _tick(price) * 3,
+            'volume': 10000 + _seed(code, day, 'v') % 5000000}
+
+
+def _limit(prev: int, pct: int) -> int:
+    """상한가(pct=130)/하한가(pct=70), 호가단위 안쪽으로"""
+    if pct > 100:
+        price = prev * pct // 100
+        return price - price % _tick(price)
+    price = -(-prev * pct // 100)
+    return price + -price % _tick(price)
+
+
+def _sign(change: int) -> str:
+    return '2' if change > 0 else '5' if change < 0 else '3'
+
+
+# 순위 조회용 가상 종목 (_NAMES + 합성 종목 200개), 시장은 코드별로 고정
+_UNIVERSE = dict(_NAMES, **{f'{900000 + i * 37:06d}': f'가상종목{i:03d}' for i in range(200)})
+RANK_LIMIT = 30  # 순위 API 응답 최대 행 수
+
+
+def _market_of(code: str) -> str:
+    return '1001' if _seed(code, 'mkt') % 5 < 2 and code not in _NAMES else '0001'
+
+
+def _rank_rows(market: str, price_min: str, price_max: str, key) -> list:
+    """시장/가격대로 거른 종목을 key로 정렬한 상위 RANK_LIMIT개 (code 필드 포함)"""
+    lo, hi = int(price_min or 0), int(price_max or 0) or None
+    rows = []
+    for code, name in _UNIVERSE.items():
+        if market not in ('0000', _market_of(code)):
+            continue
+        p = sim_price(code)
+        if p['price'] < lo or (hi is not None and p['price'] > hi):
+            continue
+        change = p['price'] - p['prev']
+        avg_vol = 10000 + _seed(code, 'avg') % 3000000
+        rows.append({'hts_kor_isnm': name, 'code': code, 'stck_prpr': str(p['price']),
+                     'prdy_vrss': str(change), 'prdy_vrss_sign': _sign(change),
+                     'prdy_ctrt': f"{change / p['prev'] * 100:.2f}", 'acml_vol': p['volume'],
+                     'acml_tr_pbmn': p['volume'] * p['price'],
+                     'vol_inrt': (p['volume'] - avg_vol) / avg_vol * 100,
+                     'vol_tnrt': p['volume'] / (1000000 + _seed(code, 'shares') % 50000000) * 100})
+    rows.sort(key=key)
+    rows = rows[:RANK_LIMIT]
+    for i, r in enumerate(rows, 1):
+        r['data_rank'] = str(i)
+    return rows
+
+
+class SimState:
+    """발급 토큰, APP_KEY별 초당 호출 수, 주문 내역, 통계"""
+
+    def __init__(self, config: dict):
+        self.config = dict(SIM_CONFIG, **(config or {}))
+        self.lock = threading.Lock()
+        self.tokens: Dict[str, int] = {}       # 토큰 → 처리 건수
+        self.windows: Dict[str, list] = {}     # APP_KEY → [초, 건수]
+        self.orders: Dict[str, dict] = {}
+        self.seq = 10000
+        self.stats = {'requests': 0, 'by_tr_id': {}, 'rate_limited': 0, 'expired': 0, 'errors': 0,
+                      'tokens_issued': 0}
+
+    def next_odno(self) -> str:
+        with self.lock:
+            self.seq += 1
+            return f"{self.seq:010d}"
+
+    def rate_limited(self, app_key: str) -> bool:
+        limit = self.config['rate_limit']
+        if not limit:
+            return False
+        now = int(time.time())
+        with self.lock:
+            win = self.windows.setdefault(app_key, [now, 0])
+            if win[0] != now:
+                win[0], win[1] = now, 0
+            win[1] += 1
+            return win[1] > limit
+
+    def check_token(self, auth: str) -> Optional[str]:
+        """토큰 오류 코드 (정상이면 None)"""
+        token = auth[7:] if auth.startswith('Bearer ') else auth
+        with self.lock:
+            if token not in self.tokens:
+                return 'EGW00121'
+            self.tokens[token] += 1
+            after = self.config['expire_after']
+            if after and self.tokens[token] > after:
+                return 'EGW00123'
+        return None
+
+
+class SimHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 헤더와 본문을 따로 쓰므로 Nagle + 지연 ACK로 응답마다 ~40ms가 붙지 않게 끈다
+    disable_nagle_algorithm = True
+    server: 'SimServer'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, obj: dict, status: int = 200, headers: dict = None):
+        body = json.dumps(obj, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, msg_cd: str, msg1: str, status: int = 200):
+        self._send({'rt_cd': '1', 'msg_cd': msg_cd, 'msg1': msg1}, status)
+
+    def _delay(self):
+        cfg = self.server.state.config
+        ms = cfg['latency_ms'] + random.uniform(-cfg['jitter_ms'], cfg['jitter_ms'])
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def _gate(self, tr_id: str) -> bool:
+        """공통 검사 (지연, 속도 제한, 무작위 오류, 토큰) → 계속 처리하면 True"""
+        state = self.server.state
+        self._delay()
+        with state.lock:
+            state.stats['requests'] += 1
+            state.stats['by_tr_id'][tr_id] = state.stats['by_tr_id'].get(tr_id, 0) + 1
+        if state.rate_limited(self.headers.get('appkey', '')):
+            state.stats['rate_limited'] += 1
+            self._error('EGW00201', '초당 거래건수를 초과하였습니다.', 500)
+            return False
+        if state.config['error_rate'] and random.random() < state.config['error_rate']:
+            state.stats['errors'] += 1
+            self._error('EGW00500', '서버 내부 오류', 500)
+            return False
+        code = state.check_token(self.headers.get('authorization', ''))
+        if code:
+            state.stats['expired'] += 1
+            msg = '기간이 만료된 token 입니다.' if code == 'EGW00123' else '유효하지 않은 token 입니다.'
+            self._error(code, msg, state.config['token_error_status'])
+            return False
+        return True
+
+    # GET -----------------------------------------------------------------
+    def do_GET(self):
+        u = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(u.query, keep_blank_values=True).items()}
+        if u.path == '/sim/stats':
+            return self._send(self.server.state.stats)
+        tr_id = self.headers.get('tr_id', '')
+        if not self._gate(tr_id):
+            return
+        name = u.path.rsplit('/', 1)[-1]
+        handler = getattr(self, 'get_' + name.replace('-', '_'), None)
+        if handler is None:
+            return self._error('OPSQ0002', f'없는 서비스 코드 입니다 ({u.path})', 404)
+        handler(q)
+
+    def get_inquire_price(self, q: dict):
+        code = q.get('FID_INPUT_ISCD', '')
+        p = sim_price(code)
+        change = p['price'] - p['prev']
+        self._send({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': {
+            'stck_prpr': str(p['price']), 'prdy_vrss': str(change), 'prdy_vrss_sign': _sign(change),
+            'prdy_ctrt': f"{change / p['prev'] * 100:.2f}", 'acml_vol': str(p['volume']),
+            'acml_tr_pbmn': str(p['volume'] * p['price']), 'stck_oprc': str(p['open']),
+            'stck_hgpr': str(p['high']), 'stck_lwpr': str(p['low']), 'stck_sdpr': str(p['prev']),
+            'stck_mxpr': str(_limit(p['prev'], 130)), 'stck_llam': str(_limit(p['prev'], 70)),
+            'hts_avls': str(p['price'] * (1000 + _seed(code) % 50000) // 100000),
+            'bstp_kor_isnm': _SECTORS[_seed(code) % len(_SECTORS)],
+            'per': f"{5 + _seed(code, 'per') % 3000 / 100:.2f}", 'pbr': f"{0.3 + _seed(code, 'pbr') % 300 / 100:.2f}",
+        }})
+
+    def get_inquire_index_price(self, q: dict):
+        code = q.get('FID_INPUT_ISCD', '0001')
+        base = 2600.0 if code == '0001' else 850.0
+        change = (_seed(code, datetime.today().strftime('%Y%m%d')) % 2001 - 1000) / 100
+        self._send({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': {
+            'bstp_nmix_prpr': f"{base + change:.2f}", 'bstp_nmix_prdy_vrss': f"{change:.2f}",
+            'bstp_nmix_prdy_ctrt': f"{change / base * 100:.2f}", 'prdy_vrss_sign': _sign(int(change * 100)),
+            'acml_vol': str(300000000 + _seed(code) % 100000000),
+        }})
+
+    def get_volume_rank(self, q: dict):
+        keys = {'1': lambda r: -r['vol_inrt'], '2': lambda r: -r['vol_tnrt'],
+                '3': lambda r: -r['acml_tr_pbmn'], '4': lambda r: -r['vol_tnrt']}
+        rows = _rank_rows(q.get('FID_INPUT_ISCD', '0000'), q.get('FID_INPUT_PRICE_1', ''),
+                          q.get('FID_INPUT_PRICE_2', ''), keys.get(q.get('FID_BLNG_CLS_CODE'), lambda r: -r['acml_vol']))
+        for r in rows:
+            r['mksc_shrn_iscd'] = r.pop('code')
+            r['vol_inrt'] = f"{r['vol_inrt']:.2f}"
+            r['vol_tnrt'] = f"{r['vol_tnrt']:.2f}"
+            r['acml_vol'], r['acml_tr_pbmn'] = str(r['acml_vol']), str(r['acml_tr_pbmn'])
+        self._send({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': rows})
+
+    def get_fluctuation(self, q: dict):
+        sort = q.get('fid_rank_sort_cls_code', '0')
+        key = (lambda r: float(r['prdy_ctrt'])) if sort in ('1', '3') else (lambda r: -float(r['prdy_ctrt']))
+        rows = _rank_rows(q.get('fid_input_iscd', '0000'), q.get('fid_input_price_1', ''),
+                          q.get('fid_input_price_2', ''), key)
+        for r in rows:
+            r['stck_shrn_iscd'] = r.pop('code')
+            for field in ('acml_tr_pbmn', 'vol_inrt', 'vol_tnrt'):
+                del r[field]
+            r['acml_vol'] = str(r['acml_vol'])
+        self._send({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': rows})
+
+    def get_search_stock_info(self, q: dict):
+        code = q.get('PDNO', '')
+        name = _NAMES.get(code, f'가상종목{code}')
+        self._send({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': {
+            'pdno': code, 'prdt_name': name, 'prdt_abrv_name': name,
+            'std_idst_clsf_cd_name': _SECTORS[_seed(code) % len(_SECTORS)],
+        }})
+
+    def get_inquire_daily_itemchartprice(self, q: dict):
+        code = q.get('FID_INPUT_ISCD', '')
+        start = datetime.strptime(q.get('FID_INPUT_DATE_1', '20000101'), '%Y%m%d')
+        day = datetime.strptime(q.get('FID_INPUT_DATE_2', datetime.today().strftime('%Y%m%d')), '%Y%m%d')
+        rows = []
+        while day >= start and len(rows) < 100:
+            if day.weekday() < 5:
+                d = day.strftime('%Y%m%d')
+                p = sim_price(code, d)
+                rows.append({'stck_bsop_date': d, 'stck_oprc': str(p['open']), 'stck_hgpr': str(p['high']),
+                             'stck_lwpr': str(p['low']), 'stck_clpr': str(p['price']),
+                             'acml_vol': str(p['volume']), 'acml_tr_pbmn': str(p['volume'] * p['price'])})
+            day -= timedelta(days=1)
+        self._send({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.',
+                    'output1': {'hts_kor_isnm': _NAMES.get(code, code)}, 'output2': rows})
+
+    def _paged(self, q: dict, rows: list, page_size: int, output2):
+        """CTX_AREA_NK100을 오프셋으로 쓰는 연속조회 (응답 헤더 tr_cont F/D)"""
+        offset = int(q.get('CTX_AREA_NK100') or 0)
+        page = rows[offset:offset + page_size]
+        more = offset + page_size < len(rows)
+        self._send({'rt_cd': '0', 'msg_cd': 'KIOK0510', 'msg1': '조회가 완료되었습니다',
+                    'ctx_area_fk100': 'SIM' if more else '', 'ctx_area_nk100': str(offset + page_size) if more else '',
+                    'output1': page, 'output2': output2},
+                   headers={'tr_cont': 'F' if more else 'D'})
+
+    def get_inquire_balance(self, q: dict):
+        codes = list(_NAMES)[:self.server.state.config['holdings']]
+        codes += [f"{900000 + i:06d}" for i in range(self.server.state.config['holdings'] - len(codes))]
+        rows, purchase, evlu = [], 0, 0
+        for code in codes:
+            p = sim_price(code)
+            qty = 1 + _seed(code, 'qty') % 200
+            avg = p['prev'] * (900 + _seed(code, 'avg') % 200) // 1000
+            rows.append({
+                'pdno': code, 'prdt_name': _NAMES.get(code, f'가상종목{code}'), 'hldg_qty': str(qty),
+                'ord_psbl_qty': str(qty), 'pchs_avg_pric': f"{avg:.4f}", 'pchs_amt': str(avg * qty),
+                'prpr': str(p['price']), 'evlu_amt': str(p['price'] * qty),
+                'evlu_pfls_amt': str((p['price'] - avg) * qty),
+                'evlu_pfls_rt': f"{(p['price'] - avg) / avg * 100:.2f}",
+            })
+            purchase += avg * qty
+            evlu += p['price'] * qty
+        cash = 10_000_000
+        summary = [{'dnca_tot_amt': str(cash), 'nxdy_excc_amt': str(cash), 'prvs_rcdl_excc_amt': str(cash),
+                    'tot_evlu_amt': str(cash + evlu), 'evlu_pfls_smtl_amt': str(evlu - purchase),
+                    'pchs_amt_smtl_amt': str(purchase), 'evlu_amt_smtl_amt': str(evlu)}]
+        self._paged(q, rows, self.server.state.config['page_size'], summary)
+
+    def get_inquire_psbl_order(self, q: dict):
+        cash = 10_000_000
+        price = int(q.get('ORD_UNPR') or 0) or (sim_price(q['PDNO'])['price'] if q.get('PDNO') else 0)
+        max_qty = cash // price if price else 0
+        self._send({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': {
+            'ord_psbl_cash': str(cash), 'nrcvb_buy_amt': str(cash), 'nrcvb_buy_qty': str(max_qty),
+            'max_buy_amt': str(cash), 'max_buy_qty': str(max_qty), 'psbl_qty_calc_unpr': str(price),
+        }})
+
+    def get_inquire_daily_ccld(self, q: dict):
+        state = self.server.state
+        start = q.get('INQR_STRT_DT', '')
+        end = q.get('INQR_END_DT', '')
+        odno, code = q.get('ODNO', ''), q.get('PDNO', '')
+        with state.lock:
+            orders = list(state.orders.values())
+        now = time.time()
+        rows = []
+        for o in orders:
+            if not (start <= o['ord_dt'] <= end) or (odno and o['odno'] != odno) or (code and o['pdno'] != code):
+                continue
+            filled = 0 if o['cancelled'] or now - o['t'] < state.config['fill_delay'] else o['qty']
+            rows.append({
+                'ord_dt': o['ord_dt'], 'odno': o['odno'], 'orgn_odno': o['orgn_odno'], 'ord_gno_brno': '06010',
+                'pdno': o['pdno'], 'prdt_name': _NAMES.get(o['pdno'], o['pdno']),
+                'sll_buy_dvsn_cd': o['side'], 'sll_buy_dvsn_cd_name': '현금매수' if o['side'] == '02' else '현금매도',
+                'ord_qty': str(o['qty']), 'ord_unpr': str(o['price']), 'ord_tmd': o['ord_tmd'],
+                'tot_ccld_qty': str(filled), 'avg_prvs': str(o['fill_price'] if filled else 0),
+                'tot_ccld_amt': str(o['fill_price'] * filled), 'rmn_qty': str(0 if o['cancelled'] else o['qty'] - filled),
+                'cncl_yn': 'Y' if o['cancelled'] else 'N',
+            })
+        rows.sort(key=lambda r: (r['ord_dt'], r['ord_tmd'], r['odno']), reverse=q.get('INQR_DVSN') == '00')
+        self._paged(q, rows, 100, {'tot_ord_qty': str(sum(int(r['ord_qty']) for r in rows)),
+                                   'tot_ccld_qty': str(sum(int(r['tot_ccld_qty']) for r in rows))})
+
+    def get_inquire_period_profit(self, q: dict):
+        """일별 실현손익 (매도 체결만, 원가는 잔고와 같은 가상 평균단가)"""
+        state = self.server.state
+        start, end = q.get('INQR_STRT_DT', ''), q.get('INQR_END_DT', '')
+        now = time.time()
+        with state.lock:
+            orders = list(state.orders.values())
+        days = {}
+        for o in orders:
+            if o['side'] != '01' or o['cancelled'] or now - o['t'] < state.config['fill_delay'] \
+                    or not (start <= o['ord_dt'] <= end):
+                continue
+            amt = o['fill_price'] * o['qty']
+            avg = sim_price(o['pdno'])['prev'] * (900 + _seed(o['pdno'], 'avg') % 200) // 1000
+            fee, tax = int(amt * 0.00015), int(amt * 0.002)
+            d = days.setdefault(o['ord_dt'], {'sll_amt': 0, 'fee': 0, 'tl_tax': 0, 'rlzt_pfls': 0, 'sll_qty1': 0})
+            d['sll_amt'] += amt
+            d['fee'] += fee
+            d['tl_tax'] += tax
+            d['rlzt_pfls'] += amt - fee - tax - avg * o['qty']
+            d['sll_qty1'] += o['qty']
+        rows = [{'trad_dt': day, **{k: str(v) for k, v in d.items()}} for day, d in sorted(days.items(), reverse=True)]
+        self._paged(q, rows, 100, {'tot_rlzt_pfls': str(sum(d['rlzt_pfls'] for d in days.values()))})
+
+    # POST ----------------------------------------------------------------
+    def do_POST(self):
+        n = int(self.headers.get('Content-Length', 0) or 0)
+        raw = self.rfile.read(n) if n else b''
+        try:
+            body = json.loads(raw or b'{}')
+        except ValueError:
+            return self._error('OPSQ0001', '잘못된 요청 본문', 400)
+        path = urlparse(self.path).path
+        state = self.server.state
+
+        if path == '/oauth2/tokenP':
+            self._delay()
+            token = hashlib.sha256(f"{body.get('appkey')}{time.time()}{random.random()}".encode()).hexdigest()
+            with state.lock:
+                state.tokens[token] = 0
+                state.stats['tokens_issued'] += 1
+            expired = (datetime.now() + timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
+            return self._send({'access_token': token, 'token_type': 'Bearer', 'expires_in': 86400,
+                               'access_token_token_expired': expired})
+        if path == '/oauth2/Approval':
+            self._delay()
+            return self._send({'approval_key': hashlib.sha1(raw).hexdigest()})
+        if path == '/uapi/hashkey':
+            self._delay()
+            return self._send({'BODY': body, 'HASH': hashlib.sha256(raw).hexdigest()})
+
+        tr_id = self.headers.get('tr_id', '')
+        if not self._gate(tr_id):
+            return
+        if self.headers.get('hashkey') != hashlib.sha256(raw).hexdigest():
+            return self._error('EGW00205', 'hashkey가 일치하지 않습니다.', 200)
+        if path.endswith('/order-cash'):
+            return self.post_order_cash(body, tr_id)
+        if path.endswith('/order-rvsecncl'):
+            return self.post_order_rvsecncl(body)
+        self._error('OPSQ0002', f'없는 서비스 코드 입니다 ({path})', 404)
+
+    def _add_order(self, pdno: str, side: str, qty: int, price: int, orgn_odno: str = '') -> dict:
+        state = self.server.state
+        market = sim_price(pdno)['price']
+        order = {'odno': state.next_odno(), 'orgn_odno': orgn_odno, 'ord_dt': datetime.today().strftime('%Y%m%d'),
+                 'ord_tmd': datetime.now().strftime('%H%M%S'), 'pdno': pdno, 'side': side, 'qty': qty,
+                 'price': price, 'fill_price': price or market, 't': time.time(), 'cancelled': False}
+        with state.lock:
+            state.orders[order['odno']] = order
+        return order
+
+    def post_order_cash(self, body: dict, tr_id: str):
+        qty = int(body.get('ORD_QTY') or 0)
+        price = int(body.get('ORD_UNPR') or 0)
+        if qty <= 0:
+            return self._error('APBK0918', '주문수량을 확인하세요.')
+        if body.get('ORD_DVSN') == '00' and price % _tick(price or 1):
+            return self._error('APBK0506', '호가단위가 맞지 않습니다.')
+        side = '01' if tr_id in ('TTTC0011U', 'VTTC0801U') else '02'
+        o = self._add_order(body.get('PDNO', ''), side, qty, price)
+        self._send({'rt_cd': '0', 'msg_cd': 'APBK0013', 'msg1': '주문 전송 완료 되었습니다.', 'output': {
+            'KRX_FWDG_ORD_ORGNO': '06010', 'ODNO': o['odno'], 'ORD_TMD': o['ord_tmd']}})
+
+    def post_order_rvsecncl(self, body: dict):
+        state = self.server.state
+        with state.lock:
+            orig = state.orders.get(body.get('ORGN_ODNO', ''))
+        if not orig or orig['cancelled']:
+            return self._error('APBK0344', '정정/취소할 주문이 없습니다.')
+        orig['cancelled'] = True
+        if body.get('RVSE_CNCL_DVSN_CD') == '01':
+            o = self._add_order(orig['pdno'], orig['side'], orig['qty'], int(body.get('ORD_UNPR') or 0), orig['odno'])
+        else:
+            o = {'odno': state.next_odno(), 'ord_tmd': datetime.now().strftime('%H%M%S')}
+        self._send({'rt_cd': '0', 'msg_cd': 'APBK0013', 'msg1': '주문 전송 완료 되었습니다.', 'output': {
+            'KRX_FWDG_ORD_ORGNO': '06010', 'ODNO': o['odno'], 'ORD_TMD': o['ord_tmd']}})
+
+
+class SimServer(ThreadingHTTPServer):
+    """시뮬레이터 HTTP 서버 (state.config로 동작 조절)"""
+
+    daemon_threads = True
+
+    def __init__(self, config: dict = None, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), SimHandler)
+        self.state = SimState(config)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self) -> 'SimServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KIS Open API 로컬 시뮬레이터 (오프라인 테스트/부하 테스트용)')
+    parser.add_argument('--port', type=int, default=9443, help='포트 (기본: 9443)')
+    for key, default in SIM_CONFIG.items():
+        parser.add_argument('--' + key.replace('_', '-'), type=type(default), default=default,
+                            help=f'(기본: {default})')
+    args = parser.parse_args()
+
+    server = SimServer({k: getattr(args, k) for k in SIM_CONFIG}, port=args.port)
+    print(f"🧪 KIS 시뮬레이터 시작: {server.url}")
+    print(f"   config.ini 의 BASE_URL = {server.url} 로 지정 (Ctrl+C 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {json.dumps(server.state.stats, ensure_ascii=False)}")
+
+
+if __name__ == '__main__':
+    main()
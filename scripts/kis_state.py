@@ -0,0 +1,203 @@
+"""
+실시간 시세 상태 저장소 - 스트림으로 받은 종목별 최종 체결가/10단계 호가/누적 거래량을 메모리에 유지
+
+KisStream 콜백으로 붙여 쓰며(attach), 갱신은 종목당 고정 크기 레코드의 필드 대입만 하므로 O(1)이다.
+쓰기는 스트림 수신 스레드 하나뿐이라 락 없이 레코드별 시퀀스 번호(seqlock)로 일관성을 맞춘다:
+쓰기 전후로 seq를 1씩 올리고, 읽는 쪽은 seq가 짝수이고 복사 전후가 같을 때까지 다시 읽는다.
+
+quote.get_quote()는 상태가 신선하면(STREAM_MAX_AGE초 이내 갱신) REST 대신 여기서 응답을 만든다.
+"""
+import time
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from kis_stream import (KisStream, TR_TRADE, TR_ORDERBOOK, TRADE_CODE, TRADE_TIME, TRADE_PRICE, TRADE_SIGN,
+                        TRADE_CHANGE, TRADE_RATE, TRADE_OPEN, TRADE_HIGH, TRADE_LOW, TRADE_VOLUME,
+                        TRADE_ACML_VOL, TRADE_ACML_AMT, BOOK_CODE, BOOK_TIME, BOOK_ASK, BOOK_BID,
+                        BOOK_ASK_QTY, BOOK_BID_QTY, BOOK_TOTAL_ASK_QTY, BOOK_TOTAL_BID_QTY)
+
+BOOK_DEPTH = 10
+
+
+def _int(s: str) -> int:
+    try:
+        return int(s)
+    except ValueError:
+        return 0
+
+
+def _float(s: str) -> float:
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+class SymbolState:
+    """종목 하나의 실시간 상태 (호가는 고정 길이 array)"""
+
+    __slots__ = ('code', 'seq', 'price', 'change', 'sign', 'rate', 'open', 'high', 'low',
+                 'volume', 'acml_vol', 'acml_amt', 'trade_time', 'trade_ts',
+                 'asks', 'bids', 'ask_qty', 'bid_qty', 'total_ask_qty', 'total_bid_qty',
+                 'book_time', 'book_ts')
+
+    def __init__(self, code: str):
+        self.code = code
+        self.seq = 0
+        self.price = self.change = self.open = self.high = self.low = 0
+        self.sign = '3'
+        self.rate = 0.0
+        self.volume = self.acml_vol = self.acml_amt = 0
+        self.trade_time = ''
+        self.trade_ts = 0.0
+        self.asks = array('q', bytes(8 * BOOK_DEPTH))
+        self.bids = array('q', bytes(8 * BOOK_DEPTH))
+        self.ask_qty = array('q', bytes(8 * BOOK_DEPTH))
+        self.bid_qty = array('q', bytes(8 * BOOK_DEPTH))
+        self.total_ask_qty = self.total_bid_qty = 0
+        self.book_time = ''
+        self.book_ts = 0.0
+
+    def apply_trade(self, f: List[str], ts: float):
+        self.seq += 1
+        self.price = _int(f[TRADE_PRICE])
+        self.sign = f[TRADE_SIGN]
+        self.change = _int(f[TRADE_CHANGE])
+        self.rate = _float(f[TRADE_RATE])
+        self.open = _int(f[TRADE_OPEN])
+        self.high = _int(f[TRADE_HIGH])
+        self.low = _int(f[TRADE_LOW])
+        self.volume = _int(f[TRADE_VOLUME])
+        self.acml_vol = _int(f[TRADE_ACML_VOL])
+        self.acml_amt = _int(f[TRADE_ACML_AMT])
+        self.trade_time = f[TRADE_TIME]
+        self.trade_ts = ts
+        self.seq += 1
+
+    def apply_book(self, f: List[str], ts: float):
+        self.seq += 1
+        for i in range(BOOK_DEPTH):
+            self.asks[i] = _int(f[BOOK_ASK + i])
+            self.bids[i] = _int(f[BOOK_BID + i])
+            self.ask_qty[i] = _int(f[BOOK_ASK_QTY + i])
+            self.bid_qty[i] = _int(f[BOOK_BID_QTY + i])
+        self.total_ask_qty = _int(f[BOOK_TOTAL_ASK_QTY])
+        self.total_bid_qty = _int(f[BOOK_TOTAL_BID_QTY])
+        self.book_time = f[BOOK_TIME]
+        self.book_ts = ts
+        self.seq += 1
+
+    def _copy(self) -> dict:
+        return {
+            'code': self.code, 'price': self.price, 'change': self.change, 'sign': self.sign,
+            'rate': self.rate, 'open': self.open, 'high': self.high, 'low': self.low,
+            'volume': self.volume, 'acml_vol': self.acml_vol, 'acml_amt': self.acml_amt,
+            'trade_time': self.trade_time, 'trade_ts': self.trade_ts,
+            'asks': self.asks.tolist(), 'bids': self.bids.tolist(),
+            'ask_qty': self.ask_qty.tolist(), 'bid_qty': self.bid_qty.tolist(),
+            'total_ask_qty': self.total_ask_qty, 'total_bid_qty': self.total_bid_qty,
+            'book_time': self.book_time, 'book_ts': self.book_ts,
+        }
+
+    def snapshot(self) -> dict:
+        """일관된 사본 (쓰기 도중이면 다시 읽음)"""
+        while True:
+            seq = self.seq
+            if seq & 1:
+                time.sleep(0)
+                continue
+            snap = self._copy()
+            if self.seq == seq:
+                return snap
+
+    @property
+    def updated(self) -> float:
+        return max(self.trade_ts, self.book_ts)
+
+
+class MarketState:
+    """종목코드 → SymbolState 저장소 (KisStream 콜백)"""
+
+    def __init__(self):
+        self.symbols: Dict[str, SymbolState] = {}
+        self.stats = {'trades': 0, 'books': 0, 'hits': 0, 'stale': 0}
+        self._lock = threading.Lock()  # 종목 최초 등록 시에만 사용
+
+    def _get(self, code: str) -> SymbolState:
+        s = self.symbols.get(code)
+        if s is None:
+            with self._lock:
+                s = self.symbols.setdefault(code, SymbolState(code))
+        return s
+
+    def apply(self, tr_id: str, fields: List[str]):
+        """스트림 레코드 반영 (KisStream.add_callback용)"""
+        if tr_id == TR_TRADE and len(fields) > TRADE_ACML_AMT:
+            self._get(fields[TRADE_CODE]).apply_trade(fields, time.time())
+            self.stats['trades'] += 1
+        elif tr_id == TR_ORDERBOOK and len(fields) > BOOK_TOTAL_BID_QTY:
+            self._get(fields[BOOK_CODE]).apply_book(fields, time.time())
+            self.stats['books'] += 1
+
+    def attach(self, stream) -> 'MarketState':
+        stream.add_callback(self.apply)
+        return self
+
+    def snapshot(self, code: str = None, max_age: float = 0) -> Optional[dict]:
+        """종목 상태 사본 (code 없으면 전체 dict), max_age초보다 오래됐으면 None"""
+        if code is None:
+            return {c: s.snapshot() for c, s in list(self.symbols.items())}
+        s = self.symbols.get(code)
+        if s is None or (max_age and time.time() - s.updated > max_age):
+            return None
+        return s.snapshot()
+
+    def quote_output(self, code: str, max_age: float) -> Optional[dict]:
+        """inquire-price output 형식으로 변환 (체결가가 없거나 오래됐으면 None)"""
+        s = self.symbols.get(code)
+        if s is None or not s.price or time.time() - s.updated > max_age:
+            if s is not None:
+                self.stats['stale'] += 1
+            return None
+        snap = s.snapshot()
+        self.stats['hits'] += 1
+        return {
+            'stck_prpr': str(snap['price']),
+            'prdy_vrss': str(snap['change']),
+            'prdy_vrss_sign': snap['sign'],
+            'prdy_ctrt': f"{snap['rate']:.2f}",
+            'acml_vol': str(snap['acml_vol']),
+            'acml_tr_pbmn': str(snap['acml_amt']),
+            'stck_oprc': str(snap['open']),
+            'stck_hgpr': str(snap['high']),
+            'stck_lwpr': str(snap['low']),
+            'stck_sdpr': str(snap['price'] - snap['change']),
+            'askp1': str(snap['asks'][0]),
+            'bidp1': str(snap['bids'][0]),
+        }
+
+
+_state: Optional[MarketState] = None
+_state_lock = threading.Lock()
+
+
+def get_state() -> MarketState:
+    """프로세스 공유 상태 저장소"""
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                _state = MarketState()
+    return _state
+
+
+def watch(cfg: dict, codes: List[str], depth: bool = False, url: str = None) -> KisStream:
+    """종목 체결가(및 호가) 구독을 시작하고 공유 상태 저장소에 연결 → 실행 중인 KisStream"""
+    stream = KisStream(cfg, url=url)
+    get_state().attach(stream)
+    for code in codes:
+        stream.subscribe(TR_TRADE, code)
+        if depth:
+            stream.subscribe(TR_ORDERBOOK, code)
+    return stream.start()
@@ -0,0 +1,395 @@
+"""
+KIS 실시간 시세 WebSocket 클라이언트 - 체결가/호가/체결통보 스트리밍
+
+표준 라이브러리(socket/ssl)만으로 RFC 6455 WebSocket을 구현한다.
+구독 목록을 유지하다가 연결이 끊기면 지수 백오프로 재연결 후 다시 구독한다.
+
+수신 데이터 형식:
+    실시간 데이터:  "<암호화 0/1>|<TR ID>|<건수>|<필드1>^<필드2>^..."
+    제어 메시지:    JSON (구독 응답, PINGPONG)
+실시간 데이터는 프레임당 split 한 번으로 필드 목록을 만들어 콜백에 그대로 넘긴다.
+"""
+import os
+import json
+import time
+import base64
+import struct
+import threading
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from kis_common import _get_session
+
+# 실시간 TR ID
+TR_TRADE = 'H0STCNT0'      # 주식 체결가
+TR_ORDERBOOK = 'H0STASP0'  # 주식 호가 (10단계)
+TR_NOTICE = 'H0STCNI0'     # 체결 통보 (모의: H0STCNI9)
+
+# H0STCNT0 필드 위치
+TRADE_CODE, TRADE_TIME, TRADE_PRICE, TRADE_SIGN, TRADE_CHANGE, TRADE_RATE = 0, 1, 2, 3, 4, 5
+TRADE_OPEN, TRADE_HIGH, TRADE_LOW, TRADE_ASK1, TRADE_BID1 = 7, 8, 9, 10, 11
+TRADE_VOLUME, TRADE_ACML_VOL, TRADE_ACML_AMT = 12, 13, 14
+
+# H0STASP0 필드 위치 (매도호가1~10, 매수호가1~10, 매도잔량1~10, 매수잔량1~10)
+BOOK_CODE, BOOK_TIME = 0, 1
+BOOK_ASK, BOOK_BID, BOOK_ASK_QTY, BOOK_BID_QTY = 3, 13, 23, 33
+BOOK_TOTAL_ASK_QTY, BOOK_TOTAL_BID_QTY = 43, 44
+
+_WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC11B85'
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+# ── WebSocket 프레임 ─────────────────────────────────────────
+
+def _mask(payload: bytes, key: bytes) -> bytes:
+    n = len(payload)
+    if not n:
+        return payload
+    m = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(m, 'big')).to_bytes(n, 'big')
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool) -> bytes:
+    """프레임 인코딩 (클라이언트→서버는 mask=True)"""
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    mbit = 0x80 if mask else 0
+    if n < 126:
+        head += bytes([mbit | n])
+    elif n < 65536:
+        head += bytes([mbit | 126]) + struct.pack('>H', n)
+    else:
+        head += bytes([mbit | 127]) + struct.pack('>Q', n)
+    if mask:
+        key = os.urandom(4)
+        return head + key + _mask(payload, key)
+    return head + payload
+
+
+def read_frame(reader) -> Tuple[int, bytes, bool]:
+    """프레임 하나 읽기 → (opcode, payload, fin), 연결 종료 시 ConnectionError"""
+    head = reader.read(2)
+    if len(head) < 2:
+        raise ConnectionError('websocket closed')
+    fin = bool(head[0] & 0x80)
+    opcode = head[0] & 0x0F
+    n = head[1] & 0x7F
+    if n == 126:
+        n = struct.unpack('>H', reader.read(2))[0]
+    elif n == 127:
+        n = struct.unpack('>Q', reader.read(8))[0]
+    key = reader.read(4) if head[1] & 0x80 else None
+    payload = reader.read(n) if n else b''
+    if len(payload) < n:
+        raise ConnectionError('websocket closed')
+    if key:
+        payload = _mask(payload, key)
+    return opcode, payload, fin
+
+
+def accept_key(key: str) -> str:
+    import hashlib
+    return base64.b64encode(hashlib.sha1(key.encode() + _WS_GUID).digest()).decode()
+
+
+class WebSocket:
+    """최소 WebSocket 클라이언트 (텍스트 메시지 송수신)"""
+
+    def __init__(self, url: str, timeout: float = 10):
+        import socket
+        import ssl
+        u = urlparse(url)
+        port = u.port or (443 if u.scheme == 'wss' else 80)
+        sock = socket.create_connection((u.hostname, port), timeout=timeout)
+        if u.scheme == 'wss':
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=u.hostname)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = (u.path or '/') + (f'?{u.query}' if u.query else '')
+        sock.sendall((f"GET {path} HTTP/1.1\r\nHost: {u.hostname}:{port}\r\n"
+                      f"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        self.sock = sock
+        self.reader = sock.makefile('rb', buffering=65536)
+        status = self.reader.readline()
+        headers = {}
+        while True:
+            line = self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            k, _, v = line.decode().partition(':')
+            headers[k.strip().lower()] = v.strip()
+        if b' 101 ' not in status or headers.get('sec-websocket-accept') != accept_key(key):
+            sock.close()
+            raise ConnectionError(f'websocket handshake failed: {status!r}')
+        sock.settimeout(None)
+        self._send_lock = threading.Lock()
+
+    def send(self, text: str, opcode: int = OP_TEXT):
+        with self._send_lock:
+            self.sock.sendall(encode_frame(opcode, text.encode() if isinstance(text, str) else text, True))
+
+    def recv(self) -> Optional[str]:
+        """텍스트 메시지 하나 수신 (ping/pong 자동 처리), 연결 종료 시 ConnectionError"""
+        parts = []
+        while True:
+            opcode, payload, fin = read_frame(self.reader)
+            if opcode == OP_PING:
+                self.send(payload, OP_PONG)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                raise ConnectionError('websocket closed by server')
+            parts.append(payload)
+            if fin:
+                return b''.join(parts).decode('utf-8', errors='replace')
+
+    def close(self):
+        try:
+            self.send(b'', OP_CLOSE)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+# ── KIS 실시간 스트림 ────────────────────────────────────────
+
+def default_ws_url(cfg: dict) -> str:
+    """실시간 접속 주소 (WS_URL 설정 우선)"""
+    if cfg.get('ws_url'):
+        return cfg['ws_url']
+    if 'openapivts' in cfg.get('base_url', ''):
+        return 'ws://ops.koreainvestment.com:31000'
+    return 'ws://ops.koreainvestment.com:21000'
+
+
+def is_local_url(url: str) -> bool:
+    """로컬 주소 여부 (kis_stream_replay.py 같은 재생 서버는 접속키를 검사하지 않는다)"""
+    return urlparse(url).hostname in ('localhost', '127.0.0.1', '::1')
+
+
+def get_approval_key(cfg: dict) -> str:
+    """실시간 접속키 발급 (/oauth2/Approval)"""
+    body = {
+        "grant_type": "client_credentials",
+        "appkey": cfg['app_key'],
+        "secretkey": cfg['app_secret'],
+    }
+    resp = _get_session(cfg).post(f"{cfg['base_url']}/oauth2/Approval", json=body,
+                                  headers={"Content-Type": "application/json"}, timeout=10)
+    if resp.status_code != 200:
+        raise ConnectionError(f"실시간 접속키 발급 실패: {resp.status_code} {resp.text[:200]}")
+    try:
+        data = resp.json()
+    except ValueError:
+        data = {}
+    if not data.get('approval_key'):
+        # 앱키 오류 등은 200 응답에 approval_key 없이 msg1만 온다
+        raise ConnectionError(f"실시간 접속키 발급 실패: {data.get('msg1') or resp.text[:200]}")
+    return data['approval_key']
+
+
+def _decryptor():
+    """체결통보 AES-256-CBC 복호화 함수 (pycryptodome 없으면 None)"""
+    try:
+        from Crypto.Cipher import AES
+    except ImportError:
+        return None
+
+    def decrypt(key: str, iv: str, data: str) -> str:
+        raw = AES.new(key.encode(), AES.MODE_CBC, iv.encode()).decrypt(base64.b64decode(data))
+        return raw[:-raw[-1]].decode('utf-8')
+    return decrypt
+
+
+class KisStream:
+    """KIS 실시간 스트림 (구독 관리, 자동 재연결, 콜백/asyncio 큐 전달)
+
+    콜백은 (tr_id, fields) 로 호출된다. fields는 한 건의 필드 문자열 목록이며
+    위치 상수(TRADE_PRICE, BOOK_ASK 등)로 꺼내 쓴다.
+    """
+
+    def __init__(self, cfg: dict, url: str = None, approval_key: str = None,
+                 record_path: str = None, max_backoff: float = 30.0):
+        self.cfg = cfg
+        self.url = url or default_ws_url(cfg)
+        self.approval_key = approval_key
+        self.subscriptions = {}  # (tr_id, tr_key) → True
+        self.callbacks = []
+        self.keys = {}           # tr_id → (key, iv), 체결통보 복호화용
+        self.stats = {'connects': 0, 'frames': 0, 'records': 0, 'errors': 0}
+        self.max_backoff = max_backoff
+        self._ws = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()  # 첫 연결 시도가 끝남 (성공/실패)
+        self._fail_fast = False
+        self.error = None                # 첫 연결 실패 원인
+        self._thread = None
+        self._record = open(record_path, 'a', encoding='utf-8', buffering=1) if record_path else None
+        self._decrypt = _decryptor()
+
+    # 구독 ---------------------------------------------------------------
+    def _subscribe_msg(self, tr_id: str, tr_key: str, tr_type: str) -> str:
+        return json.dumps({
+            "header": {"approval_key": self.approval_key, "custtype": "P",
+                       "tr_type": tr_type, "content-type": "utf-8"},
+            "body": {"input": {"tr_id": tr_id, "tr_key": tr_key}},
+        })
+
+    def subscribe(self, tr_id: str, tr_key: str):
+        """구독 추가 (연결 중이면 즉시 전송, 재연결 시 자동 재구독)"""
+        with self._lock:
+            self.subscriptions[(tr_id, tr_key)] = True
+            ws = self._ws
+        if ws:
+            try:
+                ws.send(self._subscribe_msg(tr_id, tr_key, '1'))
+            except OSError:
+                pass
+
+    def unsubscribe(self, tr_id: str, tr_key: str):
+        with self._lock:
+            self.subscriptions.pop((tr_id, tr_key), None)
+            ws = self._ws
+        if ws:
+            try:
+                ws.send(self._subscribe_msg(tr_id, tr_key, '2'))
+            except OSError:
+                pass
+
+    # 전달 ---------------------------------------------------------------
+    def add_callback(self, fn: Callable[[str, List[str]], None]):
+        self.callbacks.append(fn)
+
+    def queue(self, loop: 'asyncio.AbstractEventLoop' = None, maxsize: int = 0) -> 'asyncio.Queue':
+        """asyncio 큐로 (tr_id, fields) 전달 (이벤트 루프 스레드에서 호출)"""
+        import asyncio
+        loop = loop or asyncio.get_running_loop()
+        q = asyncio.Queue(maxsize)
+
+        def put(tr_id, fields):
+            loop.call_soon_threadsafe(q.put_nowait, (tr_id, fields))
+        self.add_callback(put)
+        return q
+
+    def _dispatch(self, tr_id: str, fields: List[str]):
+        self.stats['records'] += 1
+        for fn in self.callbacks:
+            try:
+                fn(tr_id, fields)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"❌ 실시간 콜백 오류: {e}")
+
+    def handle_message(self, text: str):
+        """수신 메시지 처리 (실시간 데이터 → 콜백, 제어 메시지 → 응답/키 저장)"""
+        self.stats['frames'] += 1
+        if self._record:
+            self._record.write(text + '\n')
+        if text[:1] in ('0', '1'):
+            encrypted, tr_id, count, data = text.split('|', 3)
+            if encrypted == '1':
+                key_iv = self.keys.get(tr_id)
+                if not key_iv or not self._decrypt:
+                    return
+                data = self._decrypt(key_iv[0], key_iv[1], data)
+            fields = data.split('^')
+            n = int(count) if count.isdigit() else 1
+            if n <= 1:
+                self._dispatch(tr_id, fields)
+                return
+            per = len(fields) // n
+            for i in range(n):
+                self._dispatch(tr_id, fields[i * per:(i + 1) * per])
+            return
+
+        try:
+            msg = json.loads(text)
+        except ValueError:
+            return
+        header = msg.get('header', {})
+        if header.get('tr_id') == 'PINGPONG':
+            if self._ws:
+                self._ws.send(text)
+            return
+        body = msg.get('body', {})
+        out = body.get('output') or {}
+        if out.get('key') and out.get('iv'):
+            self.keys[header.get('tr_id')] = (out['key'], out['iv'])
+        if body.get('rt_cd') not in (None, '0'):
+            print(f"❌ 실시간 구독 오류: [{body.get('msg_cd')}] {body.get('msg1')} ({header.get('tr_key', '')})")
+
+    # 연결 ---------------------------------------------------------------
+    def _connect(self):
+        if not self.approval_key:
+            # 로컬 재생 서버에는 가짜 키를 쓰고 /oauth2/Approval을 호출하지 않는다
+            self.approval_key = 'local' if is_local_url(self.url) else get_approval_key(self.cfg)
+        ws = WebSocket(self.url)
+        with self._lock:
+            self._ws = ws
+            subs = list(self.subscriptions)
+        self.stats['connects'] += 1
+        for tr_id, tr_key in subs:
+            ws.send(self._subscribe_msg(tr_id, tr_key, '1'))
+        return ws
+
+    def run(self):
+        """수신 루프 (stop() 호출 전까지 재연결 반복)"""
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                ws = self._connect()
+                self._ready.set()
+                backoff = 0.5
+                while not self._stop.is_set():
+                    self.handle_message(ws.recv())
+            except (OSError, ConnectionError, ValueError) as e:
+                if self._stop.is_set():
+                    break
+                if not self._ready.is_set():
+                    self.error = e
+                    self._ready.set()
+                    if self._fail_fast:
+                        break
+                print(f"⚠️  실시간 연결 끊김 ({e}), {backoff:.1f}초 후 재연결")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                with self._lock:
+                    ws, self._ws = self._ws, None
+                if ws:
+                    ws.close()
+
+    def start(self, wait: float = 0) -> 'KisStream':
+        """백그라운드 스레드에서 수신 시작
+
+        wait초를 주면 첫 연결(접속키 발급 포함)까지 기다리고, 실패하거나 시간 안에 연결하지 못하면
+        재연결하지 않고 멈춘 뒤 ConnectionError를 발생시킨다 (이후 끊김은 그대로 자동 재연결).
+        """
+        self._stop.clear()
+        self._ready.clear()
+        self._fail_fast = wait > 0
+        self.error = None
+        self._thread = threading.Thread(target=self.run, name='kis-stream', daemon=True)
+        self._thread.start()
+        if wait > 0 and not (self._ready.wait(wait) and self.error is None):
+            error = self.error or f"{wait:g}초 안에 연결하지 못함"
+            self.stop()
+            raise ConnectionError(f"실시간 연결 실패: {error}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            ws = self._ws
+        if ws:
+            ws.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._record:
+            self._record.close()
+            self._record = None
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""KIS 실시간 WebSocket 재생 서버 - 녹화한 프레임 또는 가상 체결/호가를 로컬에서 송출 (오프라인 테스트용)
+
+quote.py --stream --record FILE 로 녹화한 파일을 그대로 재생하거나,
+파일 없이 구독한 종목의 가상 체결가(H0STCNT0)/호가(H0STASP0)를 만들어 보낸다.
+"""
+import argparse
+import json
+import random
+import socket
+import sys
+import os
+import threading
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_stream import (read_frame, encode_frame, accept_key, TR_TRADE, TR_ORDERBOOK,
+                        OP_TEXT, OP_CLOSE, OP_PING, OP_PONG)
+
+
+def synthetic_trade(code: str, price: int, acml_vol: int) -> str:
+    """가상 체결가 프레임 (H0STCNT0, 46필드)"""
+    fields = ['0'] * 46
+    fields[0] = code
+    fields[1] = time.strftime('%H%M%S')
+    fields[2] = str(price)
+    fields[3] = '2'
+    fields[7] = fields[8] = fields[9] = str(price)
+    fields[10] = str(price + 100)
+    fields[11] = str(price)
+    fields[12] = '10'
+    fields[13] = str(acml_vol)
+    fields[14] = str(acml_vol * price)
+    return f"0|{TR_TRADE}|001|{'^'.join(fields)}"
+
+
+def synthetic_book(code: str, price: int) -> str:
+    """가상 호가 프레임 (H0STASP0, 59필드)"""
+    fields = ['0'] * 59
+    fields[0] = code
+    fields[1] = time.strftime('%H%M%S')
+    for i in range(10):
+        fields[3 + i] = str(price + 100 * (i + 1))
+        fields[13 + i] = str(price - 100 * i)
+        fields[23 + i] = str(100 * (i + 1))
+        fields[33 + i] = str(120 * (i + 1))
+    fields[43] = str(sum(100 * (i + 1) for i in range(10)))
+    fields[44] = str(sum(120 * (i + 1) for i in range(10)))
+    return f"0|{TR_ORDERBOOK}|001|{'^'.join(fields)}"
+
+
+class ReplayServer:
+    """로컬 WebSocket 서버 (연결마다 구독 종목에 맞춰 프레임 송출)"""
+
+    def __init__(self, frames: Optional[List[str]] = None, host: str = '127.0.0.1', port: int = 0,
+                 interval: float = 0.05, drop_after: int = 0, ping_every: float = 10.0):
+        self.frames = frames
+        self.interval = interval
+        self.drop_after = drop_after  # N프레임 송출 후 연결 끊기 (재연결 테스트)
+        self.ping_every = ping_every
+        self.connections = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(16)
+        self._stop = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self._sock.getsockname()
+        return f"ws://{host}:{port}"
+
+    def start(self) -> 'ReplayServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._sock.close()
+
+    def _serve(self, conn: socket.socket):
+        reader = conn.makefile('rb')
+        headers = {}
+        reader.readline()
+        while True:
+            line = reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            k, _, v = line.decode().partition(':')
+            headers[k.strip().lower()] = v.strip()
+        conn.sendall((f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept_key(headers.get('sec-websocket-key', ''))}\r\n\r\n").encode())
+
+        subs = set()
+        lock = threading.Lock()
+        closed = threading.Event()
+
+        def send(text: str, opcode: int = OP_TEXT):
+            with lock:
+                conn.sendall(encode_frame(opcode, text.encode() if isinstance(text, str) else text, False))
+
+        def receive():
+            try:
+                while True:
+                    opcode, payload, _ = read_frame(reader)
+                    if opcode == OP_CLOSE:
+                        break
+                    if opcode == OP_PING:
+                        send(payload, OP_PONG)
+                        continue
+                    if opcode != OP_TEXT:
+                        continue
+                    msg = json.loads(payload)
+                    if msg.get('header', {}).get('tr_id') == 'PINGPONG':
+                        continue
+                    tr_type = msg['header'].get('tr_type')
+                    inp = msg['body']['input']
+                    key = (inp['tr_id'], inp['tr_key'])
+                    (subs.add if tr_type == '1' else subs.discard)(key)
+                    send(json.dumps({
+                        "header": {"tr_id": inp['tr_id'], "tr_key": inp['tr_key'], "encrypt": "N"},
+                        "body": {"rt_cd": "0", "msg_cd": "OPSP0000",
+                                 "msg1": "SUBSCRIBE SUCCESS" if tr_type == '1' else "UNSUBSCRIBE SUCCESS",
+                                 "output": {"iv": "0123456789abcdef", "key": "0" * 32}},
+                    }))
+            except (OSError, ConnectionError, ValueError, KeyError):
+                pass
+            closed.set()
+
+        threading.Thread(target=receive, daemon=True).start()
+
+        sent = 0
+        last_ping = time.time()
+        prices = {}
+        volumes = {}
+        try:
+            i = 0
+            while not closed.is_set() and not self._stop.is_set():
+                if time.time() - last_ping > self.ping_every:
+                    send(json.dumps({"header": {"tr_id": "PINGPONG", "datetime": time.strftime('%Y%m%d%H%M%S')}}))
+                    last_ping = time.time()
+                frame = None
+                if self.frames:
+                    candidate = self.frames[i % len(self.frames)]
+                    i += 1
+                    parts = candidate.split('|', 3)
+                    if len(parts) == 4 and (parts[1], parts[3].split('^', 1)[0]) in subs:
+                        frame = candidate
+                    elif i % len(self.frames):
+                        continue
+                elif subs:
+                    tr_id, code = random.choice(sorted(subs))
+                    price = prices.get(code, 70000) + random.choice((-100, 0, 100))
+                    prices[code] = price
+                    volumes[code] = volumes.get(code, 0) + 10
+                    frame = synthetic_trade(code, price, volumes[code]) if tr_id == TR_TRADE \
+                        else synthetic_book(code, price)
+                if frame:
+                    send(frame)
+                    sent += 1
+                    if self.drop_after and sent % self.drop_after == 0:
+                        break
+                time.sleep(self.interval)
+        except OSError:
+            pass
+        finally:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KIS 실시간 WebSocket 재생 서버 (오프라인 테스트용)')
+    parser.add_argument('--file', help='재생할 프레임 파일 (quote.py --stream --record 로 녹화, 없으면 가상 시세)')
+    parser.add_argument('--port', type=int, default=21000, help='포트 (기본: 21000)')
+    parser.add_argument('--interval', type=float, default=0.05, help='프레임 간격(초, 기본: 0.05)')
+    parser.add_argument('--drop-after', type=int, default=0, help='N프레임마다 연결 끊기 (재연결 테스트)')
+    args = parser.parse_args()
+
+    frames = None
+    if args.file:
+        with open(os.path.expanduser(args.file), encoding='utf-8') as f:
+            frames = [line.rstrip('\n') for line in f if line[:1] in ('0', '1')]
+    server = ReplayServer(frames, port=args.port, interval=args.interval, drop_after=args.drop_after)
+    print(f"📡 재생 서버 시작: {server.url} ({'파일 ' + args.file if frames else '가상 시세'})")
+    print("   quote.py --stream --ws-url 로 접속 (Ctrl+C 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+KRX 종목 마스터 - 전 종목(코스피/코스닥) 코드/이름 인덱스
+
+~/.kis-trading/symbols.tsv (코드\\t종목명\\t시장\\t초성) 를 읽어 메모리 인덱스를 만든다.
+정확/접두어/초성/부분/유사(2-gram) 검색을 지원하며 파일이 없으면 빈 마스터로 동작한다.
+마스터 파일은 symbols.py --refresh 로 KIS 종목 마스터(.mst)에서 생성한다.
+"""
+import os
+import bisect
+from typing import Optional, List, Dict, Tuple
+
+SYMBOLS_FILE = os.path.expanduser('~/.kis-trading/symbols.tsv')
+
+_CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_CHOSUNG_SET = set(_CHOSUNG)
+
+
+def normalize(name: str) -> str:
+    """검색용 정규화 (공백 제거, 대문자)"""
+    return ''.join(name.split()).upper()
+
+
+def to_chosung(name: str) -> str:
+    """한글 음절 → 초성 (그 외 문자는 정규화해서 유지)"""
+    out = []
+    for ch in normalize(name):
+        code = ord(ch) - 0xAC00
+        out.append(_CHOSUNG[code // 588] if 0 <= code < 11172 else ch)
+    return ''.join(out)
+
+
+def _bigrams(s: str) -> set:
+    return {s[i:i + 2] for i in range(len(s) - 1)} if len(s) > 1 else {s}
+
+
+class SymbolMaster:
+    """종목 마스터 인메모리 인덱스"""
+
+    def __init__(self, rows: List[Tuple[str, str, str]] = ()):
+        self.codes = []
+        self.names = []
+        self.markets = []
+        self._norm = []
+        self._chosung = []
+        self._by_code = {}
+        self._by_name = {}
+        self._sorted = []   # (정규화 이름, idx) 접두어 검색용
+        self._grams = None  # 2-gram → idx 집합 (유사 검색 시 생성)
+        for row in rows:
+            self._add(*row)
+        self._sorted.sort()
+
+    def _add(self, code: str, name: str, market: str = '', chosung: str = None):
+        idx = len(self.codes)
+        norm = normalize(name)
+        self.codes.append(code)
+        self.names.append(name)
+        self.markets.append(market)
+        self._norm.append(norm)
+        self._chosung.append(chosung or to_chosung(name))
+        self._by_code[code] = idx
+        self._by_name.setdefault(norm, idx)
+        self._sorted.append((norm, idx))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def name_of(self, code: str) -> Optional[str]:
+        """종목코드 → 종목명"""
+        idx = self._by_code.get(code)
+        return self.names[idx] if idx is not None else None
+
+    def market_of(self, code: str) -> str:
+        """종목코드 → 시장 (KOSPI/KOSDAQ, 없으면 빈 문자열)"""
+        idx = self._by_code.get(code)
+        return self.markets[idx] if idx is not None else ''
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, str, str]]:
+        """종목 검색 (정확 > 접두어 > 초성 > 부분 > 유사 순), (코드, 이름, 시장) 목록 반환"""
+        q = normalize(query)
+        if not q:
+            return []
+        found = []
+        seen = set()
+
+        def take(indices):
+            for i in indices:
+                if i not in seen:
+                    seen.add(i)
+                    found.append(i)
+                    if len(found) >= limit:
+                        return True
+            return False
+
+        exact = [self._by_code[q]] if q in self._by_code else []
+        if q in self._by_name:
+            exact.append(self._by_name[q])
+        if take(exact):
+            return self._rows(found)
+
+        # 접두어 (정렬된 이름에서 이진 탐색)
+        lo = bisect.bisect_left(self._sorted, (q,))
+        prefix = []
+        for norm, i in self._sorted[lo:]:
+            if not norm.startswith(q):
+                break
+            prefix.append(i)
+        prefix.sort(key=lambda i: len(self._norm[i]))
+        if take(prefix):
+            return self._rows(found)
+
+        # 초성 (예: ㅅㅅㅈㅈ → 삼성전자)
+        if all(ch in _CHOSUNG_SET for ch in q):
+            cho = [i for i, c in enumerate(self._chosung) if q in c]
+            cho.sort(key=lambda i: (not self._chosung[i].startswith(q), len(self._norm[i])))
+            if take(cho):
+                return self._rows(found)
+
+        # 부분 일치
+        sub = [i for i, n in enumerate(self._norm) if q in n]
+        sub.sort(key=lambda i: len(self._norm[i]))
+        if take(sub):
+            return self._rows(found)
+
+        # 유사 (2-gram Dice 유사도)
+        take(i for _, i in self._fuzzy(q))
+        return self._rows(found)
+
+    def _fuzzy(self, q: str, min_score: float = 0.3) -> List[Tuple[float, int]]:
+        if self._grams is None:
+            grams = {}
+            for i, n in enumerate(self._norm):
+                for g in _bigrams(n):
+                    grams.setdefault(g, []).append(i)
+            self._grams = grams
+        qg = _bigrams(q)
+        counts = {}
+        for g in qg:
+            for i in self._grams.get(g, ()):
+                counts[i] = counts.get(i, 0) + 1
+        scored = []
+        for i, c in counts.items():
+            score = 2 * c / (len(qg) + len(_bigrams(self._norm[i])))
+            if score >= min_score:
+                scored.append((-score, i))
+        scored.sort()
+        return [(-s, i) for s, i in scored]
+
+    def resolve(self, query: str) -> Optional[str]:
+        """종목명/코드 → 가장 잘 맞는 종목코드"""
+        rows = self.search(query, limit=1)
+        return rows[0][0] if rows else None
+
+    def resolve_exact(self, query: str) -> Optional[str]:
+        """주문용 엄격한 변환: 정확한 코드/이름, 또는 하나뿐인 접두어 일치만 (유사/부분/초성 일치 안 함)"""
+        q = normalize(query)
+        if not q:
+            return None
+        if q in self._by_code:
+            return q
+        if q in self._by_name:
+            return self.codes[self._by_name[q]]
+        lo = bisect.bisect_left(self._sorted, (q,))
+        matches = self._sorted[lo:lo + 2]
+        prefix = [i for norm, i in matches if norm.startswith(q)]
+        return self.codes[prefix[0]] if len(prefix) == 1 else None
+
+    def _rows(self, indices) -> List[Tuple[str, str, str]]:
+        return [(self.codes[i], self.names[i], self.markets[i]) for i in indices]
+
+
+def load_master(path: str = SYMBOLS_FILE) -> SymbolMaster:
+    """마스터 파일 로드 (없으면 빈 마스터)"""
+    rows = []
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) >= 2:
+                    rows.append(tuple(parts[:4]))
+    except OSError:
+        pass
+    return SymbolMaster(rows)
+
+
+def save_master(rows: List[Tuple[str, str, str]], path: str = SYMBOLS_FILE):
+    """마스터 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for code, name, market in rows:
+            f.write(f"{code}\t{name}\t{market}\t{to_chosung(name)}\n")
+    os.replace(tmp, path)
+
+
+def parse_mst(text: str, market: str) -> List[Tuple[str, str, str]]:
+    """KIS 종목 마스터(.mst) 파싱 → (단축코드, 한글명, 시장)
+
+    각 행 뒤쪽의 고정폭 필드(코스피 228자, 코스닥 222자)를 제외한 앞부분이
+    단축코드(9) + 표준코드(12) + 한글명이다.
+    """
+    tail = 228 if market == 'KOSPI' else 222
+    rows = []
+    for row in text.splitlines(keepends=True):
+        head = row[:len(row) - tail]
+        code = head[0:9].strip()
+        name = head[21:].strip()
+        if code and name:
+            rows.append((code, name, market))
+    return rows
+
+
+_master = None
+
+
+def get_master() -> SymbolMaster:
+    """프로세스 공유 마스터 (최초 사용 시 로드)"""
+    global _master
+    if _master is None:
+        _master = load_master()
+    return _master
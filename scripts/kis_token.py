@@ -0,0 +1,209 @@
+"""
+KIS 접근 토큰 관리 - 메모리 보관, 만료 전 백그라운드 재발급, 프로세스 간 발급 1회로 합치기
+
+토큰은 (base_url, APP_KEY)별 파일 ~/.kis-trading/tokens/<키>.json 에 저장하므로
+실전/모의 토큰이 서로 덮어쓰지 않는다.
+
+- 메모리의 토큰이 유효하면 파일을 읽지 않는다
+- 파일은 임시 파일에 쓴 뒤 os.replace로 교체한다 (읽는 쪽이 반쯤 쓴 파일을 보지 않음)
+- 발급은 <키>.lock 파일 잠금(fcntl.flock) 안에서 하고, 잠금을 얻은 뒤 파일을 다시 읽어
+  다른 스레드/프로세스가 이미 새 토큰을 받았으면 그대로 쓴다
+  (여러 프로세스가 동시에 EGW00123을 받아도 tokenP는 1번, KIS 발급 제한은 1분당 1회)
+- 만료 REFRESH_BEFORE초 전부터는 백그라운드 스레드가 미리 재발급한다
+"""
+import os
+import json
+import time
+import tempfile
+import threading
+from datetime import datetime
+from typing import Optional, Callable, Tuple, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내부 잠금만 사용
+    fcntl = None
+
+_TOKEN_DIR = os.path.expanduser('~/.kis-trading/tokens')
+
+REFRESH_BEFORE = 3600.0  # 만료 1시간 전부터 백그라운드 재발급
+EXPIRY_MARGIN = 60.0     # 만료 1분 전이면 만료된 것으로 간주
+RETRY_AFTER = 60.0       # 백그라운드 재발급 실패 시 재시도 간격 (초)
+
+
+def token_path(cfg: dict) -> str:
+    """설정(base_url + APP_KEY)별 토큰 파일 경로"""
+    import hashlib
+    key = hashlib.sha1(f"{cfg['base_url']}|{cfg['app_key']}".encode()).hexdigest()[:12]
+    return os.path.join(_TOKEN_DIR, f'{key}.json')
+
+
+def _parse_expiry(expired: str) -> float:
+    """'YYYY-MM-DD HH:MM:SS' → epoch 초 (형식 오류 시 0)"""
+    try:
+        return datetime.strptime(expired, '%Y-%m-%d %H:%M:%S').timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class FileLock:
+    """프로세스 간 배타 잠금 (fcntl 없으면 아무것도 하지 않음)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = -1
+
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            except OSError:
+                self.fd = -1
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd >= 0:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = -1
+
+
+class TokenManager:
+    """(base_url, APP_KEY) 하나의 토큰
+
+    issue()는 /oauth2/tokenP를 호출해 (토큰, 만료시각 문자열)을 반환하고 실패하면 None을 반환한다.
+    """
+
+    def __init__(self, path: str, issue: Callable[[], Optional[Tuple[str, str]]]):
+        self.path = path
+        self.lock_path = path[:-len('.json')] + '.lock'
+        self.issue = issue
+        self.token: Optional[str] = None
+        self.expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refresher = None
+        self.stats = {'file_loads': 0, 'issued': 0, 'shared': 0, 'failed': 0}
+
+    def cached(self) -> Optional[str]:
+        """메모리 토큰 (유효할 때만, 만료가 가까우면 백그라운드 재발급 시작)"""
+        token, left = self.token, self.expires_at - time.time()
+        if token is None or left <= EXPIRY_MARGIN:
+            return None
+        if left < REFRESH_BEFORE and self._refresher is None:
+            self._start_refresher()
+        return token
+
+    def get(self) -> Optional[str]:
+        """유효한 토큰 반환 (메모리 → 파일 → 발급 순, 발급 실패 시 None)"""
+        token = self.cached()
+        if token:
+            return token
+        with self._lock:
+            if self.token is None or self.expires_at - time.time() <= EXPIRY_MARGIN:
+                self._load()
+            if self.token is None or self.expires_at - time.time() <= EXPIRY_MARGIN:
+                if not self._refresh(None, EXPIRY_MARGIN):
+                    return None
+        return self.cached() or self.token
+
+    def invalidate(self, bad_token: Optional[str]) -> Optional[str]:
+        """서버가 거절한 토큰을 버리고 새 토큰 반환 (다른 스레드/프로세스가 이미 바꿨으면 그 토큰)"""
+        with self._lock:
+            if self.token and self.token != bad_token and self.expires_at - time.time() > EXPIRY_MARGIN:
+                return self.token
+            if not self._refresh(bad_token, EXPIRY_MARGIN):
+                return None
+            return self.token
+
+    def _read(self) -> Tuple[Optional[str], float]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return data.get('token'), _parse_expiry(data.get('expired'))
+        except (OSError, ValueError, AttributeError):
+            return None, 0.0
+
+    def _load(self):
+        """파일의 토큰을 메모리로 (self._lock 보유 상태)"""
+        token, expires_at = self._read()
+        self.stats['file_loads'] += 1
+        if token and expires_at > self.expires_at:
+            self.token, self.expires_at = token, expires_at
+
+    def _write(self, token: str, expired: str):
+        """임시 파일에 쓰고 교체 (권한 600)"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.token-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'token': token, 'expired': expired}, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def _refresh(self, stale: Optional[str], min_left: float) -> bool:
+        """파일 잠금 안에서 파일을 다시 읽고, 남은 시간이 min_left 이하이거나 stale이면 발급 (self._lock 보유 상태)"""
+        with FileLock(self.lock_path):
+            token, expires_at = self._read()
+            if token and token != stale and expires_at - time.time() > min_left:
+                # 잠금을 기다리는 동안 다른 프로세스가 발급
+                self.token, self.expires_at = token, expires_at
+                self.stats['shared'] += 1
+                return True
+            result = self.issue()
+            if not result:
+                self.stats['failed'] += 1
+                return False
+            token, expired = result
+            self._write(token, expired)
+        self.token, self.expires_at = token, _parse_expiry(expired)
+        self.stats['issued'] += 1
+        return True
+
+    def _start_refresher(self):
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, daemon=True, name='kis-token')
+                self._refresher.start()
+
+    def _refresh_loop(self):
+        """만료 REFRESH_BEFORE초 전에 미리 재발급 (다른 프로세스가 바꾼 토큰도 반영)"""
+        while True:
+            wait = self.expires_at - REFRESH_BEFORE - time.time()
+            if wait > 0:
+                time.sleep(min(wait, 600))
+                continue
+            with self._lock:
+                self._load()
+                if self.expires_at - time.time() <= REFRESH_BEFORE:
+                    self._refresh(None, REFRESH_BEFORE)
+            if self.expires_at - time.time() <= REFRESH_BEFORE:
+                # 발급 실패 또는 만료가 그대로인 토큰을 받음 → 발급 제한을 넘지 않게 쉬었다가 재시도
+                time.sleep(RETRY_AFTER)
+
+
+_managers: Dict[tuple, TokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(cfg: dict, issue: Callable[[], Optional[Tuple[str, str]]]) -> TokenManager:
+    """설정(base_url + APP_KEY)별 공유 TokenManager 반환"""
+    key = (cfg['base_url'], cfg['app_key'])
+    manager = _managers.get(key)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(key)
+            if manager is None:
+                manager = _managers[key] = TokenManager(token_path(cfg), issue)
+    return manager
+
+
+def token_stats() -> Dict[str, dict]:
+    """토큰 파일별 통계 (파일 읽기, 발급, 다른 프로세스 발급분 사용, 발급 실패 횟수)"""
+    return {os.path.basename(m.path): dict(m.stats) for m in list(_managers.values())}
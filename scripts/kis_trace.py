@@ -0,0 +1,380 @@
+"""
+KIS API 호출 추적 - TR ID별 단계 시간, 재시도/토큰 재발급 집계
+
+api_get/api_post 한 번을 호출(Call) 하나로 보고 걸린 시간을 단계별로 나눈다.
+    rate_wait  속도 제한 대기 (프로세스 간 토큰 버킷)
+    import     첫 호출의 requests/urllib3 import + 세션 생성
+    token      토큰 발급/재발급
+    hashkey    해시키 발급
+    connect    새 연결 (DNS/TCP/TLS)
+    server     요청 전송 ~ 응답 헤더 수신 (서버 처리 + 왕복, urllib3 재시도 포함)
+    transfer   응답 본문 수신
+    daemon     kisd 왕복에서 kisd 안의 처리 시간을 뺀 나머지
+    other      나머지 클라이언트 처리 (캐시 조회, JSON 해석 등)
+
+꺼져 있으면(기본) 호출 측은 enabled 하나만 확인하고 넘어간다. 켜는 방법:
+    --profile                               종료 시 호출별 분석 출력 (stderr)
+    TRACE_LOG (config.ini) / KIS_TRACE_LOG  호출마다 JSON 한 줄 기록
+    kisd --metrics-port N                   Prometheus 텍스트 형식 /metrics 제공
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import argparse
+import functools
+import threading
+from collections import deque
+from typing import Optional, Dict, List
+
+enabled = False
+
+PHASES = ('rate_wait', 'import', 'token', 'hashkey', 'connect', 'server', 'transfer', 'daemon', 'other')
+PHASE_LABELS = {
+    'rate_wait': '대기', 'import': '로딩', 'token': '토큰', 'hashkey': '해시키', 'connect': '연결',
+    'server': '서버', 'transfer': '수신', 'daemon': 'kisd', 'other': '기타',
+}
+EVENT_LABELS = {'retry': '재시도', 'token_refresh': '토큰 재발급', 'cache_hit': '캐시', 'new_connection': '신규연결'}
+
+# Prometheus 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_CALLS = 10000  # --profile용으로 보관하는 최근 호출 수
+
+_local = threading.local()
+_lock = threading.Lock()
+_stats: Dict[str, dict] = {}
+_calls = deque(maxlen=MAX_CALLS)
+_log = None
+
+
+class Call:
+    """API 호출 1건의 단계별 시간(초)과 이벤트 횟수"""
+    __slots__ = ('method', 'tr_id', 'path', 'start', 'ts', 'phases', 'events', 'status', 'ok', 'total',
+                 'spans', 'implicit')
+
+    def __init__(self, method: str, tr_id: str, path: str):
+        self.method = method
+        self.tr_id = tr_id
+        self.path = path
+        self.start = time.perf_counter()
+        self.ts = time.time()
+        self.phases: Dict[str, float] = {}
+        self.events: Dict[str, int] = {}
+        self.status = 0
+        self.ok = True
+        self.total = 0.0
+        self.spans: List[list] = []  # 진행 중인 단계 [이름, 시작, 하위 단계 시간]
+        self.implicit = False
+
+    def as_dict(self) -> dict:
+        return {
+            'ts': round(self.ts, 3), 'method': self.method, 'tr_id': self.tr_id, 'path': self.path,
+            'ok': self.ok, 'status': self.status, 'ms': round(self.total * 1000, 3),
+            'phases': {k: round(v * 1000, 3) for k, v in self.phases.items()}, 'events': dict(self.events),
+        }
+
+
+def enable(log_path: str = ''):
+    """추적 켜기 (log_path가 있으면 호출마다 JSON 한 줄 추가)"""
+    global enabled, _log
+    with _lock:
+        if log_path and _log is None:
+            path = os.path.expanduser(log_path)
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            _log = open(path, 'a', buffering=1, encoding='utf-8')
+    enabled = True
+
+
+def _current() -> Optional[Call]:
+    return getattr(_local, 'call', None)
+
+
+def begin(method: str, tr_id: str, path: str) -> Optional[Call]:
+    """호출 시작 (이미 진행 중인 호출이 있으면 None: 토큰 만료 재시도 같은 중첩 호출은 바깥 호출에 합산)"""
+    if getattr(_local, 'call', None) is not None:
+        return None
+    call = _local.call = Call(method, tr_id, path)
+    return call
+
+
+def end(call: Call, ok: bool = True):
+    """호출 종료: 단계에 잡히지 않은 시간은 other로 두고 집계/로그에 반영"""
+    _local.call = None
+    call.total = time.perf_counter() - call.start
+    call.ok = ok
+    rest = call.total - sum(call.phases.values())
+    if rest > 0:
+        call.phases['other'] = call.phases.get('other', 0.0) + rest
+    _local.last = call
+    _record(call)
+
+
+def traced(method: str):
+    """api_get/api_post(cfg, token, path, tr_id, ...) 추적 데코레이터 (꺼져 있으면 그대로 호출)"""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            call = begin(method, args[3] if len(args) > 3 else kwargs.get('tr_id', ''),
+                         args[2] if len(args) > 2 else kwargs.get('path', ''))
+            if call is None:
+                return fn(*args, **kwargs)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = result is not None
+                return result
+            finally:
+                end(call, ok)
+        return inner
+    return wrap
+
+
+def enter(name: str) -> list:
+    """단계 시작 (진행 중인 호출이 없으면 name으로 단독 호출을 연다, 예: 해시키 미리 받기)"""
+    call = _current()
+    if call is None:
+        call = begin('POST', name, '')
+        call.implicit = True
+    span = [name, time.perf_counter(), 0.0]
+    call.spans.append(span)
+    return span
+
+
+def leave(span: list) -> float:
+    """단계 종료: 하위 단계 시간을 뺀 만큼 기록하고 전체 경과 시간 반환"""
+    call = _current()
+    elapsed = time.perf_counter() - span[1]
+    if call is None or not call.spans or call.spans[-1] is not span:
+        return elapsed
+    call.spans.pop()
+    call.phases[span[0]] = call.phases.get(span[0], 0.0) + elapsed - span[2]
+    if call.spans:
+        call.spans[-1][2] += elapsed
+    elif call.implicit:
+        end(call)
+    return elapsed
+
+
+def leave_http(span: list, resp):
+    """HTTP 요청 단계 종료: 응답 헤더까지(resp.elapsed)는 server, 본문 수신은 transfer로 나눈다"""
+    call = _current()
+    elapsed = time.perf_counter() - span[1]
+    if call is None or not call.spans or call.spans[-1] is not span:
+        return
+    call.spans.pop()
+    transfer = max(0.0, elapsed - resp.elapsed.total_seconds())
+    call.phases['server'] = call.phases.get('server', 0.0) + max(0.0, elapsed - span[2] - transfer)
+    call.phases['transfer'] = call.phases.get('transfer', 0.0) + transfer
+    if call.spans:
+        call.spans[-1][2] += elapsed
+    call.status = resp.status_code
+    retries = getattr(resp.raw, 'retries', None)
+    if retries is not None and retries.history:
+        count('retry', len(retries.history))
+
+
+def add(phase: str, seconds: float):
+    """진행 중인 호출에 단계 시간 추가 (진행 중인 단계가 있으면 그 단계에서는 뺀다)"""
+    call = _current()
+    if call is None:
+        return
+    call.phases[phase] = call.phases.get(phase, 0.0) + seconds
+    if call.spans:
+        call.spans[-1][2] += seconds
+
+
+def count(event: str, n: int = 1):
+    """진행 중인 호출에 이벤트 횟수 추가 (retry, token_refresh, cache_hit, new_connection 등)"""
+    call = _current()
+    if call is not None:
+        call.events[event] = call.events.get(event, 0) + n
+
+
+def merge_remote(trace: Optional[dict], elapsed: float):
+    """kisd가 돌려준 호출 추적을 현재 호출에 합치고 나머지 왕복 시간은 daemon으로 기록"""
+    remote = 0.0
+    if trace:
+        for phase, ms in trace.get('phases', {}).items():
+            add(phase, ms / 1000)
+            remote += ms / 1000
+        for event, n in trace.get('events', {}).items():
+            count(event, n)
+    add('daemon', max(0.0, elapsed - remote))
+
+
+def last_call() -> Optional[dict]:
+    """이 스레드에서 마지막으로 끝난 호출 (kisd → 클라이언트 전달용)"""
+    call = getattr(_local, 'last', None)
+    _local.last = None
+    return call.as_dict() if call is not None else None
+
+
+def _record(call: Call):
+    with _lock:
+        st = _stats.get(call.tr_id)
+        if st is None:
+            st = _stats[call.tr_id] = {'calls': 0, 'errors': 0, 'seconds': 0.0, 'max': 0.0,
+                                       'buckets': [0] * len(LATENCY_BUCKETS), 'phases': {}, 'events': {}}
+        st['calls'] += 1
+        st['errors'] += 0 if call.ok else 1
+        st['seconds'] += call.total
+        st['max'] = max(st['max'], call.total)
+        for i, le in enumerate(LATENCY_BUCKETS):
+            if call.total <= le:
+                st['buckets'][i] += 1
+        for phase, sec in call.phases.items():
+            st['phases'][phase] = st['phases'].get(phase, 0.0) + sec
+        for event, n in call.events.items():
+            st['events'][event] = st['events'].get(event, 0) + n
+        _calls.append(call)
+        if _log is not None:
+            _log.write(json.dumps(call.as_dict(), ensure_ascii=False) + '\n')
+
+
+def trace_stats() -> Dict[str, dict]:
+    """TR ID별 누적 통계 (호출 수, 오류 수, 합계/최대 초, 단계별 합계 초, 이벤트 횟수)"""
+    with _lock:
+        return {tr_id: {'calls': st['calls'], 'errors': st['errors'], 'seconds': st['seconds'],
+                        'max': st['max'], 'phases': dict(st['phases']), 'events': dict(st['events'])}
+                for tr_id, st in _stats.items()}
+
+
+def prometheus_text() -> str:
+    """누적 통계를 Prometheus 텍스트 형식으로"""
+    with _lock:
+        stats = {k: dict(v, buckets=list(v['buckets']), phases=dict(v['phases']), events=dict(v['events']))
+                 for k, v in _stats.items()}
+    lines = [
+        '# HELP kis_api_call_seconds KIS API call latency by TR ID',
+        '# TYPE kis_api_call_seconds histogram',
+    ]
+    for tr_id, st in sorted(stats.items()):
+        for le, n in zip(LATENCY_BUCKETS, st['buckets']):
+            lines.append(f'kis_api_call_seconds_bucket{{tr_id="{tr_id}",le="{le}"}} {n}')
+        lines.append(f'kis_api_call_seconds_bucket{{tr_id="{tr_id}",le="+Inf"}} {st["calls"]}')
+        lines.append(f'kis_api_call_seconds_sum{{tr_id="{tr_id}"}} {st["seconds"]:.6f}')
+        lines.append(f'kis_api_call_seconds_count{{tr_id="{tr_id}"}} {st["calls"]}')
+    lines += ['# HELP kis_api_errors_total KIS API calls that returned an error',
+              '# TYPE kis_api_errors_total counter']
+    lines += [f'kis_api_errors_total{{tr_id="{tr_id}"}} {st["errors"]}' for tr_id, st in sorted(stats.items())]
+    lines += ['# HELP kis_api_phase_seconds_total Time spent per call phase',
+              '# TYPE kis_api_phase_seconds_total counter']
+    for tr_id, st in sorted(stats.items()):
+        for phase in PHASES:
+            if phase in st['phases']:
+                lines.append(f'kis_api_phase_seconds_total{{tr_id="{tr_id}",phase="{phase}"}} '
+                             f'{st["phases"][phase]:.6f}')
+    lines += ['# HELP kis_api_events_total Retries, token refreshes, cache hits, new connections',
+              '# TYPE kis_api_events_total counter']
+    for tr_id, st in sorted(stats.items()):
+        for event, n in sorted(st['events'].items()):
+            lines.append(f'kis_api_events_total{{tr_id="{tr_id}",event="{event}"}} {n}')
+    return '\n'.join(lines) + '\n'
+
+
+def serve_metrics(port: int, host: str = '127.0.0.1'):
+    """GET /metrics 로 prometheus_text()를 제공하는 HTTP 서버 (백그라운드 스레드)"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _fmt_call(call: Call) -> str:
+    parts = [f"{PHASE_LABELS[p]} {call.phases[p] * 1000:.1f}" for p in PHASES if call.phases.get(p, 0) >= 0.00005]
+    events = [f"{EVENT_LABELS.get(e, e)} {n}" for e, n in call.events.items()]
+    name = call.path.rsplit('/', 1)[-1] or call.tr_id
+    return (f"  {'❌' if not call.ok else '  '} {call.method:<4} {call.tr_id:<14} {name:<28} "
+            f"{call.total * 1000:>8.1f}ms = {' + '.join(parts) or '-'}" + (f" ({', '.join(events)})" if events else ''))
+
+
+def print_profile(limit: int = 50, out=None):
+    """호출별 단계 분석과 TR ID별 합계 출력"""
+    out = out or sys.stderr
+    with _lock:
+        calls = list(_calls)
+    if not calls:
+        print("⏱️ 프로파일: 추적된 API 호출 없음", file=out)
+        return
+    print(f"\n⏱️ 프로파일: API 호출 {len(calls)}건, 합계 {sum(c.total for c in calls) * 1000:.1f}ms (단위 ms)",
+          file=out)
+    for call in calls[:limit]:
+        print(_fmt_call(call), file=out)
+    if len(calls) > limit:
+        print(f"  ... {len(calls) - limit}건 생략", file=out)
+    print("  TR ID별 합계:", file=out)
+    for tr_id, st in sorted(trace_stats().items(), key=lambda kv: -kv[1]['seconds']):
+        parts = [f"{PHASE_LABELS[p]} {st['phases'][p] * 1000:.1f}" for p in PHASES
+                 if st['phases'].get(p, 0) >= 0.00005]
+        events = [f"{EVENT_LABELS.get(e, e)} {n}" for e, n in st['events'].items()]
+        print(f"    {tr_id:<14} {st['calls']:>4}건 합계 {st['seconds'] * 1000:>8.1f} | 평균 "
+              f"{st['seconds'] / st['calls'] * 1000:.1f} | 최대 {st['max'] * 1000:.1f} | {' + '.join(parts)}"
+              + (f" ({', '.join(events)})" if events else ''), file=out)
+
+
+class ProfileAction(argparse.Action):
+    """--profile: 인자 해석 시점에 추적을 켜고 종료 시 분석 출력"""
+
+    def __init__(self, option_strings, dest, **kwargs):
+        super().__init__(option_strings, dest, nargs=0, default=False, **kwargs)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, True)
+        if not enabled:
+            enable()
+            atexit.register(print_profile)
+
+
+def _timed_connection(base):
+    """새 연결(DNS/TCP/TLS) 시간 측정용 커넥션 클래스"""
+    class TimedConnection(base):
+        def connect(self):
+            if not enabled:
+                return super().connect()
+            t0 = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                add('connect', time.perf_counter() - t0)
+                count('new_connection')
+    return TimedConnection
+
+
+@functools.lru_cache(maxsize=None)
+def _timed_pool_classes() -> dict:
+    """scheme별 측정용 커넥션 풀 클래스 (urllib3는 첫 세션을 만들 때 import)"""
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = _timed_connection(HTTPConnection)
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = _timed_connection(HTTPSConnection)
+
+    return {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+
+def instrument_adapter(adapter):
+    """requests HTTPAdapter가 연결 시간을 잴 수 있는 커넥션 풀을 쓰도록 설정"""
+    adapter.poolmanager.pool_classes_by_scheme = dict(_timed_pool_classes())
@@ -0,0 +1,131 @@
+"""
+로컬 체결 내역 저장소 - ~/.kis-trading/trades.db (SQLite)
+
+inquire-daily-ccld 응답 행을 주문일자+주문번호 기준으로 저장한다.
+지난 날짜는 바뀌지 않으므로 동기화는 마지막 확정일 다음 날부터 오늘까지만 조회한다.
+"""
+import os
+import json
+import sqlite3
+import calendar
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+TRADES_DB = os.path.expanduser('~/.kis-trading/trades.db')
+
+_COLUMNS = ('ord_dt', 'odno', 'orgn_odno', 'pdno', 'prdt_name', 'sll_buy_dvsn_cd',
+            'sll_buy_dvsn_cd_name', 'ord_qty', 'ord_unpr', 'ord_tmd', 'tot_ccld_qty',
+            'avg_prvs', 'tot_ccld_amt', 'rmn_qty', 'cncl_yn')
+_INT_COLUMNS = {'ord_qty', 'ord_unpr', 'tot_ccld_qty', 'tot_ccld_amt', 'rmn_qty'}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS executions (
+    account TEXT NOT NULL,
+    ord_dt TEXT NOT NULL,
+    odno TEXT NOT NULL,
+    orgn_odno TEXT, pdno TEXT, prdt_name TEXT,
+    sll_buy_dvsn_cd TEXT, sll_buy_dvsn_cd_name TEXT,
+    ord_qty INTEGER, ord_unpr INTEGER, ord_tmd TEXT,
+    tot_ccld_qty INTEGER, avg_prvs REAL, tot_ccld_amt INTEGER,
+    rmn_qty INTEGER, cncl_yn TEXT,
+    raw TEXT,
+    PRIMARY KEY (account, ord_dt, odno)
+);
+CREATE INDEX IF NOT EXISTS idx_exec_pdno ON executions (account, pdno, ord_dt);
+CREATE INDEX IF NOT EXISTS idx_exec_odno ON executions (account, odno);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account TEXT PRIMARY KEY,
+    synced_through TEXT NOT NULL
+);
+'''
+
+
+def _num(v, cast):
+    try:
+        return cast(str(v).replace(',', ''))
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+class TradeStore:
+    """계좌별 체결 내역 저장소"""
+
+    def __init__(self, account: str, path: str = TRADES_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.account = account
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def add(self, rows: Iterable[dict]) -> int:
+        """체결 행 저장 (같은 주문일자+주문번호는 최신 값으로 갱신), 저장 건수 반환"""
+        values = []
+        for r in rows:
+            rec = {k: r.get(k, '') for k in _COLUMNS}
+            if not rec['odno'] or not rec['ord_dt']:
+                continue
+            for k in _INT_COLUMNS:
+                rec[k] = _num(rec[k], int)
+            rec['avg_prvs'] = _num(rec['avg_prvs'], float)
+            values.append((self.account, *(rec[k] for k in _COLUMNS), json.dumps(r, ensure_ascii=False)))
+        with self.db:
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO executions (account, {', '.join(_COLUMNS)}, raw) "
+                f"VALUES ({', '.join('?' * (len(_COLUMNS) + 2))})", values)
+        return len(values)
+
+    def synced_through(self) -> Optional[str]:
+        """확정 동기화된 마지막 날짜 (YYYYMMDD)"""
+        row = self.db.execute('SELECT synced_through FROM sync_state WHERE account=?',
+                              (self.account,)).fetchone()
+        return row[0] if row else None
+
+    def mark_synced(self, day: str):
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO sync_state VALUES (?, ?)', (self.account, day))
+
+    def query(self, start: str, end: str, code: str = '') -> List[dict]:
+        """기간(+종목) 체결 내역, API 응답과 같은 형태의 dict 목록 (시간순)"""
+        sql = 'SELECT raw FROM executions WHERE account=? AND ord_dt BETWEEN ? AND ?'
+        args = [self.account, start, end]
+        if code:
+            sql += ' AND pdno=?'
+            args.append(code)
+        sql += ' ORDER BY ord_dt, ord_tmd, odno'
+        return [json.loads(r[0]) for r in self.db.execute(sql, args)]
+
+    def summary(self, start: str, end: str, code: str = '') -> List[dict]:
+        """종목별 매수/매도 체결 집계"""
+        sql = '''
+            SELECT pdno, MAX(prdt_name) AS name, COUNT(*) AS orders,
+                   SUM(CASE WHEN sll_buy_dvsn_cd='02' THEN tot_ccld_qty ELSE 0 END) AS buy_qty,
+                   SUM(CASE WHEN sll_buy_dvsn_cd='02' THEN tot_ccld_amt ELSE 0 END) AS buy_amt,
+                   SUM(CASE WHEN sll_buy_dvsn_cd='01' THEN tot_ccld_qty ELSE 0 END) AS sell_qty,
+                   SUM(CASE WHEN sll_buy_dvsn_cd='01' THEN tot_ccld_amt ELSE 0 END) AS sell_amt
+            FROM executions WHERE account=? AND ord_dt BETWEEN ? AND ?'''
+        args = [self.account, start, end]
+        if code:
+            sql += ' AND pdno=?'
+            args.append(code)
+        sql += ' GROUP BY pdno ORDER BY buy_amt + sell_amt DESC'
+        return [dict(r) for r in self.db.execute(sql, args)]
+
+
+def sync_start(store: TradeStore, since: str) -> str:
+    """동기화 시작일: 마지막 확정일 다음 날 (처음이면 since)"""
+    last = store.synced_through()
+    if not last:
+        return since
+    return (datetime.strptime(last, '%Y%m%d') + timedelta(days=1)).strftime('%Y%m%d')
+
+
+def three_months_ago(today: datetime = None) -> str:
+    """TTTC0081R 조회 가능 시작일 (3개월 전, 그 이전은 CTSC9215R)"""
+    today = today or datetime.today()
+    year, month = divmod(today.year * 12 + today.month - 1 - 3, 12)
+    day = min(today.day, calendar.monthrange(year, month + 1)[1])
+    return datetime(year, month + 1, day).strftime('%Y%m%d')
+
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""KIS 상주 프로세스 (kisd) - 설정/토큰/커넥션 풀/속도 제한을 유지하고 Unix 소켓으로 API 호출 처리
+
+kisd가 실행 중이면 다른 스크립트(quote.py, market.py, holdings.py 등)의
+get_token/api_get/api_post 호출이 자동으로 kisd로 전달된다.
+"""
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+import kis_daemon
+import kis_trace
+from kis_common import (load_config, get_token, api_get, api_post, add_common_args, http_stats, rate_limit_stats,
+                        cache_stats, token_stats)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """요청 처리 스레드의 print 출력을 모아 클라이언트에 전달 (stdout/stderr 각각 하나씩)"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def begin(self):
+        self._local.buf = io.StringIO()
+
+    def end(self) -> str:
+        buf = getattr(self._local, 'buf', None)
+        self._local.buf = None
+        return buf.getvalue() if buf else ''
+
+    def write(self, s):
+        buf = getattr(self._local, 'buf', None)
+        if buf is not None:
+            return buf.write(s)
+        return self._stream.write(s)
+
+    def flush(self):
+        self._stream.flush()
+
+
+class KisDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, cfg: dict, output: _ThreadOutput, errors: _ThreadOutput):
+        self.cfg = cfg
+        self.output = output
+        self.errors = errors
+        self.started = time.time()
+        self.last_request = time.time()
+        self.requests = 0
+        super().__init__(path, KisHandler)
+
+
+class KisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        for line in self.rfile:
+            server.last_request = time.time()
+            server.requests += 1
+            try:
+                req = json.loads(line)
+            except ValueError:
+                req = {}
+                resp = {'ok': False, 'error': 'invalid request'}
+            else:
+                server.output.begin()
+                server.errors.begin()
+                try:
+                    resp = self._dispatch(req)
+                except SystemExit:
+                    resp = {'ok': False, 'error': 'exit'}
+                except Exception as e:
+                    # 클라이언트가 같은 종류의 예외로 다시 발생시킨다 (주문은 결과 불명 처리)
+                    server.errors._stream.write(f"❌ kisd 처리 오류: {type(e).__name__}: {e}\n")
+                    resp = {'ok': False, 'error': str(e), 'exception': type(e).__name__}
+                resp['output'] = server.output.end()
+                resp['errors'] = server.errors.end()
+                if req.get('trace'):
+                    resp['trace'] = kis_trace.last_call()
+            self.wfile.write(json.dumps(resp, ensure_ascii=False).encode() + b'\n')
+            self.wfile.flush()
+            if req.get('op') == 'shutdown':
+                threading.Thread(target=server.shutdown, daemon=True).start()
+                return
+
+    def _dispatch(self, req: dict) -> dict:
+        cfg = self.server.cfg
+        op = req.get('op')
+        if op == 'ping':
+            return {'ok': True, 'result': {'pid': os.getpid(), 'uptime': time.time() - self.server.started,
+                                           'requests': self.server.requests}}
+        if op == 'get_token':
+            return {'ok': True, 'result': get_token(cfg)}
+        if op == 'api_get':
+            result = api_get(cfg, get_token(cfg), req['path'], req['tr_id'], req.get('params', {}),
+                             req.get('tr_cont', ''))
+            return {'ok': result is not None, 'result': result}
+        if op == 'api_post':
+            result = api_post(cfg, get_token(cfg), req['path'], req['tr_id'], req.get('body', {}),
+                              req.get('use_hashkey', True), req.get('hashkey'))
+            return {'ok': result is not None, 'result': result}
+        if op == 'stats':
+            return {'ok': True, 'result': {'http': http_stats(), 'rate_limit': rate_limit_stats(),
+                                           'cache': cache_stats(), 'trace': kis_trace.trace_stats(),
+                                           'token': token_stats()}}
+        if op == 'shutdown':
+            return {'ok': True, 'result': None}
+        return {'ok': False, 'error': f'unknown op: {op}'}
+
+
+def _watch_idle(server: KisDaemon, idle_timeout: int):
+    """유휴 시간 초과 시 종료"""
+    while True:
+        time.sleep(min(idle_timeout, 30))
+        if time.time() - server.last_request > idle_timeout:
+            print(f"💤 {idle_timeout}초 동안 요청이 없어 종료합니다.")
+            server.shutdown()
+            return
+
+
+def serve(cfg: dict, idle_timeout: int = 0, metrics_port: int = 0):
+    """kisd 실행 (포그라운드), metrics_port가 있으면 Prometheus /metrics 제공"""
+    path = kis_daemon.socket_path(cfg)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        if kis_daemon.request(cfg, 'ping') is not None:
+            print(f"❌ kisd가 이미 실행 중입니다: {path}")
+            sys.exit(1)
+        os.remove(path)  # 이전 실행의 잔여 소켓
+
+    # kisd 자신은 항상 직접 호출
+    kis_daemon.enabled = False
+    # 상주 프로세스는 항상 추적 (클라이언트 --profile 단계 분석, --status, /metrics)
+    kis_trace.enable(cfg.get('trace_log', ''))
+
+    output, errors = _ThreadOutput(sys.stdout), _ThreadOutput(sys.stderr)
+    old_umask = os.umask(0o177)  # 소켓 권한 600
+    try:
+        server = KisDaemon(path, cfg, output, errors)
+    finally:
+        os.umask(old_umask)
+
+    get_token(cfg)  # 시작 시 토큰 미리 확보
+    print(f"🚀 kisd 시작 (pid {os.getpid()}): {path}")
+    if metrics_port:
+        kis_trace.serve_metrics(metrics_port)
+        print(f"📈 메트릭: http://127.0.0.1:{metrics_port}/metrics")
+    sys.stdout.flush()
+    sys.stdout, sys.stderr = output, errors
+    if idle_timeout > 0:
+        threading.Thread(target=_watch_idle, args=(server, idle_timeout), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sys.stdout, sys.stderr = output._stream, errors._stream
+        server.server_close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        print("🛑 kisd 종료")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KIS 상주 프로세스 (kisd)')
+    add_common_args(parser)
+    parser.add_argument('--status', action='store_true', help='실행 상태 및 통계 확인')
+    parser.add_argument('--stop', action='store_true', help='실행 중인 kisd 종료')
+    parser.add_argument('--idle-timeout', type=int, default=3600,
+                        help='요청이 없으면 자동 종료할 시간(초, 0: 계속 실행, 기본: 3600)')
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help='Prometheus 텍스트 형식 /metrics 포트 (기본: 사용 안함)')
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+
+    if args.status or args.stop:
+        resp = kis_daemon.request(cfg, 'shutdown' if args.stop else 'ping')
+        if resp is None:
+            print("⚪ kisd 실행 중 아님")
+            sys.exit(1)
+        if args.stop:
+            print("🛑 kisd 종료 요청 완료")
+            return
+        info = resp['result']
+        stats = kis_daemon.request(cfg, 'stats')['result']
+        print(f"🟢 kisd 실행 중 (pid {info['pid']}, 가동 {int(info['uptime'])}초, 요청 {info['requests']}건)")
+        for base_url, st in stats['http'].items():
+            print(f"  {base_url}: 요청 {st['requests']}건 | 신규연결 {st['connections']} | 재사용 {st['reused']}")
+        if stats['cache']:
+            c = stats['cache']
+            print(f"  캐시: 적중 {c['hits'] + c['disk_hits']} | 미스 {c['misses']} | 제거 {c['evictions']}")
+        for tr_id, st in sorted(stats.get('trace', {}).items(), key=lambda kv: -kv[1]['calls']):
+            ph = st['phases']
+            print(f"  {tr_id}: {st['calls']}건 평균 {st['seconds'] / st['calls'] * 1000:.1f}ms "
+                  f"(대기 {ph.get('rate_wait', 0) * 1000 / st['calls']:.1f} | 서버 "
+                  f"{ph.get('server', 0) * 1000 / st['calls']:.1f}) | 오류 {st['errors']} | "
+                  f"재시도 {st['events'].get('retry', 0)} | 토큰 재발급 {st['events'].get('token_refresh', 0)}")
+        return
+
+    serve(cfg, args.idle_timeout, args.metrics_port)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,24 +18,47 @@ def get_index(cfg: dict, token: str, index_code: str) -> Optional[dict]:
     return api_get(cfg, token, '/uapi/domestic-stock/v1/quotations/inquire-index-price', 'FHPUP02100000', params)
 
 
-def get_volume_rank(cfg: dict, token: str, market: str = "0000") -> Optional[dict]:
-    """거래량 순위 조회"""
+def get_volume_rank(cfg: dict, token: str, market: str = "0000", sort: str = "0",
+                    price_min: str = "", price_max: str = "") -> Optional[dict]:
+    """거래량 순위 조회 (최대 30종목, 가격대 price_min~price_max원)"""
     params = {
         "FID_COND_MRKT_DIV_CODE": "J",
         "FID_COND_SCR_DIV_CODE": "20171",
         "FID_INPUT_ISCD": market,  # 0000:전체, 0001:거래소, 1001:코스닥
         "FID_DIV_CLS_CODE": "0",
-        "FID_BLNG_CLS_CODE": "0",  # 0:평균거래량
+        "FID_BLNG_CLS_CODE": sort,  # 0:평균거래량, 1:거래증가율, 2:평균거래회전율, 3:거래금액순, 4:평균거래금액회전율
         "FID_TRGT_CLS_CODE": "111111111",
         "FID_TRGT_EXLS_CLS_CODE": "0000000000",
-        "FID_INPUT_PRICE_1": "",
-        "FID_INPUT_PRICE_2": "",
+        "FID_INPUT_PRICE_1": str(price_min),
+        "FID_INPUT_PRICE_2": str(price_max),
         "FID_VOL_CNT": "",
         "FID_INPUT_DATE_1": "",
     }
     return api_get(cfg, token, '/uapi/domestic-stock/v1/quotations/volume-rank', 'FHPST01710000', params)
 
 
+def get_fluctuation_rank(cfg: dict, token: str, market: str = "0000", sort: str = "0",
+                         price_min: str = "", price_max: str = "") -> Optional[dict]:
+    """등락률 순위 조회 (최대 30종목, 가격대 price_min~price_max원)"""
+    params = {
+        "fid_cond_mrkt_div_code": "J",
+        "fid_cond_scr_div_code": "20170",
+        "fid_input_iscd": market,  # 0000:전체, 0001:거래소, 1001:코스닥
+        "fid_rank_sort_cls_code": sort,  # 0:상승률, 1:하락률, 2:시가대비상승률, 3:시가대비하락률, 4:변동률
+        "fid_input_cnt_1": "0",
+        "fid_prc_cls_code": "0",
+        "fid_input_price_1": str(price_min),
+        "fid_input_price_2": str(price_max),
+        "fid_vol_cnt": "",
+        "fid_trgt_cls_code": "0",
+        "fid_trgt_exls_cls_code": "0",
+        "fid_div_cls_code": "0",
+        "fid_rsfl_rate1": "",
+        "fid_rsfl_rate2": "",
+    }
+    return api_get(cfg, token, '/uapi/domestic-stock/v1/ranking/fluctuation', 'FHPST01700000', params)
+
+
 def show_index(cfg: dict, token: str):
     """코스피/코스닥 지수 출력"""
     for name, code in [('코스피', '0001'), ('코스닥', '1001')]:
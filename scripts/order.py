@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """매수/매도 주문 (확인 필수)"""
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import argparse
+import csv
 import sys
 import os
+import time
+import sqlite3
 
 sys.path.insert(0, os.path.dirname(__file__))
-from kis_common import load_config, get_token, api_post, api_get, fmt_price, fmt_num, add_common_args, get_stock_name_from_api, resolve_tr_id
+from kis_common import load_config, get_token, api_post, api_get, get_hashkey, fmt_price, fmt_num, add_common_args, get_stock_name_from_api, resolve_tr_id, safe_int
+from quote import resolve_order_code, get_quotes, parse_quote
+from kis_orders import open_store
 
 
 def get_stock_name(cfg: dict, token: str, code: str) -> str:
@@ -14,30 +19,52 @@ def get_stock_name(cfg: dict, token: str, code: str) -> str:
     return get_stock_name_from_api(cfg, token, code)
 
 
+# KRX 호가단위: (가격 상한, 호가단위), 마지막 상한 이상은 TOP_TICK
+TICK_TABLE = ((1000, 1), (5000, 5), (10000, 10), (50000, 50), (100000, 100), (500000, 500))
+TOP_TICK = 1000
+PRICE_LIMIT_PCT = 30  # 가격제한폭 (기준가 대비 ±30%)
+ORD_DVSN = {'limit': '00', 'market': '01'}
+
+
+def tick_size(price: int) -> int:
+    """가격의 KRX 호가단위"""
+    for limit, tick in TICK_TABLE:
+        if price < limit:
+            return tick
+    return TOP_TICK
+
+
 def round_to_tick(price: int) -> int:
     """KRX 호가단위로 반올림"""
-    if price < 1000: tick = 1
-    elif price < 5000: tick = 5
-    elif price < 10000: tick = 10
-    elif price < 50000: tick = 50
-    elif price < 100000: tick = 100
-    elif price < 500000: tick = 500
-    else: tick = 1000
+    tick = tick_size(price)
     return int(round(price / tick) * tick)
 
 
-def place_order(cfg: dict, token: str, side: str, code: str, qty: int,
-                price: int = 0, market: bool = False) -> Optional[dict]:
-    """주문 실행"""
-    # TR ID는 api_post에서 resolve_tr_id로 자동 변환
-    tr_id = "TTTC0012U" if side == 'buy' else "TTTC0011U"
+def price_limits(base: int) -> Tuple[int, int]:
+    """기준가(전일 종가)의 가격제한폭 → (하한가, 상한가), 호가단위 안쪽으로 맞춤"""
+    upper = base * (100 + PRICE_LIMIT_PCT) // 100
+    lower = -(-base * (100 - PRICE_LIMIT_PCT) // 100)
+    upper -= upper % tick_size(upper)
+    lower += -lower % tick_size(lower)
+    return lower, upper
+
+
+ORDER_PATH = '/uapi/domestic-stock/v1/trading/order-cash'
+
 
-    ord_dvsn = "01" if market else "00"  # 01:시장가, 00:지정가
+def order_tr_id(side: str) -> str:
+    """주문 TR ID (api_post에서 resolve_tr_id로 모의투자 TR ID 자동 변환)"""
+    return "TTTC0012U" if side == 'buy' else "TTTC0011U"
+
+
+def order_body(cfg: dict, code: str, qty: int, price: int = 0, market: bool = False) -> dict:
+    """주문 요청 본문 (지정가는 호가단위로 반올림)"""
+    ord_dvsn = ORD_DVSN['market' if market else 'limit']
 
     if not market and price > 0:
         price = round_to_tick(price)
 
-    body = {
+    return {
         "CANO": cfg['account_no'],
         "ACNT_PRDT_CD": cfg['product_code'],
         "PDNO": code,
@@ -46,20 +73,272 @@ def place_order(cfg: dict, token: str, side: str, code: str, qty: int,
         "ORD_UNPR": str(price if not market else 0),
     }
 
-    return api_post(cfg, token, '/uapi/domestic-stock/v1/trading/order-cash', tr_id, body)
+
+def track_orders(cfg: dict, submitted: List[dict]):
+    """제출된 주문을 주문 추적 저장소에 기록 (orders.py로 체결 확인/정정/취소)"""
+    try:
+        store = open_store(cfg)
+        for o in submitted:
+            store.record(o['output'], o['side'], o['code'], o['qty'], o['price'], o['market'],
+                         o.get('ref_price', 0), submitted_at=o['submitted_at'])
+        store.close()
+    except sqlite3.Error as e:
+        print(f"⚠️  주문 기록 실패 (주문은 정상 처리됨): {e}")
+
+
+def reference_prices(cfg: dict, token: str, codes: List[str]) -> Dict[str, int]:
+    """시장가 주문 슬리피지 기준가 (제출 직전 현재가)"""
+    if not codes:
+        return {}
+    quotes = get_quotes(cfg, token, codes)
+    return {c: parse_quote(q.get('output', {}))['price'] for c, q in quotes.items() if q}
+
+
+def place_order(cfg: dict, token: str, side: str, code: str, qty: int,
+                price: int = 0, market: bool = False, track: bool = True, guard=None) -> Optional[dict]:
+    """주문 실행 (성공 시 주문 추적 저장소에 기록)
+
+    guard(kis_risk.RiskGuard)를 주면 보낸 주문을 스냅샷에 반영한다. 점검(guard.check)은 호출 측에서
+    주문 확인 전에 해 두어야 한다.
+    """
+    ref_price = reference_prices(cfg, token, [code]).get(code, 0) if market and track else 0
+    submitted_at = time.time()
+    result = api_post(cfg, token, ORDER_PATH, order_tr_id(side), order_body(cfg, code, qty, price, market))
+    if result and track:
+        track_orders(cfg, [{'output': result.get('output', {}), 'side': side, 'code': code, 'qty': qty,
+                            'price': 0 if market else round_to_tick(price), 'market': market,
+                            'ref_price': ref_price, 'submitted_at': submitted_at}])
+    if result and guard is not None:
+        guard.record(side, code, qty, 0 if market else round_to_tick(price), market)
+    return result
+
+
+# ── 일괄 주문 ─────────────────────────────────────────────────
+
+_SIDES = {'buy': 'buy', 'sell': 'sell', '매수': 'buy', '매도': 'sell'}
+_MARKET_PRICES = ('market', '시장가')
+
+
+def load_batch(path: str) -> List[dict]:
+    """일괄 주문 CSV 읽기 (헤더: side,code,qty,price / code는 종목코드 또는 종목명, price는 가격 또는 market)"""
+    with open(os.path.expanduser(path), encoding='utf-8-sig', newline='') as f:
+        rows = []
+        reader = csv.DictReader(f)
+        for row in reader:
+            row = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+            if any(row.values()) and not row.get('side', '').startswith('#'):
+                row['line'] = reader.line_num  # 빈 줄도 세는 파일 행 번호 (오류 메시지용)
+                rows.append(row)
+        return rows
+
+
+def candidates_text(candidates: list) -> str:
+    """후보 종목 목록 → '삼성전자(005930), 삼성SDI(006400)'"""
+    return ', '.join(f"{name}({code})" for code, name, _ in candidates) or '없음'
+
+
+def validate_batch(cfg: dict, token: str, rows: List[dict]) -> Tuple[List[dict], List[str]]:
+    """일괄 주문 전체 사전 검증 → (주문 목록, 오류 목록), 오류가 하나라도 있으면 주문하지 않는다"""
+    orders, errors = [], []
+    for row in rows:
+        line = row['line']
+        side = _SIDES.get(row.get('side', '').lower())
+        if not side:
+            errors.append(f"{line}행: side는 buy/sell이어야 합니다 ({row.get('side')!r})")
+            continue
+        item = row.get('code') or row.get('name', '')
+        code, candidates = (item, []) if item.isdigit() and len(item) == 6 else \
+            resolve_order_code(item) if item else (None, [])
+        if not code:
+            errors.append(f"{line}행: 종목을 하나로 정할 수 없습니다 ({item!r}, 후보: {candidates_text(candidates)})"
+                          " - 정확한 종목명이나 코드를 쓰세요")
+            continue
+        qty = safe_int(row.get('qty'), -1)
+        if qty <= 0:
+            errors.append(f"{line}행: 수량은 1 이상의 정수여야 합니다 ({row.get('qty')!r})")
+            continue
+        raw_price = row.get('price', '').replace(',', '')
+        market = raw_price.lower() in _MARKET_PRICES
+        price = 0 if market else safe_int(raw_price)
+        if not market and price <= 0:
+            errors.append(f"{line}행: 가격을 입력하거나 market(시장가)으로 지정하세요 ({row.get('price')!r})")
+            continue
+        tick_price = 0 if market else round_to_tick(price)
+        orders.append({'line': line, 'side': side, 'code': code, 'qty': qty, 'price': tick_price,
+                       'raw_price': price, 'market': market, 'adjusted': not market and tick_price != price})
+
+    # 매도 수량은 주문가능수량 이내인지 확인 (잔고 1회 조회)
+    sells = {}
+    for o in orders:
+        if o['side'] == 'sell':
+            sells[o['code']] = sells.get(o['code'], 0) + o['qty']
+    if sells:
+        from holdings import get_holdings
+        rows_h, last = get_holdings(cfg, token)
+        if last is None:
+            errors.append("잔고 조회 실패: 매도 수량을 확인할 수 없습니다")
+        else:
+            avail = {h.get('pdno'): safe_int(h.get('ord_psbl_qty', h.get('hldg_qty'))) for h in rows_h}
+            for code, qty in sells.items():
+                if qty > avail.get(code, 0):
+                    errors.append(f"{code}: 매도 수량 {fmt_num(qty)}주 > 주문가능 {fmt_num(avail.get(code, 0))}주")
+    return orders, errors
+
+
+def submit_batch(cfg: dict, token: str, orders: List[dict], workers: int = 4,
+                 track: bool = True) -> List[dict]:
+    """일괄 주문 제출 - 해시키는 전부 미리 동시 발급, 주문은 받은 해시키로 이어서 전송 (속도 제한은 토큰 버킷)"""
+    bodies = [order_body(cfg, o['code'], o['qty'], o['price'], o['market']) for o in orders]
+    refs = reference_prices(cfg, token, list(dict.fromkeys(o['code'] for o in orders if o['market']))) \
+        if track else {}
+    n = max(1, min(workers, len(orders)))
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=n) as hk_pool, ThreadPoolExecutor(max_workers=n) as pool:
+        hashkeys = [hk_pool.submit(get_hashkey, cfg, token, b) for b in bodies]
+
+        def submit(i: int) -> dict:
+            o = orders[i]
+            submitted_at = time.time()
+            t0 = time.perf_counter()
+            try:
+                hk = hashkeys[i].result() or None  # 발급 실패 시 api_post에서 다시 발급
+                result = api_post(cfg, token, ORDER_PATH, order_tr_id(o['side']), bodies[i], hashkey=hk)
+                error = '' if result is not None else '주문 거부'
+            except Exception as e:
+                # 타임아웃/연결 끊김은 접수 여부를 알 수 없다 - 다른 주문 결과는 그대로 추적/보고
+                result, error = None, f"결과 불명 (체결 내역 확인 필요): {type(e).__name__}"
+            out = (result or {}).get('output', {})
+            return {**o, 'ok': result is not None, 'error': error, 'unknown': error.startswith('결과 불명'),
+                    'latency_ms': (time.perf_counter() - t0) * 1000,
+                    'order_no': out.get('ODNO', out.get('odno', '')),
+                    'order_time': out.get('ORD_TMD', out.get('ord_tmd', '')),
+                    'output': out, 'submitted_at': submitted_at, 'ref_price': refs.get(o['code'], 0)}
+
+        results = list(pool.map(submit, range(len(orders))))
+    if track:
+        track_orders(cfg, [r for r in results if r['ok']])
+    return results
+
+
+def print_batch(orders: List[dict], names: Dict[str, str]):
+    """일괄 주문 확인표"""
+    print(f"📋 일괄 주문 확인 ({len(orders)}건)")
+    print(f"  {'행':>3} {'구분':<4} {'종목':<14} {'수량':>8} {'가격':>12}")
+    buy_amt = sell_amt = 0
+    for o in orders:
+        price_str = '시장가' if o['market'] else fmt_num(o['price']) + ('*' if o['adjusted'] else '')
+        print(f"  {o['line']:>3} {'🟢매수' if o['side'] == 'buy' else '🔴매도':<4} "
+              f"{names.get(o['code'], o['code'])[:10]:<10}({o['code']}) {fmt_num(o['qty']):>8} {price_str:>12}")
+        amt = o['qty'] * o['price']
+        if o['side'] == 'buy':
+            buy_amt += amt
+        else:
+            sell_amt += amt
+    print(f"  지정가 합계: 매수 {fmt_price(buy_amt)} | 매도 {fmt_price(sell_amt)} (시장가 제외)")
+    if any(o['adjusted'] for o in orders):
+        print("  * 호가단위로 조정된 가격 (리스크 점검 생략 시)")
+
+
+def print_batch_results(results: List[dict], names: Dict[str, str], elapsed: float):
+    """일괄 주문 결과표 (주문별 응답시간 포함)"""
+    print(f"  {'행':>3} {'결과':<4} {'종목':<14} {'주문번호':>12} {'응답(ms)':>9}")
+    for r in results:
+        mark = '✅' if r['ok'] else '❓' if r.get('unknown') else '❌'
+        print(f"  {r['line']:>3} {mark:<4} {names.get(r['code'], r['code'])[:10]:<10}({r['code']})"
+              f" {r['order_no'] or '-':>12} {r['latency_ms']:>9.0f}" + (f"  {r['error']}" if r.get('error') else ''))
+    ok = sum(r['ok'] for r in results)
+    lat = sorted(r['latency_ms'] for r in results)
+    print(f"\n{'✅' if ok == len(results) else '⚠️ '} {ok}/{len(results)}건 주문 완료 | 전체 {elapsed:.2f}초"
+          f" | 응답 평균 {sum(lat) / len(lat):.0f}ms, 최대 {lat[-1]:.0f}ms")
+    unknown = sum(bool(r.get('unknown')) for r in results)
+    if unknown:
+        print(f"❓ {unknown}건은 응답을 받지 못해 접수 여부를 알 수 없습니다. 다시 주문하기 전에"
+              f" orders.py --all 또는 history.py로 오늘 주문/체결 내역을 확인하세요.")
+
+
+def risk_guard(cfg: dict, token: str, codes: List[str]):
+    """주문 전 리스크 점검기 (스냅샷이 오래된 부분만 재조회, 실패한 부분이 필요한 주문은 check에서 거부)"""
+    from kis_risk import RiskGuard
+    guard = RiskGuard(cfg)
+    for e in guard.prepare(token, codes):
+        print(f"⚠️  리스크 스냅샷: {e}")
+    return guard
+
+
+def run_batch(cfg: dict, path: str, dry_run: bool, workers: int, risk_check: bool = True):
+    """--batch 실행: 검증 → 확인표 → (드라이런이 아니면) 제출 → 결과표"""
+    rows = load_batch(path)
+    if not rows:
+        print(f"❌ 주문 파일이 비어 있습니다: {path}")
+        sys.exit(1)
+    token = get_token(cfg)
+    orders, errors = validate_batch(cfg, token, rows)
+    guard = None
+    if risk_check and orders:
+        guard = risk_guard(cfg, token, list(dict.fromkeys(o['code'] for o in orders)))
+        errors += guard.check_batch(orders)
+    if errors:
+        print(f"❌ 주문 파일 검증 실패 ({len(errors)}건) - 아무 주문도 실행하지 않았습니다.")
+        for e in errors:
+            print(f"  - {e}")
+        sys.exit(1)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(orders)))) as pool:
+        codes = list(dict.fromkeys(o['code'] for o in orders))
+        names = dict(zip(codes, pool.map(lambda c: get_stock_name(cfg, token, c), codes)))
+    print_batch(orders, names)
+
+    if dry_run:
+        print(f"\n✅ 드라이런 완료 (실제 주문되지 않음)")
+        return
+
+    print(f"\n⚠️  위 {len(orders)}건 주문을 실행합니다.")
+    t0 = time.perf_counter()
+    results = submit_batch(cfg, token, orders, workers)
+    for r in results:
+        if r['ok'] and guard is not None:
+            guard.record(r['side'], r['code'], r['qty'], r['price'], r['market'])
+    print()
+    print_batch_results(results, names, time.perf_counter() - t0)
+    if not all(r['ok'] for r in results):
+        sys.exit(1)
 
 
 def main():
     parser = argparse.ArgumentParser(description='매수/매도 주문')
     add_common_args(parser)
-    parser.add_argument('--side', required=True, choices=['buy', 'sell'], help='매수(buy) 또는 매도(sell)')
-    parser.add_argument('--code', required=True, help='종목코드 (6자리)')
-    parser.add_argument('--qty', required=True, type=int, help='주문 수량')
+    parser.add_argument('--side', choices=['buy', 'sell'], help='매수(buy) 또는 매도(sell)')
+    parser.add_argument('--code', help='종목코드 (6자리)')
+    parser.add_argument('--name', help='종목명 (예: 삼성전자, 종목 마스터에서 검색)')
+    parser.add_argument('--qty', type=int, help='주문 수량')
     parser.add_argument('--price', type=int, default=0, help='주문 가격 (지정가)')
     parser.add_argument('--market', action='store_true', help='시장가 주문')
     parser.add_argument('--dry-run', action='store_true', help='주문 내용만 확인 (실제 주문 안함)')
+    parser.add_argument('--batch', help='일괄 주문 CSV 파일 (헤더: side,code,qty,price)')
+    parser.add_argument('--workers', type=int, default=4, help='일괄 주문 동시 전송 수 (기본: 4)')
+    parser.add_argument('--no-risk-check', action='store_true',
+                        help='주문 전 리스크 점검(주문가능현금/수량/가격제한폭/한도/중복) 생략')
     args = parser.parse_args()
 
+    if args.batch:
+        run_batch(load_config(args.config), args.batch, args.dry_run, args.workers, not args.no_risk_check)
+        return
+
+    if not args.side or args.qty is None:
+        print("❌ --side와 --qty를 입력하세요 (일괄 주문은 --batch).")
+        sys.exit(1)
+
+    if args.name and not args.code:
+        args.code, candidates = resolve_order_code(args.name)
+        if not args.code:
+            print(f"❌ '{args.name}': 정확히 일치하는 종목이 없습니다. 정확한 종목명이나 --code를 쓰세요.")
+            print(f"   후보: {candidates_text(candidates)}")
+            sys.exit(1)
+    if not args.code:
+        print("❌ --code 또는 --name 중 하나를 입력하세요.")
+        sys.exit(1)
+
     if args.qty <= 0:
         print("❌ 주문 수량은 1 이상이어야 합니다.")
         sys.exit(1)
@@ -74,12 +353,28 @@ def main():
     # 종목명 조회
     name = get_stock_name(cfg, token, args.code)
     side_str = '매수' if args.side == 'buy' else '매도'
-    price_str = '시장가' if args.market else fmt_price(round_to_tick(args.price))
+
+    # 리스크 점검은 입력 가격 그대로 (호가단위가 아니면 확인표를 보여 주기 전에 거부)
+    guard = None
+    if not args.no_risk_check:
+        guard = risk_guard(cfg, token, [args.code])
+        problems = guard.check(args.side, args.code, args.qty, 0 if args.market else args.price, args.market)
+        if problems:
+            print(f"❌ 리스크 점검 실패 - 주문하지 않았습니다.")
+            for p in problems:
+                print(f"  - {p}")
+            sys.exit(1)
+
+    price_str = '시장가' if args.market else fmt_price(args.price)
+    if not args.market and round_to_tick(args.price) != args.price:  # --no-risk-check일 때만
+        price_str += f" → {fmt_price(round_to_tick(args.price))} (호가단위로 조정)"
 
     print(f"📋 주문 확인")
     print(f"  {'🟢 매수' if args.side == 'buy' else '🔴 매도'}: {name} ({args.code})")
     print(f"  수량: {fmt_num(args.qty)}주")
     print(f"  가격: {price_str}")
+    if guard is not None:
+        print(f"  🛡️ 리스크 점검 통과")
 
     if args.dry_run:
         print(f"\n✅ 드라이런 완료 (실제 주문되지 않음)")
@@ -87,7 +382,13 @@ def main():
 
     print(f"\n⚠️  위 내용으로 {side_str} 주문을 실행합니다.")
 
-    result = place_order(cfg, token, args.side, args.code, args.qty, args.price, args.market)
+    try:
+        result = place_order(cfg, token, args.side, args.code, args.qty, args.price, args.market, guard=guard)
+    except Exception as e:
+        # 전송 후 타임아웃/kisd 오류: 접수 여부를 알 수 없으므로 실패로 단정하지 않는다
+        print(f"\n❓ {side_str} 주문 결과 불명 ({type(e).__name__}: {e})")
+        print("   다시 주문하기 전에 orders.py --all 또는 history.py로 오늘 주문/체결 내역을 확인하세요.")
+        sys.exit(1)
 
     if result:
         out = result.get('output', {})
@@ -95,6 +396,7 @@ def main():
         print(f"\n✅ {side_str} 주문 완료!")
         print(f"  주문번호: {order_no}")
         print(f"  주문시각: {out.get('ORD_TMD', out.get('ord_tmd', ''))}")
+        print(f"💡 체결 확인/정정/취소: orders.py --wait, --modify {order_no} --price N, --cancel {order_no}")
     else:
         print(f"\n❌ {side_str} 주문 실패")
         sys.exit(1)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""주문 관리 - 미체결 확인, 체결 대기, 정정/취소, 체결 소요시간/슬리피지 리포트"""
+import argparse
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_common import load_config, get_token, fmt_price, fmt_num, add_common_args
+from kis_orders import (open_store, poll_open_orders, wait_for_fills, lookup_order, cancel_order,
+                        modify_order, execution_report)
+from order import round_to_tick
+from quote import get_stock_name_by_code
+
+_STATUS = {'open': '⏳ 미체결', 'partial': '🟡 부분체결', 'filled': '✅ 체결', 'cancelled': '⚪ 취소', 'replaced': '🔁 정정됨',
+           'expired': '⌛ 만료', 'partial_expired': '🟠 부분체결 후 만료'}
+
+
+def print_order_line(o: dict):
+    name = get_stock_name_by_code(o['pdno']) or o['pdno']
+    price = '시장가' if o['market'] else fmt_price(o['price'])
+    fill = f" | 체결 {fmt_num(o['filled_qty'])}주 @{fmt_num(round(o['avg_price']))}" if o['filled_qty'] else ''
+    print(f"  {_STATUS.get(o['status'], o['status'])} [{o['odno']}] {'매수' if o['side'] == 'buy' else '매도'} "
+          f"{name} ({o['pdno']}) {fmt_num(o['qty'])}주 {price}{fill}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='주문 관리 (미체결/체결 대기/정정/취소/체결 리포트)')
+    add_common_args(parser)
+    today = datetime.today().strftime('%Y%m%d')
+    parser.add_argument('--all', action='store_true', help='오늘 주문 전체 표시 (기본: 미체결만)')
+    parser.add_argument('--poll', action='store_true', help='미체결 주문 체결 조회 1회')
+    parser.add_argument('--wait', action='store_true', help='미체결 주문이 모두 체결될 때까지 조회')
+    parser.add_argument('--timeout', type=float, default=60, help='--wait 최대 대기 시간(초, 기본: 60)')
+    parser.add_argument('--cancel', metavar='ODNO', help='주문 취소')
+    parser.add_argument('--modify', metavar='ODNO', help='주문 정정 (--price 또는 --market 필요)')
+    parser.add_argument('--price', type=int, default=0, help='정정 가격')
+    parser.add_argument('--market', action='store_true', help='시장가로 정정')
+    parser.add_argument('--qty', type=int, default=0, help='정정/취소 수량 (기본: 잔량 전부)')
+    parser.add_argument('--report', action='store_true', help='체결 소요시간/슬리피지 리포트')
+    parser.add_argument('--since', default=today, help='리포트 시작일 (YYYYMMDD, 기본: 오늘)')
+    parser.add_argument('--dry-run', action='store_true', help='정정/취소 내용만 확인 (실제 주문 안함)')
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    store = open_store(cfg)
+
+    if args.report:
+        rep = execution_report(store.orders(args.since))
+        if not rep['count']:
+            print(f"📋 체결된 추적 주문 없음 ({args.since} ~)")
+            return
+        print(f"⏱️ 체결 리포트 ({args.since} ~, {rep['count']}건)")
+        print(f"  첫 체결까지: 중앙값 {rep['median_first_fill_sec']:.1f}초 | p90 {rep['p90_first_fill_sec']:.1f}초")
+        print(f"  슬리피지(금액 가중): {rep['slippage_bps']:+.1f}bp (양수: 불리)")
+        print()
+        for r in rep['orders']:
+            full = f"{r['fill_sec']:.1f}초" if r['fill_sec'] is not None else '-'
+            print(f"  [{r['odno']}] {r['pdno']} {'매수' if r['side'] == 'buy' else '매도'} "
+                  f"기준 {fmt_num(r['ref_price'])} → 체결 {fmt_num(round(r['avg_price']))} "
+                  f"({r['slippage_bps']:+.1f}bp) | 첫 체결 {r['first_fill_sec']:.1f}초, 완료 {full}")
+        return
+
+    token = get_token(cfg)
+
+    if args.cancel or args.modify:
+        odno = args.cancel or args.modify
+        order = lookup_order(cfg, token, store, odno)
+        if not order:
+            print(f"❌ 주문번호 {odno}를 찾을 수 없습니다.")
+            sys.exit(1)
+        if order['status'] not in ('open', 'partial'):
+            print(f"❌ 정정/취소할 수 없는 주문입니다 ({_STATUS.get(order['status'], order['status'])}).")
+            sys.exit(1)
+        remaining = order['qty'] - order['filled_qty']
+        if args.qty < 0 or args.qty > remaining:
+            print(f"❌ 수량은 잔량({fmt_num(remaining)}주) 이내여야 합니다.")
+            sys.exit(1)
+        if args.modify and not args.market and args.price <= 0:
+            print("❌ 정정 시 --price를 입력하거나, --market으로 시장가 정정하세요.")
+            sys.exit(1)
+
+        qty_str = f"{fmt_num(args.qty or remaining)}주" + ('' if args.qty else ' (잔량 전부)')
+        print(f"📋 {'취소' if args.cancel else '정정'} 확인")
+        print_order_line(order)
+        print(f"  {'취소' if args.cancel else '정정'} 수량: {qty_str}")
+        if args.modify:
+            print(f"  정정 가격: {'시장가' if args.market else fmt_price(round_to_tick(args.price))}")
+        if args.dry_run:
+            print(f"\n✅ 드라이런 완료 (실제 주문되지 않음)")
+            return
+
+        if args.cancel:
+            result = cancel_order(cfg, token, store, order, args.qty)
+        else:
+            result = modify_order(cfg, token, store, order, round_to_tick(args.price) if not args.market else 0,
+                                  args.qty, args.market)
+        if not result:
+            print(f"\n❌ {'취소' if args.cancel else '정정'} 실패")
+            sys.exit(1)
+        out = result.get('output', {})
+        print(f"\n✅ {'취소' if args.cancel else '정정'} 주문 완료! 주문번호: {out.get('ODNO', out.get('odno', ''))}")
+        return
+
+    if args.wait:
+        left = wait_for_fills(cfg, token, store, args.timeout, on_change=print_order_line)
+        print(f"{'✅ 미체결 주문 없음' if not left else f'⏳ 미체결 {len(left)}건 남음 (--timeout 경과)'}")
+    elif args.poll:
+        for o in poll_open_orders(cfg, token, store, force=True):
+            print_order_line(o)
+
+    orders = store.orders(today) if args.all else store.open_orders()
+    print(f"📋 {'오늘 주문' if args.all else '미체결 주문'} {len(orders)}건")
+    for o in orders:
+        print_order_line(o)
+
+
+if __name__ == '__main__':
+    main()
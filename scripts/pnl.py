@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""실현손익 조회 (로컬 체결 내역 FIFO 로트 기준, KIS 기간별 손익과 대사)"""
+import argparse
+import json
+import csv
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_common import load_config, get_token, fmt_price, fmt_rate, fmt_num, add_common_args
+from kis_trades import TradeStore, three_months_ago
+from kis_lots import LotBook, reconcile, FIELDS
+from history import sync_trades, account_key
+from quote import get_quotes, get_stock_name_by_code, resolve_code
+
+
+def pnl_rate(r: dict) -> float:
+    """원가 대비 실현손익률 (%)"""
+    return r['pnl'] / r['cost'] * 100 if r['cost'] else 0.0
+
+
+def print_realized(rows: dict, label: str):
+    """종목별/일별 실현손익 출력"""
+    for key, r in rows.items():
+        emoji = '🔺' if r['pnl'] > 0 else '🔻' if r['pnl'] < 0 else '➖'
+        title = f"{get_stock_name_by_code(key) or key} ({key})" if label == 'symbol' else key
+        print(f"{emoji} {title} | {fmt_price(round(r['pnl']))} ({fmt_rate(pnl_rate(r))})")
+        print(f"   매도 {fmt_num(r['qty'])}주 {fmt_price(round(r['proceeds']))} | 원가 {fmt_price(round(r['cost']))}"
+              f" | 수수료 {fmt_price(round(r['fee']))} | 세금 {fmt_price(round(r['tax']))}")
+
+
+def print_open(unrealized: dict):
+    """보유 로트 평가손익 출력"""
+    total_cost = total_pnl = 0.0
+    for code, u in unrealized.items():
+        emoji = '🔺' if u['pnl'] > 0 else '🔻' if u['pnl'] < 0 else '➖'
+        rate = u['pnl'] / u['cost'] * 100 if u['cost'] else 0.0
+        price = fmt_price(u['price']) if u['price'] else '조회 실패'
+        print(f"{emoji} {get_stock_name_by_code(code) or code} ({code}) | {fmt_num(u['qty'])}주"
+              f" | 평균원가 {fmt_price(round(u['avg_cost']))} | 현재가 {price}")
+        print(f"   평가손익 {fmt_price(round(u['pnl']))} ({fmt_rate(rate)})")
+        total_cost += u['cost']
+        total_pnl += u['pnl']
+    rate = total_pnl / total_cost * 100 if total_cost else 0.0
+    print(f"\n💰 평가손익 합계 {fmt_price(round(total_pnl))} ({fmt_rate(rate)}) | 원가 {fmt_price(round(total_cost))}")
+
+
+def print_reconcile(rows: list):
+    """일자별 대사 결과 출력"""
+    diff_days = 0
+    for r in rows:
+        ok = abs(r['diff_pnl']) <= 1
+        diff_days += not ok
+        print(f"{'✅' if ok else '⚠️'} {r['day']} | 로컬 {fmt_price(r['local_pnl'])} | KIS {fmt_price(r['kis_pnl'])}"
+              f" | 차이 {fmt_price(r['diff_pnl'])}")
+        if not ok:
+            print(f"   매도금액 {fmt_price(r['local_proceeds'])} / {fmt_price(r['kis_proceeds'])}"
+                  f" | 수수료 {fmt_price(r['local_fee'])} / {fmt_price(r['kis_fee'])}"
+                  f" | 세금 {fmt_price(r['local_tax'])} / {fmt_price(r['kis_tax'])}"
+                  + (f" | 매수 내역 없는 수량 {fmt_num(r['unmatched'])}주" if r['unmatched'] else ''))
+    print(f"\n📊 {len(rows)}일 중 {diff_days}일 차이")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='실현손익 조회 (FIFO)')
+    add_common_args(parser)
+    today = datetime.today().strftime('%Y%m%d')
+    parser.add_argument('--start', default=today[:4] + '0101', help='시작일 (YYYYMMDD, 기본: 올해 1월 1일)')
+    parser.add_argument('--end', default=today, help='종료일 (YYYYMMDD, 기본: 오늘)')
+    parser.add_argument('--code', help='종목코드/종목명 필터')
+    parser.add_argument('--by', default='symbol', choices=['symbol', 'day'], help='집계 단위 (기본: symbol)')
+    parser.add_argument('--sync', action='store_true', help='먼저 체결 내역 동기화 (history.py --sync와 같음)')
+    parser.add_argument('--since', help='첫 동기화 시작일 (YYYYMMDD, 기본: 3개월 전)')
+    parser.add_argument('--rebuild', action='store_true', help='로트 장부를 처음부터 다시 계산')
+    parser.add_argument('--open', action='store_true', help='보유 로트와 평가손익 (현재가 조회)')
+    parser.add_argument('--reconcile', action='store_true', help='KIS 기간별 손익(TTTC8708R)과 일자별 대사')
+    parser.add_argument('--format', default='table', choices=['table', 'json', 'csv'], help='출력 형식 (기본: table)')
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    code = ''
+    if args.code:
+        code = resolve_code(args.code)
+        if not code:
+            print(f"❌ 종목을 찾을 수 없습니다: {args.code}")
+            sys.exit(1)
+
+    store = TradeStore(account_key(cfg))
+    token = None
+    if args.sync:
+        token = get_token(cfg)
+        count = sync_trades(cfg, token, store, args.since or three_months_ago())
+        if args.format == 'table':
+            print(f"✅ 동기화 완료: {count}건 (확정일 {store.synced_through() or '-'})")
+
+    book = LotBook(store, cfg['fee_rate'], cfg['sell_tax_rate'])
+    book.update(args.rebuild)
+
+    if args.reconcile:
+        rows = reconcile(book, cfg, token or get_token(cfg), args.start, args.end)
+        if rows is None:
+            print("❌ 기간별 손익 조회 실패")
+            sys.exit(1)
+        if args.format == 'json':
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+        elif args.format == 'csv':
+            if rows:
+                writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+        elif not rows:
+            print(f"📋 실현손익 없음 ({args.start} ~ {args.end})")
+        else:
+            print(f"🧾 실현손익 대사 ({args.start} ~ {args.end}, 로컬 FIFO 추정 vs KIS)")
+            print()
+            print_reconcile(rows)
+        return
+
+    if args.open:
+        codes = list(book.open_lots(code))
+        quotes = get_quotes(cfg, token or get_token(cfg), codes) if codes else {}
+        prices = {c: int((q or {}).get('output', {}).get('stck_prpr', 0) or 0) for c, q in quotes.items()}
+        unrealized = {c: u for c, u in book.unrealized(prices).items() if c in codes}
+        if args.format == 'json':
+            print(json.dumps({'open': unrealized, 'lots': book.open_lots(code)}, ensure_ascii=False, indent=2))
+        elif args.format == 'csv':
+            writer = csv.writer(sys.stdout)
+            writer.writerow(['code', 'qty', 'cost', 'avg_cost', 'price', 'value', 'pnl'])
+            for c, u in unrealized.items():
+                writer.writerow([c, u['qty'], round(u['cost']), round(u['avg_cost']), u['price'], u['value'], round(u['pnl'])])
+        elif not unrealized:
+            print("📭 보유 로트 없음")
+        else:
+            print(f"📦 보유 로트 평가 ({len(unrealized)}종목)")
+            print()
+            print_open(unrealized)
+        return
+
+    if args.by == 'day':
+        rows = book.realized_by_day(args.start, args.end)
+        if code:
+            rows = {day: book.realized(day, day, code) for day in rows}
+            rows = {day: r for day, r in rows.items() if r['sells']}
+    else:
+        rows = book.realized_by_symbol(args.start, args.end)
+        if code:
+            rows = {k: r for k, r in rows.items() if k == code}
+    total = book.realized(args.start, args.end, code)
+
+    if args.format == 'json':
+        print(json.dumps({'start': args.start, 'end': args.end, 'by': args.by, 'rows': rows, 'total': total},
+                         ensure_ascii=False, indent=2))
+        return
+    if args.format == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow([args.by] + list(FIELDS))
+        for key, r in rows.items():
+            writer.writerow([key] + [round(r[f]) for f in FIELDS])
+        return
+
+    if not rows:
+        print(f"📋 실현손익 없음 ({args.start} ~ {args.end})")
+        return
+    print(f"📈 실현손익 ({args.start} ~ {args.end}, FIFO, {'종목별' if args.by == 'symbol' else '일별'})")
+    print()
+    print_realized(rows, args.by)
+    print(f"\n💰 합계 {fmt_price(round(total['pnl']))} ({fmt_rate(pnl_rate(total))})"
+          f" | 매도 {fmt_num(total['sells'])}건 {fmt_price(round(total['proceeds']))}"
+          f" | 수수료 {fmt_price(round(total['fee']))} | 세금 {fmt_price(round(total['tax']))}")
+    if total['unmatched']:
+        print(f"⚠️ 매수 내역이 없는 매도 {fmt_num(total['unmatched'])}주는 손익 0으로 계산했습니다."
+              f" --since를 더 이전으로 잡아 history.py --backfill 후 --rebuild 하세요")
+
+
+if __name__ == '__main__':
+    main()
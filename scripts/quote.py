@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """종목 시세 조회"""
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import argparse
+import json
+import csv
 import sys
 import os
+import time
 
 sys.path.insert(0, os.path.dirname(__file__))
+from kis_symbols import get_master
+from kis_state import get_state
 from kis_common import load_config, get_token, api_get, fmt_price, fmt_rate, fmt_num, add_common_args, get_stock_name_from_api, safe_int, safe_float
 
 # 주요 종목 이름→코드 매핑 (자주 검색하는 종목)
@@ -34,12 +39,15 @@ STOCK_CODE_MAP = {v: k for k, v in STOCK_NAME_MAP.items()}
 
 
 def get_stock_name_by_code(code: str) -> Optional[str]:
-    """종목코드→이름 변환 (내장 맵 사용)"""
-    return STOCK_CODE_MAP.get(code)
+    """종목코드→이름 변환 (내장 맵 → 종목 마스터)"""
+    return STOCK_CODE_MAP.get(code) or get_master().name_of(code)
 
 
 def get_quote(cfg: dict, token: str, code: str) -> Optional[dict]:
-    """현재가 조회"""
+    """현재가 조회 (실시간 상태가 신선하면 REST 호출 없이 반환)"""
+    out = get_state().quote_output(code, cfg.get('stream_max_age', 5.0))
+    if out:
+        return {'rt_cd': '0', 'msg1': 'stream', 'output': out}
     params = {
         "FID_COND_MRKT_DIV_CODE": "J",
         "FID_INPUT_ISCD": code,
@@ -47,11 +55,98 @@ def get_quote(cfg: dict, token: str, code: str) -> Optional[dict]:
     return api_get(cfg, token, '/uapi/domestic-stock/v1/quotations/inquire-price', 'FHKST01010100', params)
 
 
+def get_quotes(cfg: dict, token: str, codes: List[str], workers: int = 8) -> Dict[str, Optional[dict]]:
+    """여러 종목 현재가 동시 조회 (속도 제한은 api_get 토큰 버킷이 처리)"""
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(codes)))) as pool:
+        results = pool.map(lambda c: get_quote(cfg, token, c), codes)
+        return dict(zip(codes, results))
+
+
+def parse_quote(out: dict) -> dict:
+    """inquire-price output → 표시용 필드"""
+    return {
+        'price': safe_int(out.get('stck_prpr')),
+        'change': safe_int(out.get('prdy_vrss')),
+        'change_rate': safe_float(out.get('prdy_ctrt')),
+        'volume': safe_int(out.get('acml_vol')),
+        'trade_amt': safe_int(out.get('acml_tr_pbmn')),
+        'high': safe_int(out.get('stck_hgpr')),
+        'low': safe_int(out.get('stck_lwpr')),
+        'open': safe_int(out.get('stck_oprc')),
+        'prev_close': safe_int(out.get('stck_sdpr')),
+        'market_cap': safe_int(out.get('hts_avls')),  # 시가총액(억원)
+        'sign': out.get('prdy_vrss_sign', '3'),
+    }
+
+
+def load_watchlist(path: str) -> List[str]:
+    """관심종목 파일 로드 (한 줄에 종목코드/종목명, 쉼표 구분 가능, # 주석)"""
+    items = []
+    with open(os.path.expanduser(path), encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            items.extend(t.strip() for t in line.split(',') if t.strip())
+    return items
+
+
+def resolve_codes(items: List[str], missing: List[str] = None) -> List[str]:
+    """종목코드/종목명 목록 → 종목코드 목록 (중복 제거, 순서 유지, 못 찾은 항목은 missing에 추가)"""
+    codes = []
+    for item in items:
+        code = item if item.isdigit() else resolve_code(item)
+        if not code:
+            print(f"⚠️  '{item}'에 해당하는 종목을 찾을 수 없어 제외합니다.", file=sys.stderr)
+            if missing is not None:
+                missing.append(item)
+            continue
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+
+def print_quotes(quotes: Dict[str, Optional[dict]], fmt: str = 'table', missing: List[str] = ()):
+    """여러 종목 시세 출력 (table/json/csv, 조회 실패/못 찾은 종목은 error 필드로 포함)"""
+    rows, failed = [], []
+    for code, data in quotes.items():
+        if not data:
+            failed.append({'code': code, 'name': get_stock_name_by_code(code) or '', 'error': '시세 조회 실패'})
+            continue
+        row = {'code': code, 'name': get_stock_name_by_code(code) or ''}
+        row.update(parse_quote(data.get('output', {})))
+        rows.append(row)
+    failed += [{'code': '', 'name': item, 'error': '종목을 찾을 수 없음'} for item in missing]
+
+    if fmt == 'json':
+        print(json.dumps(rows + failed, ensure_ascii=False, indent=2))
+        return
+    if fmt == 'csv':
+        fields = ['code', 'name'] + list(parse_quote({})) + ['error']
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields, restval='')
+        writer.writeheader()
+        writer.writerows(rows + failed)
+        return
+
+    print(f"📈 시세 ({len(rows)}/{len(quotes)}종목)")
+    print()
+    for r in rows:
+        emoji = {'1': '🔺', '2': '🔼', '4': '🔻', '5': '🔽'}.get(r['sign'], '➡️')
+        label = f"{r['name']} ({r['code']})" if r['name'] else r['code']
+        print(f"  {emoji} {label} {fmt_price(r['price'])} ({fmt_rate(r['change_rate'])}) 거래량 {fmt_num(r['volume'])}")
+    for r in failed:
+        label = f"{r['name']} ({r['code']})" if r['name'] and r['code'] else r['name'] or r['code']
+        print(f"  ❌ {label}: {r['error']}")
+
+
 def resolve_code(name: str) -> Optional[str]:
     """종목명→코드 변환"""
     # 정확히 일치
     if name in STOCK_NAME_MAP:
         return STOCK_NAME_MAP[name]
+    # 종목 마스터 (정확/접두어/초성/부분/유사)
+    code = get_master().resolve(name)
+    if code:
+        return code
     # 부분 일치
     for k, v in STOCK_NAME_MAP.items():
         if name in k or k in name:
@@ -59,15 +154,116 @@ def resolve_code(name: str) -> Optional[str]:
     return None
 
 
+def resolve_order_code(name: str) -> Tuple[Optional[str], List[Tuple[str, str, str]]]:
+    """주문용 종목명→코드 (정확한 코드/이름 또는 유일한 접두어만), 실패 시 (None, 후보 목록)
+
+    시세 조회용 resolve_code와 달리 유사/부분 일치를 쓰지 않는다 (오타가 다른 종목 주문이 되지 않게).
+    """
+    if name in STOCK_NAME_MAP:
+        return STOCK_NAME_MAP[name], []
+    master = get_master()
+    code = master.resolve_exact(name)
+    if code:
+        return code, []
+    return None, master.search(name, limit=5)
+
+
+STREAM_CONNECT_TIMEOUT = 30.0  # 첫 연결 대기 (초, 접속키 발급과 WebSocket 연결이 각각 10초 제한)
+
+
+def stream_quotes(cfg: dict, codes: List[str], depth: bool = False, duration: float = 0,
+                  ws_url: str = None, record: str = None) -> dict:
+    """실시간 체결가(및 호가) 스트리밍 출력, Ctrl+C 또는 duration초 후 종료"""
+    from kis_stream import (KisStream, TR_TRADE, TR_ORDERBOOK, TRADE_CODE, TRADE_TIME, TRADE_PRICE,
+                            TRADE_SIGN, TRADE_RATE, TRADE_VOLUME, TRADE_ACML_VOL,
+                            BOOK_CODE, BOOK_ASK, BOOK_BID, BOOK_ASK_QTY, BOOK_BID_QTY)
+    names = {c: get_stock_name_by_code(c) or c for c in codes}
+
+    def on_record(tr_id: str, f: List[str]):
+        if tr_id == TR_TRADE:
+            t = f[TRADE_TIME]
+            emoji = {'1': '🔺', '2': '🔼', '4': '🔻', '5': '🔽'}.get(f[TRADE_SIGN], '➡️')
+            print(f"{t[:2]}:{t[2:4]}:{t[4:6]} {emoji} {names.get(f[TRADE_CODE], f[TRADE_CODE])} "
+                  f"{fmt_price(safe_int(f[TRADE_PRICE]))} ({fmt_rate(safe_float(f[TRADE_RATE]))}) "
+                  f"체결 {fmt_num(safe_int(f[TRADE_VOLUME]))}주 | 누적 {fmt_num(safe_int(f[TRADE_ACML_VOL]))}주")
+        elif tr_id == TR_ORDERBOOK:
+            print(f"   📊 {names.get(f[BOOK_CODE], f[BOOK_CODE])} 매도 {fmt_num(safe_int(f[BOOK_ASK]))}"
+                  f"({fmt_num(safe_int(f[BOOK_ASK_QTY]))}) | 매수 {fmt_num(safe_int(f[BOOK_BID]))}"
+                  f"({fmt_num(safe_int(f[BOOK_BID_QTY]))})")
+
+    stream = KisStream(cfg, url=ws_url, record_path=record)
+    stream.add_callback(on_record)
+    for code in codes:
+        stream.subscribe(TR_TRADE, code)
+        if depth:
+            stream.subscribe(TR_ORDERBOOK, code)
+    stream.start(wait=STREAM_CONNECT_TIMEOUT)  # 첫 연결 실패는 ConnectionError로 (재연결 반복 안함)
+    print(f"📡 실시간 시세 수신 중: {', '.join(names[c] for c in codes)} (Ctrl+C 종료)")
+    try:
+        deadline = time.time() + duration if duration else None
+        while deadline is None or time.time() < deadline:
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+    print(f"✅ 종료: 수신 {fmt_num(stream.stats['records'])}건, 연결 {stream.stats['connects']}회")
+    return stream.stats
+
+
 def main():
     parser = argparse.ArgumentParser(description='종목 시세 조회')
     add_common_args(parser)
     parser.add_argument('--code', help='종목코드 (6자리)')
     parser.add_argument('--name', help='종목명 (예: 삼성전자)')
+    parser.add_argument('--codes', help='여러 종목 동시 조회 (쉼표 구분, 예: 005930,000660,카카오)')
+    parser.add_argument('--watchlist', help='관심종목 파일 (한 줄에 종목코드/종목명)')
+    parser.add_argument('--format', default='table', choices=['table', 'json', 'csv'],
+                        help='여러 종목 조회 시 출력 형식 (기본: table)')
+    parser.add_argument('--workers', type=int, default=8, help='동시 조회 수 (기본: 8)')
+    parser.add_argument('--stream', action='store_true', help='실시간 체결가 스트리밍 (WebSocket)')
+    parser.add_argument('--depth', action='store_true', help='스트리밍 시 호가도 함께 수신')
+    parser.add_argument('--duration', type=float, default=0, help='스트리밍 시간(초, 기본: Ctrl+C까지)')
+    parser.add_argument('--ws-url', help='실시간 접속 주소 (기본: config WS_URL 또는 KIS 기본 주소)')
+    parser.add_argument('--record', help='수신 프레임을 파일에 기록 (kis_stream_replay.py --file로 재생)')
     args = parser.parse_args()
 
+    if args.stream:
+        items = args.codes.split(',') if args.codes else []
+        if args.watchlist:
+            items += load_watchlist(args.watchlist)
+        items += [c for c in (args.code, args.name) if c]
+        codes = resolve_codes(items)
+        if not codes:
+            print("❌ 스트리밍할 종목을 입력하세요 (--code, --name, --codes, --watchlist).")
+            sys.exit(1)
+        cfg = load_config(args.config)
+        try:
+            stream_quotes(cfg, codes, args.depth, args.duration, args.ws_url, args.record)
+        except ConnectionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+
+    if args.codes or args.watchlist:
+        items = args.codes.split(',') if args.codes else []
+        if args.watchlist:
+            items += load_watchlist(args.watchlist)
+        missing = []
+        codes = resolve_codes(items, missing)
+        if not codes:
+            print("❌ 조회할 종목이 없습니다.")
+            sys.exit(1)
+        cfg = load_config(args.config)
+        token = get_token(cfg)
+        quotes = get_quotes(cfg, token, codes, args.workers)
+        print_quotes(quotes, args.format, missing)
+        if not any(quotes.values()):
+            sys.exit(1)
+        return
+
     if not args.code and not args.name:
-        print("❌ --code 또는 --name 중 하나를 입력하세요.")
+        print("❌ --code, --name, --codes, --watchlist 중 하나를 입력하세요.")
         parser.print_help()
         sys.exit(1)
 
@@ -86,20 +282,20 @@ def main():
     if not data:
         sys.exit(1)
 
-    out = data.get('output', {})
+    q = parse_quote(data.get('output', {}))
     name = get_stock_name_by_code(code) or get_stock_name_from_api(cfg, token, code)
-    cur_price = safe_int(out.get('stck_prpr'))
-    change = safe_int(out.get('prdy_vrss'))
-    change_rate = safe_float(out.get('prdy_ctrt'))
-    volume = safe_int(out.get('acml_vol'))
-    trade_amt = safe_int(out.get('acml_tr_pbmn'))
-    high = safe_int(out.get('stck_hgpr'))
-    low = safe_int(out.get('stck_lwpr'))
-    open_p = safe_int(out.get('stck_oprc'))
-    prev_close = safe_int(out.get('stck_sdpr'))
-    market_cap = safe_int(out.get('hts_avls'))  # 시가총액(억원)
-
-    sign = out.get('prdy_vrss_sign', '3')
+    cur_price = q['price']
+    change = q['change']
+    change_rate = q['change_rate']
+    volume = q['volume']
+    trade_amt = q['trade_amt']
+    high = q['high']
+    low = q['low']
+    open_p = q['open']
+    prev_close = q['prev_close']
+    market_cap = q['market_cap']
+
+    sign = q['sign']
     emoji = {'1': '🔺', '2': '🔼', '4': '🔻', '5': '🔽'}.get(sign, '➡️')
 
     print(f"{emoji} {name} ({code})")
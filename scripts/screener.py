@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""종목 스크리너 (코스피/코스닥 순위 API를 동시에 조회해 필터/정렬)"""
+import argparse
+import json
+import csv
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_common import load_config, get_token, fmt_price, fmt_rate, fmt_num, add_common_args
+
+try:
+    import kis_screener as ks
+except ImportError:
+    print("❌ screener.py는 numpy가 필요합니다: pip install numpy")
+    sys.exit(1)
+
+
+def fmt_amount(won: int) -> str:
+    """거래대금을 억 단위로"""
+    return f"{won / 1e8:,.0f}억"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='종목 스크리너',
+        epilog="필터 컬럼: " + ', '.join(f"{k}({v[1]})" for k, v in ks.COLUMNS.items()))
+    add_common_args(parser)
+    parser.add_argument('--markets', default='KOSPI,KOSDAQ', help='시장 (쉼표 구분, 기본: KOSPI,KOSDAQ)')
+    parser.add_argument('--sources', default=','.join(ks.DEFAULT_SOURCES),
+                        help=f"순위 종류 (쉼표 구분: {', '.join(ks.SOURCES)}, 기본: {','.join(ks.DEFAULT_SOURCES)})")
+    parser.add_argument('--bands', default='', help="가격대별 순위 조회 (예: '0-5000,5000-50000,50000-')")
+    parser.add_argument('--filter', '-f', help="필터 식 (예: 'rate >= 3 and turnover > 1e10 and 1000 <= price < 50000')")
+    parser.add_argument('--sort', '-s', default='-turnover', help="정렬 (예: '-turnover,rate', 기본: -turnover)")
+    parser.add_argument('--limit', type=int, default=20, help='표시 개수 (기본: 20, 0이면 전체)')
+    parser.add_argument('--refresh', type=float, default=30, help='이 시간(초) 안의 스캔 결과는 재사용 (기본: 30, 0이면 항상 조회)')
+    parser.add_argument('--format', default='table', choices=['table', 'json', 'csv'], help='출력 형식 (기본: table)')
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    try:
+        calls = ks.scan_calls([m.strip().upper() for m in args.markets.split(',') if m.strip()],
+                              [s.strip() for s in args.sources.split(',') if s.strip()],
+                              ks.parse_bands(args.bands))
+        if args.filter:
+            ks.compile_filter(args.filter)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    key = ks.screen_key(cfg, calls)
+    cached = ks.load_screen(key, args.refresh)
+    if cached:
+        table, age = cached
+        origin = f"캐시 {age:.0f}초 전"
+    else:
+        if len(calls) > ks.scan_budget() and args.format == 'table':
+            print(f"⚠️ 순위 조회 {len(calls)}건 → 초당 한도({ks.scan_budget()}건)를 넘어 1초 이상 걸립니다")
+        token = get_token(cfg)
+        table, failed = ks.scan(cfg, token, calls)
+        if failed == len(calls):
+            print("❌ 순위 조회 실패")
+            sys.exit(1)
+        if not failed:
+            ks.save_screen(key, table)
+        origin = f"순위 조회 {len(calls)}건" + (f", 실패 {failed}건" if failed else "")
+
+    try:
+        rows = ks.sort_rows(table, ks.apply_filter(table, args.filter), args.sort)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    matched = len(rows)
+    if args.limit > 0:
+        rows = rows[:args.limit]
+
+    records = [{name: table[name][i].item() for name in ks.COLUMNS if name != 'sources'}
+               for i in rows]
+    for rec, i in zip(records, rows):
+        rec['sources'] = '/'.join(ks.source_names(int(table['sources'][i])))
+
+    if args.format == 'json':
+        print(json.dumps({'universe': len(table['code']), 'matched': matched, 'rows': records},
+                         ensure_ascii=False, indent=2))
+        return
+    if args.format == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(ks.COLUMNS))
+        writer.writeheader()
+        writer.writerows(records)
+        return
+
+    print(f"🔎 스크리너: {len(table['code'])}종목 중 {matched}종목 ({origin})")
+    if args.filter:
+        print(f"   필터: {args.filter}")
+    print()
+    if not records:
+        print("📭 조건에 맞는 종목 없음")
+        return
+    for n, r in enumerate(records, 1):
+        emoji = '🔼' if r['change'] > 0 else '🔽' if r['change'] < 0 else '➡️'
+        print(f"  {n:2d}. {emoji} {r['name']} ({r['code']}) [{r['market']}] {fmt_price(r['price'])} "
+              f"({fmt_rate(r['rate'])}) 거래량 {fmt_num(r['volume'])} 거래대금 {fmt_amount(r['turnover'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""KRX 종목 마스터 갱신 및 검색"""
+from typing import List, Tuple
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+from kis_symbols import SYMBOLS_FILE, load_master, save_master, parse_mst
+
+# KIS 종목 마스터 파일 (매일 갱신)
+MASTER_URLS = {
+    'KOSPI': 'https://new.real.download.dws.co.kr/common/master/kospi_code.mst.zip',
+    'KOSDAQ': 'https://new.real.download.dws.co.kr/common/master/kosdaq_code.mst.zip',
+}
+
+
+def _read_mst_zip(raw: bytes) -> str:
+    """마스터 zip → .mst 본문 (cp949)"""
+    with zipfile.ZipFile(io.BytesIO(raw)) as zf:
+        name = next(n for n in zf.namelist() if n.endswith('.mst'))
+        return zf.read(name).decode('cp949', errors='replace')
+
+
+def download_master() -> List[Tuple[str, str, str]]:
+    """KIS 종목 마스터 다운로드 (코스피 + 코스닥)"""
+    import requests
+    rows = []
+    for market, url in MASTER_URLS.items():
+        resp = requests.get(url, timeout=30)
+        if resp.status_code != 200:
+            print(f"❌ {market} 마스터 다운로드 실패: {resp.status_code}")
+            sys.exit(1)
+        rows.extend(parse_mst(_read_mst_zip(resp.content), market))
+    return rows
+
+
+def import_file(path: str) -> List[Tuple[str, str, str]]:
+    """로컬 파일에서 종목 목록 읽기 (.mst/.mst.zip 또는 '코드,종목명[,시장]' CSV/TSV)"""
+    path = os.path.expanduser(path)
+    market = 'KOSDAQ' if 'kosdaq' in os.path.basename(path).lower() else 'KOSPI'
+    if path.endswith('.zip'):
+        with open(path, 'rb') as f:
+            return parse_mst(_read_mst_zip(f.read()), market)
+    if path.endswith('.mst'):
+        with open(path, encoding='cp949', errors='replace') as f:
+            return parse_mst(f.read(), market)
+
+    rows = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = [p.strip() for p in line.replace('\t', ',').split(',')]
+            if len(parts) >= 2 and parts[0] and not parts[0].startswith('#'):
+                rows.append((parts[0], parts[1], parts[2] if len(parts) > 2 else ''))
+    return rows
+
+
+def refresh(rows: List[Tuple[str, str, str]], replace: bool = True):
+    """기존 마스터와 비교해 변경분만 반영 (replace=False면 rows에 있는 시장만 교체하고 나머지 시장은 유지)"""
+    old = load_master()
+    old_map = {c: (n, m) for c, n, m in zip(old.codes, old.names, old.markets)}
+    new_map = {c: (n, m) for c, n, m in rows}
+    if not replace:
+        markets = {m for _, _, m in rows}
+        new_map = dict({c: v for c, v in old_map.items() if v[1] not in markets}, **new_map)
+
+    added = [c for c in new_map if c not in old_map]
+    removed = [c for c in old_map if c not in new_map]
+    changed = [c for c in new_map if c in old_map and old_map[c] != new_map[c]]
+
+    if not (added or removed or changed):
+        print(f"✅ 종목 마스터 최신 상태 ({len(old_map)}종목)")
+        return
+
+    save_master(sorted((c, n, m) for c, (n, m) in new_map.items()))
+    print(f"✅ 종목 마스터 갱신: {len(new_map)}종목 (추가 {len(added)}, 삭제 {len(removed)}, 변경 {len(changed)})")
+    for c in changed[:10]:
+        print(f"   변경: {c} {old_map[c][0]} → {new_map[c][0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KRX 종목 마스터 갱신 및 검색')
+    parser.add_argument('--refresh', action='store_true', help='KIS 종목 마스터 다운로드 후 갱신')
+    parser.add_argument('--import', dest='import_paths', nargs='+', metavar='FILE',
+                        help='로컬 마스터 파일로 갱신 (.mst, .mst.zip, CSV, 여러 개 가능) - 파일에 있는 시장만 교체')
+    parser.add_argument('--replace', action='store_true', help='--import 파일로 마스터 전체를 교체 (없는 시장은 삭제)')
+    parser.add_argument('--search', '-s', help='종목 검색 (종목명, 코드, 초성, 예: ㅅㅅㅈㅈ)')
+    parser.add_argument('--limit', type=int, default=10, help='검색 결과 개수 (기본: 10)')
+    args = parser.parse_args()
+
+    if args.refresh or args.import_paths:
+        rows = [r for path in args.import_paths for r in import_file(path)] if args.import_paths else download_master()
+        if not rows:
+            print("❌ 종목 목록이 비어 있습니다.")
+            sys.exit(1)
+        replace = args.refresh or args.replace
+        if not replace and any(not m for _, _, m in rows):
+            print("❌ 시장(KOSPI/KOSDAQ) 열이 없는 파일은 일부 시장만 바꿀 수 없습니다. --replace로 전체를 교체하세요.")
+            sys.exit(1)
+        refresh(rows, replace)
+
+    if args.search:
+        t0 = time.perf_counter()
+        master = load_master()
+        t1 = time.perf_counter()
+        results = master.search(args.search, args.limit)
+        t2 = time.perf_counter()
+        if not len(master):
+            print(f"⚠️  종목 마스터가 없습니다. 먼저 갱신하세요: symbols.py --refresh ({SYMBOLS_FILE})")
+        if not results:
+            print(f"❌ '{args.search}' 검색 결과 없음")
+            sys.exit(1)
+        print(f"🔎 '{args.search}' 검색 결과 ({len(results)}건, 로드 {(t1 - t0) * 1000:.1f}ms, 검색 {(t2 - t1) * 1000:.2f}ms)")
+        for code, name, market in results:
+            print(f"  {name} ({code}) {market}")
+    elif not (args.refresh or args.import_paths):
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
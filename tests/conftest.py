@@ -0,0 +1,44 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+# kis_* 모듈은 import 시점에 ~/.kis-trading 경로를 정하므로 import 전에 HOME을 임시 디렉터리로 바꾼다
+# (토큰/속도 제한/스냅샷 파일이 실제 계정 것과 섞이지 않게, kisd도 기본으로 쓰지 않음)
+HOME = tempfile.mkdtemp(prefix='kis-test-')
+os.environ['HOME'] = HOME
+os.environ['KIS_NO_DAEMON'] = '1'
+atexit.register(shutil.rmtree, HOME, True)
+
+# scripts/는 패키지가 아니므로 스크립트들과 같은 방식으로 경로를 추가해 import한다
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+sys.path.insert(0, SCRIPTS)
+
+
+@pytest.fixture
+def sim():
+    """지연/속도 제한 없는 kis_sim 서버"""
+    from kis_sim import SimServer
+    server = SimServer({'latency_ms': 0, 'jitter_ms': 0, 'rate_limit': 0, 'fill_delay': 0}).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sim_config(sim, tmp_path):
+    """sim을 가리키는 config.ini 경로 (테스트마다 APP_KEY/계좌번호를 달리해 토큰/버킷/주문 기록 파일을 나눈다)"""
+    port = sim.server_address[1]
+    path = tmp_path / 'config.ini'
+    path.write_text(f"[KIS]\nAPP_KEY = TEST{port}\nAPP_SECRET = SECRET\n"
+                    f"ACCOUNT_NO = {port:08d}-01\nBASE_URL = {sim.url}\n")
+    return str(path)
+
+
+@pytest.fixture
+def cfg(sim_config):
+    from kis_common import load_config
+    return load_config(sim_config)
@@ -0,0 +1,71 @@
+"""kisd - 실제 kisd 프로세스를 kis_sim 앞에 띄우고 클라이언트 호출이 데몬을 거쳐도 같은 결과/오류를 주는지"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import kis_daemon
+from conftest import SCRIPTS
+from kis_common import api_get, api_post, get_token
+from order import submit_batch
+
+ORDER_PATH = '/uapi/domestic-stock/v1/trading/order-cash'
+
+
+@pytest.fixture
+def kisd(cfg, sim_config, monkeypatch):
+    """kisd 실행 → 클라이언트가 데몬을 쓰도록 켜고, 끝나면 종료"""
+    env = dict(os.environ, KIS_NO_DAEMON='0')
+    proc = subprocess.Popen([sys.executable, os.path.join(SCRIPTS, 'kisd.py'), '--config', sim_config,
+                             '--idle-timeout', '0'], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    path = kis_daemon.socket_path(cfg)
+    deadline = time.time() + 10
+    while not os.path.exists(path):
+        assert proc.poll() is None and time.time() < deadline, proc.stderr.read().decode()
+        time.sleep(0.05)
+    monkeypatch.setattr(kis_daemon, 'enabled', True)
+    yield proc
+    if proc.poll() is None:
+        kis_daemon.request(cfg, 'shutdown')
+    kis_daemon._drop(path)
+    proc.wait(timeout=10)
+    proc.stdout.close()
+    proc.stderr.close()
+
+
+def order_body(cfg: dict, qty: int) -> dict:
+    return {"CANO": cfg['account_no'], "ACNT_PRDT_CD": cfg['product_code'], "PDNO": "005930",
+            "ORD_DVSN": "01", "ORD_QTY": str(qty), "ORD_UNPR": "0"}
+
+
+def test_calls_go_through_daemon(kisd, cfg):
+    data = api_get(cfg, get_token(cfg), '/uapi/domestic-stock/v1/quotations/inquire-price', 'FHKST01010100',
+                   {"FID_COND_MRKT_DIV_CODE": "J", "FID_INPUT_ISCD": "005930"})
+    assert data['output']['stck_prpr']
+    assert kis_daemon.request(cfg, 'ping')['result']['requests'] >= 2
+
+
+def test_api_error_is_relayed_to_client_stderr(kisd, cfg, capsys):
+    assert api_post(cfg, get_token(cfg), ORDER_PATH, 'TTTC0012U', order_body(cfg, 0)) is None
+    out, err = capsys.readouterr()
+    assert 'APBK0918' in err
+    assert 'APBK0918' not in out
+
+
+def test_exception_in_daemon_is_raised_on_client(kisd, cfg):
+    with pytest.raises(kis_daemon.DaemonError):
+        kis_daemon.request(cfg, 'api_get')  # path 없음 → kisd 안에서 KeyError
+
+
+def test_batch_order_outcome_unknown_when_daemon_dies(kisd, cfg, sim):
+    token = get_token(cfg)
+    sim.state.config['latency_ms'] = 1000  # 해시키 ~1초, 주문 응답 ~2초 → 1.5초에 kisd를 죽이면 주문이 전송 중
+    threading.Timer(1.5, kisd.kill).start()
+    orders = [{'line': 2, 'side': 'buy', 'code': '005930', 'qty': 1, 'price': 70000, 'market': False}]
+    results = submit_batch(cfg, token, orders, track=False)
+    assert kisd.wait(timeout=10) != 0
+    assert not results[0]['ok']
+    assert results[0]['unknown']
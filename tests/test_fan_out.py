@@ -0,0 +1,15 @@
+"""kis_common.fan_out - 계좌 순서 유지, 실패한 계좌는 None과 stderr 오류"""
+from kis_common import fan_out
+
+
+def test_fan_out_keeps_order_and_reports_failures(cfg, capsys):
+    accounts = [dict(cfg, account_name=name) for name in ('main', 'isa', 'pension')]
+
+    def fn(c, token):
+        if c['account_name'] == 'isa':
+            raise ConnectionError('연결 끊김')
+        return c['account_name']
+
+    assert [r for _, r in fan_out(accounts, fn)] == ['main', None, 'pension']
+    out, err = capsys.readouterr()
+    assert '[isa ' in err and '조회 오류: 연결 끊김' in err and not out
@@ -0,0 +1,134 @@
+"""FIFO 로트 장부 - 증분 반영/백필 재계산/기간 실현손익을 전수 계산과 비교"""
+import random
+from collections import deque
+from datetime import date, timedelta
+
+import pytest
+
+from kis_trades import TradeStore
+from kis_lots import LotBook, FIELDS
+
+FEE_RATE = 0.00015
+TAX_RATE = 0.002
+CODES = ('000001', '000002', '000003')
+
+
+def make_rows(days: int, seed: int = 1, start: date = date(2025, 1, 2), first_no: int = 0) -> list:
+    """임의 체결 행 (매수 내역 없는 매도가 가끔 섞임)"""
+    rnd = random.Random(seed)
+    rows, held, n = [], {}, first_no
+    for d in range(days):
+        day = (start + timedelta(days=d)).strftime('%Y%m%d')
+        for k in range(rnd.randint(0, 4)):
+            code = rnd.choice(CODES)
+            sell = held.get(code, 0) > 0 and rnd.random() < 0.45
+            qty = rnd.randint(1, 20)
+            if sell:
+                qty = min(qty, held[code]) if rnd.random() < 0.9 else held[code] + 5
+            held[code] = max(0, held.get(code, 0) + (-qty if sell else qty))
+            price = rnd.randint(1000, 50000)
+            n += 1
+            rows.append({'ord_dt': day, 'odno': f'{n:010d}', 'pdno': code, 'prdt_name': code,
+                         'sll_buy_dvsn_cd': '01' if sell else '02', 'ord_qty': str(qty), 'ord_unpr': str(price),
+                         'ord_tmd': f'{90000 + k:06d}', 'tot_ccld_qty': str(qty), 'avg_prvs': str(price),
+                         'tot_ccld_amt': str(qty * price), 'rmn_qty': '0', 'cncl_yn': 'N'})
+    return rows
+
+
+def brute_force(rows: list, start: str, end: str, code: str = '') -> dict:
+    """모든 체결을 처음부터 FIFO로 다시 계산한 기간 합계"""
+    lots, total = {}, dict.fromkeys(FIELDS, 0.0)
+    for r in sorted(rows, key=lambda r: (r['ord_dt'], r['ord_tmd'], r['odno'])):
+        qty, amount, c = int(r['tot_ccld_qty']), int(r['tot_ccld_amt']), r['pdno']
+        fee = int(amount * FEE_RATE)
+        if r['sll_buy_dvsn_cd'] == '02':
+            lots.setdefault(c, deque()).append([qty, amount + fee])
+            continue
+        tax = int(amount * TAX_RATE)
+        left, cost, queue = qty, 0.0, lots.get(c, deque())
+        while left and queue:
+            take = min(left, queue[0][0])
+            part = queue[0][1] * take / queue[0][0]
+            cost += part
+            queue[0][0] -= take
+            queue[0][1] -= part
+            left -= take
+            if not queue[0][0]:
+                queue.popleft()
+        if start <= r['ord_dt'] <= end and (not code or c == code):
+            matched = (amount - fee - tax) * (qty - left) / qty
+            total['qty'] += qty
+            total['proceeds'] += amount
+            total['fee'] += fee
+            total['tax'] += tax
+            total['pnl'] += matched - cost
+            total['unmatched'] += left
+            total['sells'] += 1
+    return total
+
+
+def assert_same(book: LotBook, rows: list, start: str, end: str, code: str = ''):
+    got, want = book.realized(start, end, code), brute_force(rows, start, end, code)
+    for f in ('qty', 'proceeds', 'fee', 'tax', 'unmatched', 'sells'):
+        assert got[f] == want[f], f
+    assert got['pnl'] == pytest.approx(want['pnl'], abs=1e-3)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = TradeStore('T', str(tmp_path / 'trades.db'))
+    yield s
+    s.close()
+
+
+PERIODS = [('20250101', '20991231', ''), ('20250301', '20250615', ''), ('20250210', '20250420', '000002'),
+           ('20250505', '20250505', ''), ('20250801', '20991231', '000003')]
+
+
+def test_incremental_update_matches_full_fifo(store):
+    rows = make_rows(240)
+    cut = rows[len(rows) // 2]['ord_dt']
+    store.add(r for r in rows if r['ord_dt'] <= cut)
+    store.mark_synced(cut)
+    book = LotBook(store, FEE_RATE, TAX_RATE)
+    book.update()
+
+    # 나머지를 나중에 동기화 (마지막 며칠은 미확정 → 메모리 반영)
+    store.add(r for r in rows if r['ord_dt'] > cut)
+    store.mark_synced(rows[-15]['ord_dt'])
+    assert book.update() > 0
+    assert book.pending
+    for start, end, code in PERIODS:
+        assert_same(book, rows, start, end, code)
+
+    fresh = LotBook(store, FEE_RATE, TAX_RATE)
+    fresh.update(rebuild=True)
+    assert fresh.open_lots() == book.open_lots()
+
+
+def test_backfill_rebuilds(store):
+    rows = make_rows(120, seed=2, start=date(2025, 3, 1))
+    store.add(rows)
+    store.mark_synced(rows[-1]['ord_dt'])
+    book = LotBook(store, FEE_RATE, TAX_RATE)
+    book.update()
+
+    # 확정일 이전 기간을 나중에 백필 → 행 수가 맞지 않으므로 처음부터 다시 계산
+    older = make_rows(40, seed=3, start=date(2025, 1, 2), first_no=100000)
+    store.add(older)
+    book.update()
+    for start, end, code in PERIODS:
+        assert_same(book, older + rows, start, end, code)
+
+
+def test_period_is_difference_of_cumulative_sums(store):
+    rows = make_rows(200, seed=4)
+    store.add(rows)
+    store.mark_synced(rows[-1]['ord_dt'])
+    book = LotBook(store, FEE_RATE, TAX_RATE)
+    book.update()
+    days = sorted({r['ord_dt'] for r in rows})
+    rnd = random.Random(5)
+    for _ in range(50):
+        start, end = sorted(rnd.sample(days, 2))
+        assert_same(book, rows, start, end, rnd.choice(('',) + CODES))
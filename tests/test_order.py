@@ -0,0 +1,68 @@
+"""order.py 일괄 주문 - kis_sim 계좌로 검증, 미리 받은 해시키로 제출, 한 건이 예외로 끝나도 나머지 추적"""
+from datetime import datetime
+
+import requests
+
+import order
+from kis_common import get_token
+from kis_orders import open_store
+
+
+def rows(*items):
+    return [dict(zip(('side', 'code', 'qty', 'price'), item), line=i) for i, item in enumerate(items, start=2)]
+
+
+def test_load_batch_skips_blank_and_comment_lines(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text("Side,Code,Qty,Price\nbuy,005930,1,70000\n\n# 주석,,,\nsell,삼성전자,2,market\n")
+    loaded = order.load_batch(str(path))
+    assert [r['line'] for r in loaded] == [2, 5]
+    assert loaded[1]['code'] == '삼성전자' and loaded[1]['price'] == 'market'
+
+
+def test_validate_batch_collects_every_error(cfg):
+    orders, errors = order.validate_batch(cfg, get_token(cfg), rows(
+        ('buy', '005930', '1', '70,030'), ('hold', '005930', '1', '70000'), ('buy', '005930', '0', '70000'),
+        ('buy', '005930', '1', ''), ('sell', '005930', '99999999', 'market')))
+    assert [o['line'] for o in orders] == [2, 6]
+    assert orders[0]['price'] == order.round_to_tick(70030) != 70030 and orders[0]['raw_price'] == 70030
+    assert orders[0]['adjusted']
+    assert [e.split('행')[0] for e in errors[:3]] == ['3', '4', '5']
+    assert '매도 수량' in errors[3]
+
+
+def today_orders(cfg) -> list:
+    store = open_store(cfg)
+    try:
+        return store.orders(datetime.today().strftime('%Y%m%d'))
+    finally:
+        store.close()
+
+
+def test_submit_batch_uses_prefetched_hashkeys_and_tracks(cfg):
+    token = get_token(cfg)
+    orders = [{'line': i, 'side': 'buy', 'code': code, 'qty': 1, 'price': 50000, 'market': False}
+              for i, code in enumerate(('005930', '000660', '035420'), start=2)]
+    results = order.submit_batch(cfg, token, orders)
+    assert all(r['ok'] and r['order_no'] for r in results), results  # 해시키가 본문과 맞지 않으면 sim이 거부
+    tracked = today_orders(cfg)
+    assert sorted(o['odno'] for o in tracked) == sorted(r['order_no'] for r in results)
+
+
+def test_submit_batch_marks_raised_order_unknown(cfg, monkeypatch):
+    token = get_token(cfg)
+    api_post = order.api_post
+
+    def flaky(cfg, token, path, tr_id, body, **kwargs):
+        if body['PDNO'] == '000660':
+            raise requests.Timeout('read timed out')
+        return api_post(cfg, token, path, tr_id, body, **kwargs)
+
+    monkeypatch.setattr(order, 'api_post', flaky)
+    orders = [{'line': i, 'side': 'buy', 'code': code, 'qty': qty, 'price': 50000, 'market': False}
+              for i, (code, qty) in enumerate((('005930', 1), ('000660', 1), ('035420', 0)), start=2)]
+    ok, unknown, rejected = order.submit_batch(cfg, token, orders)
+    assert ok['ok'] and not ok['unknown']
+    assert not unknown['ok'] and unknown['unknown'] and 'Timeout' in unknown['error']
+    assert not rejected['ok'] and not rejected['unknown'] and rejected['error'] == '주문 거부'
+    assert [o['pdno'] for o in today_orders(cfg)] == ['005930']
@@ -0,0 +1,45 @@
+"""토큰 버킷 - 어떤 1초 구간에도 기본 한도(KIS 제한 20건에 여유분을 둔 18건) 이하로 내보내는지"""
+import pytest
+
+from kis_ratelimit import TokenBucket, DEFAULT_BUCKETS, DEFAULT_RATE_LIMIT, window_bucket
+
+# KIS 제한은 20건/초, 기본 버킷은 여유분을 두고 이 수 이하로 보낸다
+LIMIT = DEFAULT_RATE_LIMIT
+
+
+def max_per_window(times: list, window: float = 1.0) -> int:
+    times, best, lo = sorted(times), 0, 0
+    for hi, t in enumerate(times):
+        while t - times[lo] >= window:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+def simulate(bucket: TokenBucket, arrivals: list) -> list:
+    """요청 도착 시각 → 실제 전송 시각 (대기 시간만큼 늦춤, sleep 없이 시각만 계산)"""
+    return [t + bucket._reserve(t) for t in arrivals]
+
+
+@pytest.mark.parametrize('rate,burst', [DEFAULT_BUCKETS['total'], window_bucket(LIMIT)])
+def test_burst_then_refill_stays_within_window(tmp_path, rate, burst):
+    bucket = TokenBucket(str(tmp_path / 'b'), rate, burst)
+    # 가득 찬 버킷에 100건이 한꺼번에 몰린 경우
+    sent = simulate(bucket, [1000.0] * 100)
+    assert max_per_window(sent) <= LIMIT
+
+
+def test_idle_gaps_do_not_overfill(tmp_path):
+    rate, burst = DEFAULT_BUCKETS['total']
+    bucket = TokenBucket(str(tmp_path / 'b'), rate, burst)
+    # 몰림 → 쉬었다가 다시 몰림을 반복해도 버스트 이상 쌓이지 않음
+    arrivals = [1000.0 + block * 1.7 + i * 0.001 for block in range(10) for i in range(30)]
+    assert max_per_window(simulate(bucket, arrivals)) <= LIMIT
+
+
+def test_window_bucket_sums_to_limit():
+    for limit in (1, 2, 5, 10, 20, 100):
+        rate, burst = window_bucket(limit)
+        assert rate + burst <= max(limit, 2)
+        assert burst >= 1
+    assert DEFAULT_BUCKETS['total'] == DEFAULT_BUCKETS['quotation'] == window_bucket(18)
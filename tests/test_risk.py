@@ -0,0 +1,65 @@
+"""kis_risk - kis_sim 계좌로 스냅샷 준비/점검/기록, 재조회 실패 시 거부, order.py 단건 확인 전 점검"""
+import sys
+
+import pytest
+
+import order
+from kis_common import get_token
+from kis_risk import RiskGuard, tick_size
+
+CODE = '005930'
+
+
+@pytest.fixture
+def guard(cfg, tmp_path):
+    g = RiskGuard(cfg, str(tmp_path / 'risk.json'))
+    assert g.prepare(get_token(cfg), [CODE]) == []
+    return g
+
+
+def test_prepare_fills_snapshot_once(guard, cfg, sim):
+    assert guard.snap['cash'] > 0
+    assert guard.snap['positions'] and guard.snap['total_eval'] > 0
+    base, lower, upper = guard.snap['bands'][CODE]
+    assert lower < base < upper
+    requests = sim.state.stats['requests']
+    assert guard.prepare(get_token(cfg), [CODE]) == []  # 오래되지 않았으면 재조회 없음
+    assert sim.state.stats['requests'] == requests
+
+
+def test_check_passes_valid_order(guard):
+    assert guard.check('buy', CODE, 1, guard.snap['bands'][CODE][0]) == []
+
+
+def test_check_rejects_off_tick_and_out_of_band(guard):
+    base, lower, upper = guard.snap['bands'][CODE]
+    assert any('호가단위' in e for e in guard.check('buy', CODE, 1, base + 1))
+    assert any('가격제한폭' in e for e in guard.check('buy', CODE, 1, upper + tick_size(upper)))
+
+
+def test_record_blocks_duplicate(guard):
+    price = guard.snap['bands'][CODE][0]
+    guard.record('buy', CODE, 1, price)
+    assert any('중복' in e for e in guard.check('buy', CODE, 1, price))
+    assert guard.check('buy', CODE, 2, price) == []
+
+
+def test_fails_closed_when_snapshot_cannot_be_fetched(cfg, sim, tmp_path):
+    token = get_token(cfg)
+    sim.shutdown()
+    sim.server_close()
+    g = RiskGuard(cfg, str(tmp_path / 'risk.json'))
+    assert g.prepare(token, [CODE])
+    assert g.check('buy', CODE, 1, 70000)
+    assert g.check('sell', CODE, 1, 70000)
+
+
+def test_order_rejects_off_tick_before_confirmation(cfg, sim_config, guard, monkeypatch, capsys):
+    price = guard.snap['bands'][CODE][0] + 1
+    monkeypatch.setattr(sys, 'argv', ['order.py', '--config', sim_config, '--side', 'buy', '--code', CODE,
+                                      '--qty', '1', '--price', str(price)])
+    with pytest.raises(SystemExit):
+        order.main()
+    out = capsys.readouterr().out
+    assert '호가단위가 아닙니다' in out
+    assert '주문 확인' not in out
@@ -0,0 +1,47 @@
+"""kis_common.ShardedRows - 구간 순서 유지, 버퍼가 차도 교착 없음, 중간에 그만 읽기, 오류는 stderr"""
+import threading
+import time
+
+import kis_common
+from kis_common import ShardedRows
+
+
+class FakePages:
+    """구간의 날짜마다 행 n개를 내는 PageIterator 대용"""
+
+    def __init__(self, start: str, end: str, n: int = 5, fail: bool = False):
+        self.start, self.end, self.n, self.fail = start, end, n, fail
+        self.failed = False
+
+    def rows(self):
+        for i in range(self.n):
+            yield {'start': self.start, 'i': i}
+        if self.fail:
+            raise ConnectionError('연결 끊김')
+
+
+def test_rows_come_in_shard_order_with_small_buffer(monkeypatch):
+    monkeypatch.setattr(kis_common, '_SHARD_BUFFER', 2)
+    rows = list(ShardedRows(lambda s, e: FakePages(s, e), '20250101', '20250131', shard_days=7, workers=2))
+    starts = [r['start'] for r in rows]
+    assert starts == sorted(starts) and len(set(starts)) == 5
+    assert len(rows) == 25
+
+
+def test_stopping_early_releases_blocked_shards(monkeypatch):
+    monkeypatch.setattr(kis_common, '_SHARD_BUFFER', 1)
+    before = threading.active_count()
+    it = iter(ShardedRows(lambda s, e: FakePages(s, e, n=100), '20250101', '20250331', shard_days=7, workers=4))
+    next(it)
+    t0 = time.perf_counter()
+    it.close()
+    assert time.perf_counter() - t0 < 2
+    assert threading.active_count() <= before
+
+
+def test_shard_error_goes_to_stderr_and_marks_failed(capsys):
+    rows = ShardedRows(lambda s, e: FakePages(s, e, fail=s == '20250108'), '20250101', '20250121', shard_days=7)
+    assert len(list(rows)) == 15
+    assert rows.failed
+    out, err = capsys.readouterr()
+    assert '조회 오류 (20250108~20250114)' in err and not out
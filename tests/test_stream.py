@@ -0,0 +1,73 @@
+"""kis_stream - 재생 서버(kis_stream_replay)로 수신, 첫 연결 실패 전달, 접속키 발급 오류"""
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from kis_stream import KisStream, TR_TRADE, TRADE_CODE, get_approval_key
+from kis_stream_replay import ReplayServer
+
+
+@pytest.fixture
+def replay():
+    server = ReplayServer().start()
+    yield server
+    server.stop()
+
+
+def closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_stream_receives_subscribed_trades(replay):
+    got = threading.Event()
+    codes = []
+    stream = KisStream({}, url=replay.url)
+    stream.add_callback(lambda tr_id, f: (codes.append(f[TRADE_CODE]), got.set()))
+    stream.subscribe(TR_TRADE, '005930')
+    stream.start(wait=10)
+    try:
+        assert got.wait(10)
+    finally:
+        stream.stop()
+    assert set(codes) == {'005930'}
+    assert stream.stats['connects'] == 1
+
+
+def test_first_connect_failure_is_raised():
+    stream = KisStream({}, url=f'ws://127.0.0.1:{closed_port()}')
+    with pytest.raises(ConnectionError, match='실시간 연결 실패'):
+        stream.start(wait=10)
+    assert not stream._thread.is_alive()
+
+
+def test_approval_key_from_sim(cfg):
+    assert get_approval_key(cfg)
+
+
+def test_approval_key_error_carries_server_message():
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            body = json.dumps({'msg_cd': 'EGW00103', 'msg1': '유효하지 않은 AppKey입니다.'}).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        cfg = {'app_key': 'BAD', 'app_secret': 'BAD', 'base_url': f'http://127.0.0.1:{server.server_port}'}
+        with pytest.raises(ConnectionError, match='유효하지 않은 AppKey'):
+            get_approval_key(cfg)
+    finally:
+        server.shutdown()
+        server.server_close()
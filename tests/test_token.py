@@ -0,0 +1,49 @@
+"""토큰 관리 - 여러 스레드/관리자가 동시에 요청해도 발급(tokenP)은 한 번"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from kis_token import TokenManager
+
+
+def counting_issuer(calls: list, delay: float = 0.05):
+    def issue():
+        calls.append(time.time())
+        time.sleep(delay)  # 발급 중 다른 요청이 몰리도록
+        expired = (datetime.now() + timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
+        return f'token-{len(calls)}', expired
+    return issue
+
+
+def run_concurrently(fns: list) -> list:
+    results = [None] * len(fns)
+    barrier = threading.Barrier(len(fns))
+
+    def run(i):
+        barrier.wait()
+        results[i] = fns[i]()
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(fns))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_get_issues_once(tmp_path):
+    calls = []
+    # 관리자 둘 = 같은 토큰 파일을 쓰는 두 프로세스 (파일 잠금으로 합쳐짐)
+    managers = [TokenManager(str(tmp_path / 'tok.json'), counting_issuer(calls)) for _ in range(2)]
+    tokens = run_concurrently([managers[i % 2].get for i in range(16)])
+    assert len(calls) == 1
+    assert set(tokens) == {'token-1'}
+
+
+def test_concurrent_invalidate_reissues_once(tmp_path):
+    calls = []
+    managers = [TokenManager(str(tmp_path / 'tok.json'), counting_issuer(calls)) for _ in range(2)]
+    bad = managers[0].get()
+    # 여러 요청이 동시에 같은 토큰으로 EGW00123을 받은 경우
+    tokens = run_concurrently([lambda m=managers[i % 2]: m.invalidate(bad) for i in range(16)])
+    assert len(calls) == 2
+    assert set(tokens) == {'token-2'}